@@ -7,7 +7,7 @@ from sqlalchemy import pool
 from alembic import context
 
 from app.db.database import Base  # Asegúrate de que esto esté en el archivo env.py
-from app.models.domain import dog, owner, visit, token, user  # Importa los modelos
+from app.models.domain import dog, owner, visit, token, user, email_outbox, rollup, course  # Importa los modelos
 
 import os
 
@@ -0,0 +1,39 @@
+"""Add course notifications
+
+Revision ID: a3c6e0d25b17
+Revises: f2b7c9d41a06
+Create Date: 2026-10-20 09:31:07.415928
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c6e0d25b17'
+down_revision: Union[str, None] = 'f2b7c9d41a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('course_notifications',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('subject', sa.String(length=255), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_course_notifications_course_id', 'course_notifications', ['course_id'], unique=False)
+    op.add_column('email_outbox', sa.Column('notification_id', sa.String(length=36), nullable=True))
+    op.create_index('ix_email_outbox_notification_id', 'email_outbox', ['notification_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_email_outbox_notification_id', table_name='email_outbox')
+    op.drop_column('email_outbox', 'notification_id')
+    op.drop_index('ix_course_notifications_course_id', table_name='course_notifications')
+    op.drop_table('course_notifications')
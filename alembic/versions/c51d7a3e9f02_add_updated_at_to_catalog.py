@@ -0,0 +1,32 @@
+"""Add updated_at to dogs, course and schedule
+
+Revision ID: c51d7a3e9f02
+Revises: 4b8e2f1c7a90
+Create Date: 2026-10-19 15:40:02.117384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c51d7a3e9f02'
+down_revision: Union[str, None] = '4b8e2f1c7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['static_dogs', 'adoption_dogs', 'adopted_dogs', 'course', 'schedule']
+
+
+def upgrade() -> None:
+    # Las filas existentes toman la fecha de la migración
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        # En SQL Server hay que borrar primero la restricción DEFAULT
+        op.drop_column(table, 'updated_at', mssql_drop_default=True)
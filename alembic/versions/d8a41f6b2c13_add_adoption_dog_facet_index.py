@@ -0,0 +1,27 @@
+"""Add facet index to adoption dogs
+
+Revision ID: d8a41f6b2c13
+Revises: c51d7a3e9f02
+Create Date: 2026-10-19 18:05:27.531904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a41f6b2c13'
+down_revision: Union[str, None] = 'c51d7a3e9f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_adoption_dogs_facets', 'adoption_dogs',
+                    ['gender', 'is_vaccinated', 'is_sterilized', 'is_dewormed', 'age'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_adoption_dogs_facets', table_name='adoption_dogs')
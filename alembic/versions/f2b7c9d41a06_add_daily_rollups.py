@@ -0,0 +1,41 @@
+"""Add daily adoption and visit rollups
+
+Revision ID: f2b7c9d41a06
+Revises: d8a41f6b2c13
+Create Date: 2026-10-19 20:14:52.806113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7c9d41a06'
+down_revision: Union[str, None] = 'd8a41f6b2c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_adoption_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('daily_visit_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    # Se llenan con los datos existentes; desde aquí los mantienen las funciones CRUD
+    op.execute("INSERT INTO daily_adoption_stats (day, total) "
+               "SELECT adopted_date, COUNT(*) FROM adopted_dogs WHERE adopted_date IS NOT NULL GROUP BY adopted_date")
+    op.execute("INSERT INTO daily_visit_stats (day, total) "
+               "SELECT visit_date, COUNT(*) FROM visit GROUP BY visit_date")
+
+
+def downgrade() -> None:
+    op.drop_table('daily_visit_stats')
+    op.drop_table('daily_adoption_stats')
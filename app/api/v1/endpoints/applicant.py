@@ -1,28 +1,26 @@
 import base64
 import io
-import os
 from typing import List
 
-from dotenv import load_dotenv
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from starlette.responses import StreamingResponse
 
-from app.core.security import get_current_user
+from app.core.config import settings
+from app.core.security import require_roles
 from app.crud.applicant import create_applicant, read_all_applicants_by_course, read_number_of_applicants_by_course, \
-    read_applicant_by_id, delete_applicant_by_id
+    read_applicant_by_id, delete_applicant_by_id, read_applicant_image
 from app.crud.course import read_course_by_id
 from app.db.session import get_db
 from app.models.domain.user import Role
+from app.models.schema.adapters import APPLICANT_LIST_ADAPTER, json_response
 from app.models.schema.applicant import ApplicantCreate, ApplicantResponse
 from app.models.schema.user import TokenData
 from app.services.images_control_service import verify_image_size
 
 router = APIRouter()
 
-load_dotenv()
-
-API_URL = os.getenv("API_URL")
+API_URL = settings.API_URL
 
 
 @router.post('/create/', response_model=dict)
@@ -55,7 +53,7 @@ async def create_new_applicant(applicant: ApplicantCreate,
 @router.get('/course/{course_id}/all/', response_model=List[ApplicantResponse])
 async def get_applicants_by_course(course_id: int,
                                    db: Session = Depends(get_db),
-                                   current_user: TokenData = Depends(get_current_user)):
+                                   current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
     English:
     --------
@@ -66,20 +64,18 @@ async def get_applicants_by_course(course_id: int,
     Lee todas las visitas.
 
     """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     applicant_raw = read_all_applicants_by_course(db, course_id)
     if not applicant_raw:
         raise HTTPException(status_code=404, detail="No hay solicitudes")
     for applicant in applicant_raw:
         if applicant.image:
             applicant.image = f'{API_URL}/applicant/{applicant.id}/image'
-    return applicant_raw
+    return json_response(APPLICANT_LIST_ADAPTER, applicant_raw)
 
 
 @router.get('/{applicant_id}', response_model=ApplicantResponse)
 async def get_applicant_by_id(applicant_id: int, db: Session = Depends(get_db),
-                              current_user: TokenData = Depends(get_current_user)):
+                              current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
     English:
     --------
@@ -90,8 +86,6 @@ async def get_applicant_by_id(applicant_id: int, db: Session = Depends(get_db),
     Lee una las solicitudes por el id.
 
     """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     applicant = read_applicant_by_id(db, applicant_id)
     if not applicant:
         raise HTTPException(status_code=404, detail="No hay solicitantes")
@@ -104,19 +98,17 @@ async def get_applicant_by_id(applicant_id: int, db: Session = Depends(get_db),
 
 @router.get("/{applicant_img}/image", response_class=StreamingResponse)
 def get_applicant_img(applicant_img: int, db: Session = Depends(get_db),
-                      current_user: TokenData = Depends(get_current_user)):
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    applicant = read_applicant_by_id(db, applicant_img)
-    if not applicant or not applicant.image:
+                      current_user: TokenData = Depends(require_roles(Role.ADMIN))):
+    image = read_applicant_image(db, applicant_img)
+    if not image:
         raise HTTPException(status_code=404, detail="Imagen no encontrada")
 
-    return StreamingResponse(io.BytesIO(applicant.image), media_type="image/jpeg")
+    return StreamingResponse(io.BytesIO(image), media_type="image/jpeg")
 
 
 @router.delete('/delete/{id_visit}', response_model=dict)
 def delete_an_applicant_by_id(id_applicant: int, db: Session = Depends(get_db),
-                              current_user: TokenData = Depends(get_current_user)):
+                              current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
     English:
     --------
@@ -130,7 +122,5 @@ def delete_an_applicant_by_id(id_applicant: int, db: Session = Depends(get_db),
 
     - **id_visit** (required): ID de la visita.
     """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     applicant_response = delete_applicant_by_id(db, id_applicant)
     return applicant_response
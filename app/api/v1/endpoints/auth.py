@@ -1,34 +1,36 @@
 from typing import List
 
-import pytz
-from fastapi import APIRouter, BackgroundTasks, Form
+from fastapi import APIRouter, Form, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import EmailStr
 
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app.crud.token import create_token, verify_token
 from app.crud.user import get_user_id_by_email, create_auth_user, update_auth_user_basic_information, \
-    update_auth_user_password, delete_auth_user, auto_create_auth_user, read_all_users
+    update_auth_user_password, delete_auth_user, auto_create_auth_user, read_all_users, update_password_hash
 from app.models.domain.token import AuthToken
 from app.core.security import *
+from app.core.compression import compressed_json_response
+from app.core.rate_limit import client_ip, login_ip_limiter, login_user_limiter, reset_send_ip_limiter, \
+    reset_send_email_limiter, reset_code_ip_limiter
 from app.models.domain.user import Role
+from app.models.schema.adapters import USER_LIST_ADAPTER, dump_json
 from app.models.schema.user import Token, TokenData, UserUpdate, UserCreate, UserResponse
 from app.db.session import get_db
-from app.services.crypt import verify_password
-from app.services.email_service import send_email
+from app.services.crypt import verify_and_update_password_async, password_hashing_metrics
+from app.services.email_service import queue_email
 from app.services.generator import user_generator
 from app.services.multi_crud_service import reset_password
 from app.services.verify import verify_structure_password, verify_email
 
 router = APIRouter()
 
-ALL_AUTH_ROLES = [Role.ADMIN, Role.AUXILIAR]
-
 
 @router.post("/", response_model=dict)
 def create_new_auth_user(user: UserCreate,
                          db: Session = Depends(get_db),
-                         current_user: TokenData = Depends(get_current_user)):
+                         current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
        English:
        --------
@@ -59,8 +61,6 @@ def create_new_auth_user(user: UserCreate,
             - **admin**: Usuario administrador.
             - **auxiliar**: Usuario auxiliar.
        """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     if not verify_email(user.email):
         raise HTTPException(status_code=400, detail="Correo inválido")
     if not verify_structure_password(user.password):
@@ -70,11 +70,10 @@ def create_new_auth_user(user: UserCreate,
 
 
 @router.post("/generate_user", response_model=dict)
-def generate_new_auth_user(background_tasks: BackgroundTasks,
-                           email: str,
+async def generate_new_auth_user(email: str,
                            role: Role,
                            db: Session = Depends(get_db),
-                           current_user: TokenData = Depends(get_current_user)):
+                           current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
        English:
        --------
@@ -94,22 +93,22 @@ def generate_new_auth_user(background_tasks: BackgroundTasks,
             - **admin**: Usuario administrador.
             - **auxiliar**: Usuario auxiliar.
        """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     if not verify_email(email):
         raise HTTPException(status_code=400, detail="Correo inválido")
-    user, data_for_email = user_generator(email, role)
-    auth_user = auto_create_auth_user(db, user)
+    user, data_for_email = await user_generator(email, role)
+    # Las consultas son síncronas: se ejecutan en el threadpool para no bloquear el event loop
+    auth_user = await run_in_threadpool(auto_create_auth_user, db, user)
     if not isinstance(auth_user, HTTPException):
-        background_tasks.add_task(send_email, email, "Credenciales de acceso", data_for_email, "user.html")
+        await run_in_threadpool(queue_email, db, email, "Credenciales de acceso", data_for_email, "user.html")
         return auth_user
     else:
         return auth_user
 
 
-@router.post("/token", response_model=Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(),
-                           db: Session = Depends(get_db)):
+@router.post("/token", response_model=Token, dependencies=[Depends(login_ip_limiter.by_ip)])
+async def login_for_access_token(request: Request,
+                                 form_data: OAuth2PasswordRequestForm = Depends(),
+                                 db: Session = Depends(get_db)):
     """
        English:
        --------
@@ -126,13 +125,22 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(),
        - **password** (requerido): Contraseña del usuario.
 
        """
-    user = get_user(db, username=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # bcrypt se espera sin ocupar un hilo; las consultas, síncronas, van al threadpool
+    # El límite por usuario es por usuario e IP: con la cuenta sola, cualquiera podría bloquear al administrador
+    await run_in_threadpool(login_user_limiter.hit, f"{form_data.username.lower()}|{client_ip(request)}")
+    user = await run_in_threadpool(get_user, db, username=form_data.username)
+    is_valid, new_hash = False, None
+    if user:
+        is_valid, new_hash = await verify_and_update_password_async(form_data.password, user.hashed_password)
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # El hash se generó con un costo de bcrypt fuera del rango aceptado, se guarda el recalculado
+        await run_in_threadpool(update_password_hash, db, user, new_hash)
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username, "role": user.role}, expires_delta=access_token_expires
@@ -140,21 +148,36 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(),
     return {"access_token": access_token, "token_type": "bearer"}
 
 
+@router.get('/metrics/password_hashing', response_model=dict)
+def get_password_hashing_metrics(current_user: TokenData = Depends(require_roles(Role.ADMIN))):
+    """
+    English:
+    --------
+    State of the password hashing pool: queued, running, completed and rejected operations and the bcrypt cost.
+
+    Español:
+    --------
+    Estado del pool de hasheo de contraseñas: operaciones en cola, en curso, completadas y rechazadas y el costo de
+    bcrypt.
+    """
+    return password_hashing_metrics()
+
+
 @router.get('/', response_model=List[UserResponse])
-def get_all_users(db: Session = Depends(get_db),
-                  current_user: TokenData = Depends(get_current_user)):
-    if current_user.role.value not in ALL_AUTH_ROLES:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+def get_all_users(request: Request,
+                  db: Session = Depends(get_db),
+                  current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
     response = read_all_users(db)
     if not response:
         raise HTTPException(status_code=404, detail="No se encontraron Usuarios")
-    return response
+    # Se comprime con gzip o brotli si el cliente lo acepta
+    return compressed_json_response(request, dump_json(USER_LIST_ADAPTER, response))
 
 
 @router.put("/update", response_model=dict)
 def update_user_basic_information(user: UserUpdate,
                                   db: Session = Depends(get_db),
-                                  current_user: TokenData = Depends(get_current_user)):
+                                  current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
     """
        English:
        --------
@@ -170,8 +193,6 @@ def update_user_basic_information(user: UserUpdate,
        - **username** (optional): Nuevo nombre de usuario.
        - **email** (optional): Nuevo email.
        """
-    if current_user.role.value not in ALL_AUTH_ROLES:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     if user.email and not verify_email(user.email):
         raise HTTPException(status_code=400, detail="Correo inválido")
     user = update_auth_user_basic_information(db, user, current_user.username)
@@ -182,7 +203,7 @@ def update_user_basic_information(user: UserUpdate,
 def update_user_password(actual_password: str,
                          new_password: str,
                          db: Session = Depends(get_db),
-                         current_user: TokenData = Depends(get_current_user)):
+                         current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
     """
        English:
        --------
@@ -198,17 +219,14 @@ def update_user_password(actual_password: str,
        - **actual_password** (required): Actual user password.
        - **new_password** (required): New user password.
        """
-    if current_user.role.value not in ALL_AUTH_ROLES:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     if not verify_structure_password(new_password):
         raise HTTPException(status_code=400, detail="La contraseña debe contener almenos una letra y un numero")
     user = update_auth_user_password(db, current_user.username, actual_password, new_password)
     return user
 
 
-@router.post('/reset_password/send')
+@router.post('/reset_password/send', dependencies=[Depends(reset_send_ip_limiter.by_ip)])
 async def send_reset_password_code(
-        background_tasks: BackgroundTasks,
         email: EmailStr = Form(...),
         db: Session = Depends(get_db)
 ):
@@ -225,14 +243,18 @@ async def send_reset_password_code(
 
        - **email** (required): Correo electrónico de un usuario existente.
     """
+    reset_send_email_limiter.hit(email.lower())
     subject = 'Recuperación de contraseña'
     try:
-        # Enviar el correo en segundo plano
+        # Encolar el correo para que lo envíe el worker de la bandeja de salida
         user_id = get_user_id_by_email(db, email)
         if user_id:
             reset_token = AuthToken()
             reset_token.generate_token(user_id)
             if create_token(db, reset_token):
+                # pytz solo se necesita aquí, se importa al enviar el primer código
+                import pytz
+
                 ecuador_tz = pytz.timezone("America/Guayaquil")
                 context = {
                     "body": {
@@ -243,13 +265,14 @@ async def send_reset_password_code(
                         .strftime("%Y-%m-%d %H:%M:%S")
                     }
                 }
-                background_tasks.add_task(send_email, email, subject, context, "email.html")
+                queue_email(db, email, subject, context, "email.html")
         return {"message": "Si el correo existe, el código sera enviado"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post('/reset_password/verify', response_model=dict)
+@router.post('/reset_password/verify', response_model=dict,
+             dependencies=[Depends(reset_code_ip_limiter.by_ip)])
 async def verify_password_code(
         code: int,
         db: Session = Depends(get_db)
@@ -275,7 +298,8 @@ async def verify_password_code(
     raise HTTPException(status_code=400, detail="Código invalido")
 
 
-@router.post('/reset_password/reset', response_model=dict)
+@router.post('/reset_password/reset', response_model=dict,
+             dependencies=[Depends(reset_code_ip_limiter.by_ip)])
 async def reset_forgotten_password(
         code: int,
         new_password: str,
@@ -310,7 +334,7 @@ async def reset_forgotten_password(
 
 @router.delete('/delete/{user_id}', response_model=dict)
 def delete_auth_user_by_id(user_id: int, db: Session = Depends(get_db),
-                           current_user: TokenData = Depends(get_current_user)):
+                           current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
            English:
            --------
@@ -324,7 +348,5 @@ def delete_auth_user_by_id(user_id: int, db: Session = Depends(get_db),
 
            - **user_id** (required): Id de usuario a ser eliminado.
     """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     auth_response = delete_auth_user(db, user_id, current_user.username)
     return auth_response
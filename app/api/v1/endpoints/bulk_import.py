@@ -0,0 +1,60 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from sqlalchemy.orm import Session
+
+from app.core.security import require_roles
+from app.db.session import get_db
+from app.models.domain.user import Role
+from app.models.schema.bulk_import import ImportKind, ImportFormat, ImportReport
+from app.models.schema.user import TokenData
+from app.services.bulk_import_service import import_records, detect_format
+
+router = APIRouter()
+
+
+@router.post('/{kind}', response_model=ImportReport)
+def import_records_from_file(kind: ImportKind,
+                             file: UploadFile = File(...),
+                             file_format: Optional[ImportFormat] = None,
+                             db: Session = Depends(get_db),
+                             current_user: TokenData = Depends(require_roles(Role.ADMIN))):
+    """
+    English:
+    --------
+    Bulk import of dogs or historical visits from a CSV or NDJSON file:
+
+    - **kind** (required): Type of record. Must be one of:
+        - **static_dog**: Rows with the fields of a static dog.
+        - **adoption_dog**: Rows with the fields of an adoption dog.
+        - **adopted_dog**: Rows with the fields of an adopted dog, **adopted_date** and the owner
+          (**owner** object in NDJSON or **owner_name**, **owner_direction**, **owner_cellphone** columns in CSV).
+        - **visit**: Rows with the fields of a visit.
+    - **file** (required): CSV or NDJSON file.
+    - **file_format** (optional): **csv** or **ndjson**. By default it is taken from the file extension.
+
+    Returns the id created for each row and the errors found per row.
+
+    Español:
+    --------
+    Importación masiva de perros o visitas históricas desde un archivo CSV o NDJSON:
+
+    - **kind** (required): Tipo de registro. Debe ser uno de los siguientes:
+        - **static_dog**: Filas con los campos de un perro permanente.
+        - **adoption_dog**: Filas con los campos de un perro de adopción.
+        - **adopted_dog**: Filas con los campos de un perro adoptado, **adopted_date** y el dueño
+          (objeto **owner** en NDJSON o columnas **owner_name**, **owner_direction**, **owner_cellphone** en CSV).
+        - **visit**: Filas con los campos de una visita.
+    - **file** (required): Archivo CSV o NDJSON.
+    - **file_format** (optional): **csv** o **ndjson**. Por defecto se toma de la extensión del archivo.
+
+    Devuelve el id creado por cada fila y los errores encontrados por fila.
+    """
+    file_format = file_format or detect_format(file.filename)
+    if file_format is None:
+        raise HTTPException(status_code=400, detail="Formato de archivo no soportado")
+    try:
+        content = file.file.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="El archivo debe estar codificado en UTF-8")
+    return import_records(db, kind, content, file_format)
@@ -1,18 +1,24 @@
 from typing import List
 
-from dns.dnssec import validate
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
-from app.core.security import get_current_user
+from app.core.security import require_roles
 from app.crud import course
 from app.crud.course import create_course, read_all_course, read_course_by_id, update_course_by_id, delete_course
 from app.crud.owner import create_owner
 from app.db.session import get_db
 from app.models.domain.user import Role
-from app.models.schema.course import CourseCreate, CourseResponse, CourseUpdate
+from app.models.schema.adapters import COURSE_LIST_ADAPTER, dump_json
+from app.models.schema.course import CourseCreate, CourseResponse, CourseUpdate, CourseNotificationCreate, \
+    CourseNotificationJob
 from app.models.schema.owner import OwnerCreate
 from app.models.schema.user import TokenData
+from app.crud.collection_version import read_collection_version
+from app.models.domain.course import Course
+from app.models.domain.schedule import Schedule
+from app.services.catalog_cache import cached_json_response, versioned_json_response, COURSES
+from app.services.course_notification_service import queue_course_notification, get_notification_job
 from app.services.verify import verify_hour
 
 router = APIRouter()
@@ -21,9 +27,7 @@ router = APIRouter()
 @router.post('/create', response_model=dict)
 def create_new_course(course: CourseCreate,
                       db: Session = Depends(get_db),
-                      current_user: TokenData = Depends(get_current_user)):
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+                      current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     for schedule in course.schedule:
         if not verify_hour(schedule.start_hour) and not verify_hour(schedule.end_hour):
             raise HTTPException(status_code=400, detail="Hora inválida")
@@ -32,29 +36,35 @@ def create_new_course(course: CourseCreate,
 
 
 @router.get('/', response_model=List[CourseResponse])
-def get_all_courses(db: Session = Depends(get_db)):
-    response = read_all_course(db)
-    if not response:
-        raise HTTPException(status_code=404, detail="No se encontraron cursos")
-    return response
+def get_all_courses(request: Request, db: Session = Depends(get_db)):
+    def build() -> bytes:
+        response = read_all_course(db)
+        if not response:
+            raise HTTPException(status_code=404, detail="No se encontraron cursos")
+        return dump_json(COURSE_LIST_ADAPTER, response)
+
+    # Los horarios forman parte de la respuesta, por eso también cuentan en la versión
+    return versioned_json_response(request, read_collection_version(db, Course, Schedule), build, COURSES)
 
 
 @router.get('/{id_course}', response_model=CourseResponse)
 def get_course_by_id(id_course: int,
+                     request: Request,
                      db: Session = Depends(get_db)):
-    response = read_course_by_id(db, id_course)
-    if not response:
-        raise HTTPException(status_code=404, detail="No se encontraron cursos")
-    return response
+    def build() -> bytes:
+        response = read_course_by_id(db, id_course)
+        if not response:
+            raise HTTPException(status_code=404, detail="No se encontraron cursos")
+        return CourseResponse.model_validate(response).model_dump_json().encode()
+
+    return cached_json_response(COURSES, request, build)
 
 
 @router.put('/update/{id_course}', response_model=dict)
 def update_course(id_course: int,
                   course: CourseUpdate,
                   db: Session = Depends(get_db),
-                  current_user: TokenData = Depends(get_current_user)):
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+                  current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     for schedule in course.schedule:
         if not verify_hour(schedule.start_hour) and not verify_hour(schedule.end_hour):
             raise HTTPException(status_code=400, detail="Hora inválida")
@@ -65,8 +75,48 @@ def update_course(id_course: int,
 @router.delete('/delete/{course_id}', response_model=dict)
 def delete_course_by_id(id_course: int,
                         db: Session = Depends(get_db),
-                        current_user: TokenData = Depends(get_current_user)):
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+                        current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     response = delete_course(db, id_course)
     return response
+
+
+@router.post('/{id_course}/notify', response_model=CourseNotificationJob)
+def notify_course_applicants(id_course: int,
+                             notification: CourseNotificationCreate,
+                             db: Session = Depends(get_db),
+                             current_user: TokenData = Depends(require_roles(Role.ADMIN))):
+    """
+    English:
+    --------
+    Email every applicant of a course (e.g. for schedule changes). The emails are queued in the outbox and
+    sent in the background; use the returned **job_id** to follow the progress.
+
+    - **subject** (required): Email subject.
+    - **message** (required): Message for the applicants.
+
+    Español:
+    --------
+    Enviar un correo a todos los solicitantes de un curso (por ejemplo, por cambios de horario). Los correos se
+    encolan en la bandeja de salida y se envían en segundo plano; con el **job_id** devuelto se puede consultar
+    el avance.
+
+    - **subject** (required): Asunto del correo.
+    - **message** (required): Mensaje para los solicitantes.
+    """
+    return queue_course_notification(db, id_course, notification)
+
+
+@router.get('/notify/{job_id}', response_model=CourseNotificationJob)
+def get_course_notification_progress(job_id: str,
+                                     db: Session = Depends(get_db),
+                                     current_user: TokenData = Depends(require_roles(Role.ADMIN))):
+    """
+    English:
+    --------
+    Progress of a course notification: total, sent and failed emails.
+
+    Español:
+    --------
+    Avance de una notificación de curso: correos totales, enviados y fallidos.
+    """
+    return get_notification_job(db, job_id)
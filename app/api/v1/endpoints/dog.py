@@ -1,41 +1,132 @@
 import base64
 import io
-import os
 from datetime import date
-from typing import List
+from typing import List, Optional, Union
 
-import dotenv
-from dotenv import load_dotenv
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.security import get_current_user
+from app.core.config import settings
+from app.core.security import require_roles, ALL_AUTH_ROLES
 from app.crud.dog import read_all_static_dogs, read_static_dogs_by_id, create_static_dog, delete_an_static_dog_by_id, \
     read_all_adoption_dogs, read_adoption_dog_by_id, create_adoption_dog, delete_an_adoption_dog_by_id, \
     read_all_adopted_dogs, read_adopted_dogs_by_id, update_static_dog, update_adoption_dog, update_adopted_dog, \
-    adopt_dog
-from app.crud.owner import read_owner_by_id
+    read_dog_image, read_dogs_sparse, adoption_dog_conditions, read_adoption_dog_facets, read_dogs_by_chip
 from app.db.session import get_db
+from app.models.domain.dog import StaticDog, AdoptionDog, AdoptedDog, Gender
 from app.models.domain.user import Role
 from app.models.schema.dog import StaticDogResponse, StaticDogCreate, AdoptionDogResponse, AdoptionDogCreate, \
-    AdoptedDogResponse, AdoptedDogUpdate
+    AdoptedDogResponse, AdoptedDogUpdate, AdoptionBatchItem, AdoptionBatchResponse, DogSearchResult, \
+    AdoptionDogFilters, AdoptionDogFacetedResponse, ChipLookupResponse
+from app.models.schema.adapters import STATIC_DOG_LIST_ADAPTER, ADOPTED_DOG_LIST_ADAPTER, ADOPTION_DOG_FACETED_ADAPTER, \
+    dump_json
 from app.models.schema.owner import OwnerCreate, OwnerResponse
 from app.models.schema.user import TokenData
+from app.core.compression import compressed_json_response
+from app.crud.collection_version import read_collection_version
+from app.services.catalog_cache import cached_json_response, versioned_json_response, ADOPTION_DOGS
+from app.services.field_selection import DOG_FIELDS, ADOPTED_DOG_FIELDS, ADOPTED_DOG_INCLUDES, FieldSelection, \
+    parse_field_selection, replace_flag_with_url, dump_rows_json
+from app.services.dog_search import search_dogs
 from app.services.images_control_service import verify_image_size
-from app.services.multi_crud_service import create_owner_and_adopted_dog, un_adopt_dog_service
+from app.services.multi_crud_service import create_owner_and_adopted_dog, un_adopt_dog_service, \
+    adopt_dog_with_existing_owner, adopt_dogs_batch
 
 router = APIRouter()
 
-load_dotenv()
+API_URL = settings.API_URL
+
+
+def sparse_dogs(db: Session, model, path: str, selection: FieldSelection, dog_ids=None, conditions=()) -> List[dict]:
+    """Perros con solo los campos pedidos y la URL de la imagen en lugar de su marca."""
+    dogs = read_dogs_sparse(db, model, selection.fields, "owner" in selection.include, dog_ids, conditions)
+    replace_flag_with_url(dogs, "image", lambda dog_id: f'{API_URL}/dog/{path}/{dog_id}/image')
+    return dogs
+
+
+def adoption_dog_filters(gender: Optional[Gender] = None,
+                         is_vaccinated: Optional[bool] = None,
+                         is_sterilized: Optional[bool] = None,
+                         is_dewormed: Optional[bool] = None,
+                         min_age: Optional[int] = Query(None, ge=0),
+                         max_age: Optional[int] = Query(None, ge=0),
+                         entry_date_from: Optional[date] = None,
+                         entry_date_to: Optional[date] = None) -> AdoptionDogFilters:
+    """Filtros del catálogo de adopción leídos de los parámetros de consulta."""
+    if min_age is not None and max_age is not None and min_age > max_age:
+        raise HTTPException(status_code=400, detail="min_age no puede ser mayor que max_age")
+    if entry_date_from and entry_date_to and entry_date_from > entry_date_to:
+        raise HTTPException(status_code=400, detail="entry_date_from no puede ser posterior a entry_date_to")
+    return AdoptionDogFilters(gender=gender, is_vaccinated=is_vaccinated, is_sterilized=is_sterilized,
+                              is_dewormed=is_dewormed, min_age=min_age, max_age=max_age,
+                              entry_date_from=entry_date_from, entry_date_to=entry_date_to)
+
+
+@router.get('/search', response_model=List[DogSearchResult])
+def search_dogs_by_text(q: str = Query(min_length=1, max_length=100), limit: int = Query(20, ge=1, le=100),
+                        db: Session = Depends(get_db)):
+    """
+    English:
+    --------
+    Search dogs by name and description across static, adoption and adopted dogs:
+
+    - **q** (required): words to search; each one matches as a prefix and accents are ignored.
+    - **limit** (optional): maximum number of results, 20 by default.
+
+    Results are ordered by relevance; a match in the name weighs more than one in the description.
+
+    Español:
+    --------
+    Busca perros por nombre y descripción entre los perros estáticos, de adopción y adoptados:
 
-API_URL = os.getenv("API_URL")
+    - **q** (required): palabras a buscar; cada una se compara como prefijo y sin tildes.
+    - **limit** (optional): máximo de resultados, 20 por defecto.
+
+    Los resultados se ordenan por relevancia; coincidir en el nombre pesa más que en la descripción.
+    """
+    return [
+        DogSearchResult(kind=hit.kind, id=hit.id, name=hit.name, about=hit.about, score=hit.score,
+                        image=f'{API_URL}/dog/{hit.kind}/{hit.id}/image' if hit.has_image else None)
+        for hit in search_dogs(db, q, limit)
+    ]
+
+
+@router.get('/chip/{id_chip}', response_model=List[ChipLookupResponse])
+def get_dog_by_chip(id_chip: int, db: Session = Depends(get_db),
+                    current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
+    """
+    English:
+    --------
+    Look up a microchip across static, adoption and adopted dogs:
+
+    - **id_chip** (required): chip of the dog.
+
+    Returns where the dog currently is (`kind`) and, if it was adopted, its owner.
+
+    Español:
+    --------
+    Busca un microchip entre los perros estáticos, de adopción y adoptados:
+
+    - **id_chip** (required): chip del perro.
+
+    Devuelve dónde está el perro actualmente (`kind`) y, si fue adoptado, su dueño.
+    """
+    dogs = read_dogs_by_chip(db, id_chip)
+    if not dogs:
+        raise HTTPException(status_code=404, detail=f'No se encontró ningún perro con el chip: {id_chip}')
+    return [
+        ChipLookupResponse(kind=dog["kind"], id=dog["id"], id_chip=dog["id_chip"], name=dog["name"],
+                           owner=dog["owner"],
+                           image=f'{API_URL}/dog/{dog["kind"]}/{dog["id"]}/image' if dog["has_image"] else None)
+        for dog in dogs
+    ]
 
 
 @router.post('/static_dog/create/', response_model=dict)
 async def create_new_static_dog(dog: StaticDogCreate,
                                 db: Session = Depends(get_db),
-                                current_user: TokenData = Depends(get_current_user)):
+                                current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
     English:
     --------
@@ -86,8 +177,6 @@ async def create_new_static_dog(dog: StaticDogCreate,
     - **operation** (optional): Especifica la/las operaciones del perro.
     """
 
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     image_data = None
     if dog.image:
         try:
@@ -109,22 +198,41 @@ async def create_new_static_dog(dog: StaticDogCreate,
 
 
 @router.get('/static_dog/', response_model=List[StaticDogResponse])
-def get_static_dogs(db: Session = Depends(get_db)):
+def get_static_dogs(request: Request, fields: Optional[str] = None, db: Session = Depends(get_db)):
     """
     Endpoint para obtener todos los perros estáticos.
+
+    Responde 304 si el `If-None-Match` coincide con la versión actual de la colección.
+    Con `fields` (por ejemplo `?fields=id,name,age`) solo se consultan y devuelven esos campos.
     """
-    static_dogs = read_all_static_dogs(db)
+    selection = parse_field_selection(fields, None, DOG_FIELDS)
 
-    if not static_dogs:
-        raise HTTPException(status_code=404, detail="No se encontraron perros estáticos")
-    for dog in static_dogs:
-        if dog.image:
-            dog.image = f'{API_URL}/dog/static_dog/{dog.id}/image'
-    return static_dogs
+    def build() -> bytes:
+        if selection is not None:
+            dogs = sparse_dogs(db, StaticDog, "static_dog", selection)
+            if not dogs:
+                raise HTTPException(status_code=404, detail="No se encontraron perros estáticos")
+            return dump_rows_json(dogs)
+        static_dogs = read_all_static_dogs(db)
+
+        if not static_dogs:
+            raise HTTPException(status_code=404, detail="No se encontraron perros estáticos")
+        for dog in static_dogs:
+            if dog.image:
+                dog.image = f'{API_URL}/dog/static_dog/{dog.id}/image'
+        return dump_json(STATIC_DOG_LIST_ADAPTER, static_dogs)
+
+    return versioned_json_response(request, read_collection_version(db, StaticDog), build)
 
 
 @router.get('/static_dog/{dog_id}', response_model=StaticDogResponse)
-def get_static_dogs_by_id(dog_id: int, db: Session = Depends(get_db)):
+def get_static_dogs_by_id(dog_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selection = parse_field_selection(fields, None, DOG_FIELDS)
+    if selection is not None:
+        dogs = sparse_dogs(db, StaticDog, "static_dog", selection, [dog_id])
+        if not dogs:
+            raise HTTPException(status_code=404, detail="No se encontraron perros estáticos")
+        return Response(content=dump_rows_json(dogs[0]), media_type="application/json")
     static_dog = read_static_dogs_by_id(db, dog_id)
 
     if not static_dog:
@@ -137,18 +245,18 @@ def get_static_dogs_by_id(dog_id: int, db: Session = Depends(get_db)):
 
 @router.get("/static_dog/{dog_id}/image", response_class=StreamingResponse)
 def get_static_dog_image(dog_id: int, db: Session = Depends(get_db)):
-    static_dog = read_static_dogs_by_id(db, dog_id)
-    if not static_dog or not static_dog.image:
+    image = read_dog_image(db, StaticDog, dog_id)
+    if not image:
         raise HTTPException(status_code=404, detail="Imagen no encontrada")
 
-    return StreamingResponse(io.BytesIO(static_dog.image), media_type="image/jpeg")
+    return StreamingResponse(io.BytesIO(image), media_type="image/jpeg")
 
 
 @router.put('/static_dog/update/{id_dog}', response_model=dict)
 async def update_a_static_dog(id_dog: int,
                               dog: StaticDogCreate,
                               db: Session = Depends(get_db),
-                              current_user: TokenData = Depends(get_current_user)):
+                              current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
     English:
     --------
@@ -199,8 +307,6 @@ async def update_a_static_dog(id_dog: int,
     - **operation** (optional): Especifica la/las operaciones del perro.
     """
     # TODO validar en caso de que se actualice también el id
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
 
     if dog.image:
         try:
@@ -228,12 +334,10 @@ async def update_a_static_dog(id_dog: int,
 
 @router.delete('/static_dog/delete/{id_static_dog}', response_model=dict)
 def delete_static_dog_by_id(id_static_dog: int, db: Session = Depends(get_db),
-                            current_user: TokenData = Depends(get_current_user)):
+                            current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
     Endpoint para borrar un perro estatico.
     """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     dog_response = delete_an_static_dog_by_id(db, id_static_dog)
     if dog_response:
         return {"success": True, "message": "Perro Permanente Borrado"}
@@ -245,7 +349,7 @@ def delete_static_dog_by_id(id_static_dog: int, db: Session = Depends(get_db),
 
 @router.post('/adoption_dog/create/', response_model=dict)
 def create_new_adoption_dog(dog: AdoptionDogCreate, db: Session = Depends(get_db),
-                            current_user: TokenData = Depends(get_current_user)):
+                            current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
     English:
     --------
@@ -295,8 +399,6 @@ def create_new_adoption_dog(dog: AdoptionDogCreate, db: Session = Depends(get_db
         - **false**: El perro no esta desparasitado.
     - **operation** (optional): Especifica la/las operaciones del perro.
     """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     image_data = None
     if dog.image:
         try:
@@ -316,9 +418,38 @@ def create_new_adoption_dog(dog: AdoptionDogCreate, db: Session = Depends(get_db
     return result
 
 
+@router.post('/adoption_dog/adopt/batch', response_model=AdoptionBatchResponse)
+def adopt_dogs_in_batch(items: List[AdoptionBatchItem], db: Session = Depends(get_db),
+                        current_user: TokenData = Depends(require_roles(Role.ADMIN))):
+    """
+    English:
+    --------
+    Adopt several dogs in a single transaction. Each entry has:
+
+    - **dog_id** (required): id of the adoption dog to be adopted.
+    - **adoption_date** (required): Date of the adoption in format YYYY-MM-DD.
+    - **owner_id** (optional): Id of an existing owner.
+    - **owner** (optional): New owner with **name**, **direction** and **cellphone**.
+
+    Exactly one of **owner_id** or **owner** must be sent. The response has the result of each entry.
+
+    Español:
+    --------
+    Adoptar varios perros en una sola transacción. Cada entrada tiene:
+
+    - **dog_id** (required): id del perro de adopción.
+    - **adoption_date** (required): Fecha de la adopción en formato YYYY-MM-DD.
+    - **owner_id** (optional): Id de un Dueño existente.
+    - **owner** (optional): Dueño nuevo con **name**, **direction** y **cellphone**.
+
+    Se debe enviar **owner_id** u **owner**, pero no ambos. La respuesta tiene el resultado de cada entrada.
+    """
+    return adopt_dogs_batch(db, items)
+
+
 @router.post('/adoption_dog/adopt/{dog_id}/{adoption_date}', response_model=dict)
 def adopt_dog_by_id(dog_id: int, adoption_date: date, owner: OwnerCreate, db: Session = Depends(get_db),
-                    current_user: TokenData = Depends(get_current_user)):
+                    current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
     English:
     --------
@@ -342,21 +473,14 @@ def adopt_dog_by_id(dog_id: int, adoption_date: date, owner: OwnerCreate, db: Se
     - **direction** (required): Dirección del dueño.
     - **cellphone** (required): Teléfono del dueño.
     """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    adoption_dog = read_adoption_dog_by_id(db, dog_id)
-
-    if adoption_dog is None:
-        raise HTTPException(status_code=404, detail="No existe")
-    adopted_dog = adoption_dog.adopt(adoption_date, owner)
-    result = create_owner_and_adopted_dog(db, adopted_dog)
+    result = create_owner_and_adopted_dog(db, dog_id, adoption_date, owner)
     return result
 
 
 @router.post('/adoption_dog/adopt/{dog_id}/{owner_id}/{adoption_date}', response_model=dict)
 def adopt_dog_by_id_and_existing_owner(dog_id: int, adoption_date: date, owner_id: int,
                                        db: Session = Depends(get_db),
-                                       current_user: TokenData = Depends(get_current_user)):
+                                       current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
     English:
     --------
@@ -374,65 +498,95 @@ def adopt_dog_by_id_and_existing_owner(dog_id: int, adoption_date: date, owner_i
     - **adoption_date** (required): Fecha de la adopción en formatoYYYY-MM-DD.
     - **owner_id** (required): Id de un Dueño existente.
     """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    adoption_dog = read_adoption_dog_by_id(db, dog_id)
-    if adoption_dog is None:
-        raise HTTPException(status_code=404, detail="Perro de adopción no existe")
-    owner = read_owner_by_id(db, owner_id)
-    if owner is None:
-        raise HTTPException(status_code=404, detail="Dueño no existe")
-    adopted_dog = adoption_dog.adopt_existing_owner(adoption_date, owner)
-    result = adopt_dog(db, adopted_dog)
+    result = adopt_dog_with_existing_owner(db, dog_id, adoption_date, owner_id)
     return result
 
 
-@router.get('/adoption_dog/', response_model=List[StaticDogResponse])
-def get_adoption_dogs(db: Session = Depends(get_db)):
+@router.get('/adoption_dog/', response_model=Union[List[StaticDogResponse], AdoptionDogFacetedResponse])
+def get_adoption_dogs(request: Request, filters: AdoptionDogFilters = Depends(adoption_dog_filters),
+                      fields: Optional[str] = None, with_facets: bool = False, db: Session = Depends(get_db)):
     """
     Endpoint para obtener todos los perros dee adopcion.
+
+    La respuesta se guarda en caché hasta que cambie algún perro de adopción y
+    responde 304 si el `If-None-Match` coincide con la versión actual de la colección.
+    Con `fields` solo se consultan y devuelven esos campos.
+
+    Filtros opcionales: `gender`, `is_vaccinated`, `is_sterilized`, `is_dewormed`,
+    `min_age`/`max_age` y `entry_date_from`/`entry_date_to`. Con `with_facets=true`
+    la respuesta es `{total, results, facets}`, donde `facets` tiene la cantidad de
+    perros por cada valor de los filtros.
     """
-    adoption_dog = read_all_adoption_dogs(db)
-    if not adoption_dog:
-        raise HTTPException(status_code=404, detail="No se encontraron perros en adopcion")
+    selection = parse_field_selection(fields, None, DOG_FIELDS)
 
-    for dog in adoption_dog:
-        if dog.image:
-            dog.image = f'{API_URL}/dog/adoption_dog/{dog.id}/image'
+    def build() -> bytes:
+        if selection is not None:
+            adoption_dog = sparse_dogs(db, AdoptionDog, "adoption_dog", selection,
+                                       conditions=adoption_dog_conditions(filters))
         else:
-            dog.image = None
-    return adoption_dog
+            adoption_dog = read_all_adoption_dogs(db, filters)
+            for dog in adoption_dog:
+                if dog.image:
+                    dog.image = f'{API_URL}/dog/adoption_dog/{dog.id}/image'
+                else:
+                    dog.image = None
+        if with_facets:
+            # Con facetas una lista vacía es una respuesta válida: los conteos dicen qué filtro cambiar
+            total, facets = read_adoption_dog_facets(db, filters)
+            body = {"total": total, "results": adoption_dog, "facets": facets}
+            return dump_rows_json(body) if selection is not None else dump_json(ADOPTION_DOG_FACETED_ADAPTER, body)
+        if not adoption_dog:
+            raise HTTPException(status_code=404, detail="No se encontraron perros en adopcion")
+        if selection is not None:
+            return dump_rows_json(adoption_dog)
+        return dump_json(STATIC_DOG_LIST_ADAPTER, adoption_dog)
+
+    return versioned_json_response(request, read_collection_version(db, AdoptionDog), build, ADOPTION_DOGS)
 
 
 @router.get('/adoption_dog/{dog_id}', response_model=StaticDogResponse)
-def get_adoption_dogs_by_id(dog_id: int, db: Session = Depends(get_db)):
+def get_adoption_dogs_by_id(dog_id: int, request: Request, fields: Optional[str] = None,
+                            db: Session = Depends(get_db)):
     """
     Endpoint para obtener un perro de adopcion.
+
+    La respuesta se guarda en caché hasta que cambie algún perro de adopción.
+    Con `fields` solo se consultan y devuelven esos campos.
     """
-    adoption_dog = read_adoption_dog_by_id(db, dog_id)
-    if not adoption_dog:
-        raise HTTPException(status_code=404, detail="No se encontraron perros de adopcion")
-    if adoption_dog.image:
-        adoption_dog.image = f'{API_URL}/dog/adoption_dog/{adoption_dog.id}/image'
-    else:
-        adoption_dog.image = None
-    return adoption_dog
+    selection = parse_field_selection(fields, None, DOG_FIELDS)
+
+    def build() -> bytes:
+        if selection is not None:
+            dogs = sparse_dogs(db, AdoptionDog, "adoption_dog", selection, [dog_id])
+            if not dogs:
+                raise HTTPException(status_code=404, detail="No se encontraron perros de adopcion")
+            return dump_rows_json(dogs[0])
+        adoption_dog = read_adoption_dog_by_id(db, dog_id)
+        if not adoption_dog:
+            raise HTTPException(status_code=404, detail="No se encontraron perros de adopcion")
+        if adoption_dog.image:
+            adoption_dog.image = f'{API_URL}/dog/adoption_dog/{adoption_dog.id}/image'
+        else:
+            adoption_dog.image = None
+        return StaticDogResponse.model_validate(adoption_dog).model_dump_json().encode()
+
+    return cached_json_response(ADOPTION_DOGS, request, build)
 
 
 @router.get("/adoption_dog/{dog_id}/image", response_class=StreamingResponse)
 def get_adoption_dog_image(dog_id: int, db: Session = Depends(get_db)):
-    adoption_dog = read_adoption_dog_by_id(db, dog_id)
-    if not adoption_dog or not adoption_dog.image:
+    image = read_dog_image(db, AdoptionDog, dog_id)
+    if not image:
         raise HTTPException(status_code=404, detail="Imagen no encontrada")
 
-    return StreamingResponse(io.BytesIO(adoption_dog.image), media_type="image/jpeg")
+    return StreamingResponse(io.BytesIO(image), media_type="image/jpeg")
 
 
 @router.put('/adoption_dog/update/{id_dog}', response_model=dict)
 async def update_an_adoption_dog(id_dog: int,
                                  dog: AdoptionDogCreate,
                                  db: Session = Depends(get_db),
-                                 current_user: TokenData = Depends(get_current_user)):
+                                 current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
     English:
     --------
@@ -481,8 +635,6 @@ async def update_an_adoption_dog(id_dog: int,
         - **false**: El perro no esta desparasitado.
     - **operation** (optional): Especifica la/las operaciones del perro.
     """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
 
     if dog.image:
         try:
@@ -510,12 +662,10 @@ async def update_an_adoption_dog(id_dog: int,
 
 @router.delete('/adoption_dog/delete/{id_adoption_dog}', response_model=dict)
 def delete_adoption_dog_by_id(id_adoption_dog: int, db: Session = Depends(get_db),
-                              current_user: TokenData = Depends(get_current_user)):
+                              current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
     Endpoint para borrar un perro de adopcion.
     """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     dog_response = delete_an_adoption_dog_by_id(db, id_adoption_dog)
     if dog_response:
         return {"success": True, "message": "Perro de adopcion Borrado"}
@@ -524,10 +674,21 @@ def delete_adoption_dog_by_id(id_adoption_dog: int, db: Session = Depends(get_db
 
 
 @router.get('/adopted_dog/', response_model=List[AdoptedDogResponse])
-def get_adopted_dogs(db: Session = Depends(get_db)):
+def get_adopted_dogs(request: Request, fields: Optional[str] = None, include: Optional[str] = None,
+                     db: Session = Depends(get_db)):
     """
     Endpoint para obtener todos los perros adoptados.
+
+    La respuesta se comprime con gzip o brotli si el cliente lo acepta.
+    Con `fields` solo se consultan y devuelven esos campos; el dueño solo se
+    consulta y descifra si se pide con `include=owner`.
     """
+    selection = parse_field_selection(fields, include, ADOPTED_DOG_FIELDS, ADOPTED_DOG_INCLUDES)
+    if selection is not None:
+        dogs = sparse_dogs(db, AdoptedDog, "adopted_dog", selection)
+        if not dogs:
+            raise HTTPException(status_code=404, detail="No se encontraron perros adoptados")
+        return compressed_json_response(request, dump_rows_json(dogs))
     adopted_dogs = read_all_adopted_dogs(db)
     if not adopted_dogs:
         raise HTTPException(status_code=404, detail="No se encontraron perros adoptados")
@@ -535,14 +696,23 @@ def get_adopted_dogs(db: Session = Depends(get_db)):
         # Codificar la imagen en Base64 si existe
         if dog.image:
             dog.image = f'{API_URL}/dog/adopted_dog/{dog.id}/image'
-    return adopted_dogs
+    return compressed_json_response(request, dump_json(ADOPTED_DOG_LIST_ADAPTER, adopted_dogs))
 
 
 @router.get('/adopted_dog/{dog_id}', response_model=AdoptedDogResponse)
-def get_adopted_dog_by_id(dog_id: int, db: Session = Depends(get_db)):
+def get_adopted_dog_by_id(dog_id: int, fields: Optional[str] = None, include: Optional[str] = None,
+                          db: Session = Depends(get_db)):
     """
     Endpoint para obtener un perro adoptado.
+
+    Acepta `fields` e `include=owner` igual que el listado.
     """
+    selection = parse_field_selection(fields, include, ADOPTED_DOG_FIELDS, ADOPTED_DOG_INCLUDES)
+    if selection is not None:
+        dogs = sparse_dogs(db, AdoptedDog, "adopted_dog", selection, [dog_id])
+        if not dogs:
+            raise HTTPException(status_code=404, detail="No se encontraron perros adoptados")
+        return Response(content=dump_rows_json(dogs[0]), media_type="application/json")
     adopted_dog = read_adopted_dogs_by_id(db, dog_id)
     if not adopted_dog:
         raise HTTPException(status_code=404, detail="No se encontraron perros adoptados")
@@ -553,18 +723,18 @@ def get_adopted_dog_by_id(dog_id: int, db: Session = Depends(get_db)):
 
 @router.get("/adopted_dog/{dog_id}/image", response_class=StreamingResponse)
 def get_adopted_dog_image(dog_id: int, db: Session = Depends(get_db)):
-    adopted_dog = read_adopted_dogs_by_id(db, dog_id)
-    if not adopted_dog or not adopted_dog.image:
+    image = read_dog_image(db, AdoptedDog, dog_id)
+    if not image:
         raise HTTPException(status_code=404, detail="Imagen no encontrada")
 
-    return StreamingResponse(io.BytesIO(adopted_dog.image), media_type="image/jpeg")
+    return StreamingResponse(io.BytesIO(image), media_type="image/jpeg")
 
 
 @router.put('/adopted_dog/update/{id_dog}', response_model=dict)
 async def update_an_adopted_dog(id_dog: int,
                                 dog: AdoptedDogUpdate,
                                 db: Session = Depends(get_db),
-                                current_user: TokenData = Depends(get_current_user)):
+                                current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
     English:
     --------
@@ -613,8 +783,6 @@ async def update_an_adopted_dog(id_dog: int,
         - **false**: El perro no esta desparasitado.
     - **operation** (optional): Especifica la/las operaciones del perro.
     """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
 
     if dog.image:
         try:
@@ -642,9 +810,6 @@ async def update_an_adopted_dog(id_dog: int,
 
 @router.post('/adopted_dog/unadopt/{dog_id}/', response_model=dict)
 def unadopt_dog_by_id(dog_id: int, db: Session = Depends(get_db),
-                      current_user: TokenData = Depends(get_current_user)):
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    adopted_dog = read_adopted_dogs_by_id(db, dog_id)
-    result = un_adopt_dog_service(db, adopted_dog)
+                      current_user: TokenData = Depends(require_roles(Role.ADMIN))):
+    result = un_adopt_dog_service(db, dog_id)
     return result
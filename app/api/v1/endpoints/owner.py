@@ -1,12 +1,14 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
-from app.core.security import get_current_user
+from app.core.compression import compressed_json_response
+from app.core.security import require_roles, ALL_AUTH_ROLES
 from app.crud.owner import update_owner_by_id, get_all_owners
 from app.db.session import get_db
 from app.models.domain.user import Role
+from app.models.schema.adapters import OWNER_LIST_ADAPTER, dump_json
 from app.models.schema.owner import OwnerUpdate, OwnerSecureResponse
 from app.models.schema.user import TokenData
 
@@ -17,30 +19,27 @@ router = APIRouter()
 def update_owner(id_owner: int,
                  owner: OwnerUpdate,
                  db: Session = Depends(get_db),
-                 current_user: TokenData = Depends(get_current_user)):
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+                 current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     response = update_owner_by_id(db, owner, id_owner)
     return response
 
 
 @router.get('/all/', response_model=List[OwnerSecureResponse])
-async def get_owners(db: Session = Depends(get_db),
-                     current_user: TokenData = Depends(get_current_user)):
+def get_owners(request: Request,
+               db: Session = Depends(get_db),
+               current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
     """
     English:
     --------
-    Get all visits.
+    Get all visits. The response is compressed with gzip or brotli when the client accepts it.
 
     Español:
     --------
-    Lee todas las visitas.
+    Lee todas las visitas. La respuesta se comprime con gzip o brotli si el cliente lo acepta.
 
     """
-    if current_user.role.value not in [Role.ADMIN, Role.AUXILIAR]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     owners = get_all_owners(db)
     if not owners:
         raise HTTPException(status_code=404, detail="No hay visitas")
-    return owners
+    return compressed_json_response(request, dump_json(OWNER_LIST_ADAPTER, owners))
 
@@ -0,0 +1,102 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+
+from app.core.security import require_roles, ALL_AUTH_ROLES
+from app.crud.rollup import read_daily_trend
+from app.db.session import get_db
+from app.models.domain.rollup import DailyAdoptionStats, DailyVisitStats
+from app.models.schema.stats import DashboardStats, TrendMetric, TrendPeriod, TrendResponse, CohortBy, \
+    CohortAnalyticsResponse
+from app.models.schema.user import TokenData
+from app.services.cohort_analytics import numpy_available
+from app.services.stats_service import dashboard_stats_json, cohort_analytics_json
+
+router = APIRouter()
+
+TREND_ROLLUPS = {
+    TrendMetric.ADOPTIONS: DailyAdoptionStats,
+    TrendMetric.VISITS: DailyVisitStats,
+}
+
+
+@router.get('/', response_model=DashboardStats)
+def get_dashboard_stats(db: Session = Depends(get_db),
+                        current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
+    """
+    English:
+    --------
+    Dashboard statistics: dogs per category, vaccinated and sterilized ratios, adoptions and visits per
+    month, average days from entry to adoption and open seats in current courses.
+
+    The values are cached for a few minutes (`STATS_CACHE_TTL`), so they may lag slightly behind.
+
+    Español:
+    --------
+    Estadísticas del panel: perros por tipo, proporción de vacunados y esterilizados, adopciones y
+    visitas por mes, promedio de días entre el ingreso y la adopción y cupos libres en los cursos vigentes.
+
+    Los valores se guardan unos minutos (`STATS_CACHE_TTL`), por lo que pueden tener un pequeño retraso.
+    """
+    return Response(content=dashboard_stats_json(db), media_type="application/json")
+
+
+@router.get('/trends', response_model=TrendResponse)
+def get_trends(metric: TrendMetric, period: TrendPeriod = TrendPeriod.MONTH,
+               start: Optional[date] = None, end: Optional[date] = None,
+               db: Session = Depends(get_db),
+               current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
+    """
+    English:
+    --------
+    Adoption or visit totals over time, read from the daily rollup tables:
+
+    - **metric** (required): `adoptions` or `visits`.
+    - **period** (optional): `day`, `month` (default) or `year`.
+    - **start**, **end** (optional): date range in format YYYY-MM-DD.
+
+    Español:
+    --------
+    Adopciones o visitas en el tiempo, leídas de las tablas de resumen diario:
+
+    - **metric** (required): `adoptions` o `visits`.
+    - **period** (optional): `day`, `month` (por defecto) o `year`.
+    - **start**, **end** (optional): rango de fechas en formato YYYY-MM-DD.
+    """
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start no puede ser posterior a end")
+    points = read_daily_trend(db, TREND_ROLLUPS[metric], period.value, start, end)
+    return TrendResponse(metric=metric, period=period, points=points)
+
+
+@router.get('/cohorts', response_model=CohortAnalyticsResponse)
+def get_cohort_analytics(cohort_by: CohortBy = CohortBy.ENTRY_YEAR,
+                         within_days: int = Query(30, ge=1, le=3650),
+                         db: Session = Depends(get_db),
+                         current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
+    """
+    English:
+    --------
+    Cohort analytics over the whole adoption history:
+
+    - **cohort_by** (optional): `entry_year` (default), `gender` or `age_band`.
+    - **within_days** (optional): window for the first follow-up visit, 30 by default.
+
+    Returns the time-to-adoption distribution per cohort, the share of adopted dogs visited within
+    `within_days` days of adoption and percentiles of the days between visits. Requires NumPy.
+
+    Español:
+    --------
+    Análisis por cohortes de todo el historial de adopciones:
+
+    - **cohort_by** (optional): `entry_year` (por defecto), `gender` o `age_band`.
+    - **within_days** (optional): plazo para la primera visita de seguimiento, 30 por defecto.
+
+    Devuelve la distribución del tiempo hasta la adopción por cohorte, la proporción de perros
+    adoptados visitados dentro de `within_days` días y los percentiles de días entre visitas. Requiere NumPy.
+    """
+    if not numpy_available():
+        raise HTTPException(status_code=503, detail="El análisis por cohortes requiere NumPy instalado")
+    return Response(content=cohort_analytics_json(db, cohort_by.value, within_days), media_type="application/json")
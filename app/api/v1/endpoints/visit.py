@@ -1,36 +1,39 @@
 import base64
 import binascii
 import io
-import os
-from typing import List
+from typing import List, Optional, Union
 
-from dotenv import load_dotenv
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.crud.dog import read_adopted_dogs_by_id
+from app.crud.dog import read_adopted_dogs_by_id, read_dogs_sparse
 from app.crud.visit import create_a_visit, get_all_visits, get_all_visits_by_dog, read_visit_by_id, update_visit, \
-    delete_visit_by_id
+    delete_visit_by_id, read_visits_normalized, read_visits_sparse, select_visit_dog_ids
 from app.db.session import get_db
-from app.core.security import get_current_user
+from app.core.compression import compressed_json_response
+from app.core.config import settings
+from app.core.security import require_roles, ALL_AUTH_ROLES
+from app.models.schema.adapters import VISIT_LIST_ADAPTER, VISIT_LIST_NORMALIZED_ADAPTER, dump_json, json_response
 from app.models.schema.user import TokenData
-from app.models.schema.visit import VisitCreate, VisitResponse, VisitUpdate
+from app.models.schema.visit import VisitCreate, VisitResponse, VisitUpdate, VisitListFormat, \
+    VisitListNormalizedResponse
 
+from app.models.domain.dog import AdoptedDog
 from app.models.domain.user import Role
+from app.services.field_selection import VISIT_FIELDS, VISIT_INCLUDES, ADOPTED_DOG_FIELDS, FieldSelection, \
+    parse_field_selection, replace_flag_with_url, dump_rows_json
 from app.services.images_control_service import verify_image_size
 
 router = APIRouter()
 
-load_dotenv()
-
-API_URL = os.getenv("API_URL")
+API_URL = settings.API_URL
 
 
 @router.post('/create/', response_model=dict)
 async def create_new_visit(visit: VisitCreate,
                            db: Session = Depends(get_db),
-                           current_user: TokenData = Depends(get_current_user)):
+                           current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
     """
     English:
     --------
@@ -51,8 +54,6 @@ async def create_new_visit(visit: VisitCreate,
     - **adopted_dog_id** (required): id del perro visitado.
     """
 
-    if current_user.role.value not in [Role.ADMIN, Role.AUXILIAR]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     image_data = None
     if visit.evidence:
         try:
@@ -76,21 +77,81 @@ async def create_new_visit(visit: VisitCreate,
     return result
 
 
-@router.get('/all/', response_model=List[VisitResponse])
-async def get_visits(db: Session = Depends(get_db),
-                     current_user: TokenData = Depends(get_current_user)):
+def normalized_visit_list(db: Session, dog_id: Optional[int] = None) -> bytes:
+    data = read_visits_normalized(db, dog_id)
+    if not data["visits"]:
+        raise HTTPException(status_code=404, detail="No hay visitas")
+    for visit in data["visits"]:
+        visit["evidence"] = f'{API_URL}/visits/{visit["id"]}/evidence' if visit.pop("has_evidence") else None
+    for dog in data["dogs"].values():
+        dog["image"] = f'{API_URL}/dog/adopted_dog/{dog["id"]}/image' if dog.pop("has_image") else None
+    return dump_json(VISIT_LIST_NORMALIZED_ADAPTER, data)
+
+
+def sparse_visit_list(db: Session, selection: FieldSelection, dog_id: Optional[int] = None,
+                      visit_id: Optional[int] = None) -> List[dict]:
+    """
+    Visitas con solo los campos pedidos. El perro se agrega si se pide
+    `adopted_dog` u `owner`, y el dueño (descifrado) solo con `owner`.
+    """
+    fields = list(selection.fields)
+    if selection.include and "adopted_dog_id" not in fields:
+        fields.append("adopted_dog_id")
+    visits = read_visits_sparse(db, fields, dog_id, visit_id)
+    if not visits:
+        raise HTTPException(status_code=404, detail="No hay visitas")
+    replace_flag_with_url(visits, "evidence", lambda id_visit: f'{API_URL}/visits/{id_visit}/evidence')
+    if selection.include:
+        # Los perros se filtran con una subconsulta: una lista de ids puede pasar los 2100 parámetros de SQL Server
+        dogs = read_dogs_sparse(db, AdoptedDog, ADOPTED_DOG_FIELDS, "owner" in selection.include,
+                                conditions=[AdoptedDog.id.in_(select_visit_dog_ids(dog_id, visit_id))])
+        replace_flag_with_url(dogs, "image", lambda dog_id: f'{API_URL}/dog/adopted_dog/{dog_id}/image')
+        dogs_by_id = {dog["id"]: dog for dog in dogs}
+        for visit in visits:
+            visit["adopted_dog"] = dogs_by_id.get(visit["adopted_dog_id"])
+    return visits
+
+
+def parse_visit_selection(fields: Optional[str], include: Optional[str],
+                          format: VisitListFormat = VisitListFormat.EMBEDDED) -> Optional[FieldSelection]:
+    selection = parse_field_selection(fields, include, VISIT_FIELDS, VISIT_INCLUDES)
+    if selection is not None and format == VisitListFormat.NORMALIZED:
+        raise HTTPException(status_code=400, detail="`fields` e `include` no se pueden usar con format=normalized")
+    return selection
+
+
+@router.get('/all/', response_model=Union[List[VisitResponse], VisitListNormalizedResponse])
+def get_visits(request: Request,
+               format: VisitListFormat = VisitListFormat.EMBEDDED,
+               fields: Optional[str] = None,
+               include: Optional[str] = None,
+               db: Session = Depends(get_db),
+               current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
     """
     English:
     --------
-    Get all visits.
+    Get all visits. The response is compressed with gzip or brotli when the client accepts it.
+
+    - **format** (optional): `embedded` (default) nests the dog and its owner in every visit; `normalized`
+      returns `visits` with `adopted_dog_id` plus `dogs` and `owners` maps, each entity only once.
+    - **fields** (optional): comma separated visit fields to return, e.g. `id,visit_date`.
+    - **include** (optional): `adopted_dog` and/or `owner`; without it the dog and owner are not loaded.
 
     Español:
     --------
-    Lee todas las visitas.
+    Lee todas las visitas. La respuesta se comprime con gzip o brotli si el cliente lo acepta.
+
+    - **format** (opcional): `embedded` (por defecto) incluye el perro y su dueño en cada visita; `normalized`
+      devuelve `visits` con `adopted_dog_id` y los mapas `dogs` y `owners`, cada uno una sola vez.
+    - **fields** (opcional): campos de la visita separados por coma, por ejemplo `id,visit_date`.
+    - **include** (opcional): `adopted_dog` y/o `owner`; sin él no se consultan el perro ni el dueño.
 
     """
-    if current_user.role.value not in [Role.ADMIN, Role.AUXILIAR]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    selection = parse_visit_selection(fields, include, format)
+    if selection is not None:
+        return compressed_json_response(request, dump_rows_json(sparse_visit_list(db, selection)))
+    if format == VisitListFormat.NORMALIZED:
+        return compressed_json_response(request, normalized_visit_list(db))
     visits_raw = get_all_visits(db)
     if not visits_raw:
         raise HTTPException(status_code=404, detail="No hay visitas")
@@ -103,24 +164,38 @@ async def get_visits(db: Session = Depends(get_db),
             visit.evidence = f'{API_URL}/visits/{visit.id}/evidence'
         visits.append(visit)
 
-    return visits
+    return compressed_json_response(request, dump_json(VISIT_LIST_ADAPTER, visits))
 
 
-@router.get('/all/{dog_id}', response_model=List[VisitResponse])
-async def get_visits_by_dog_id(dog_id: int, db: Session = Depends(get_db),
-                               current_user: TokenData = Depends(get_current_user)):
+@router.get('/all/{dog_id}', response_model=Union[List[VisitResponse], VisitListNormalizedResponse])
+def get_visits_by_dog_id(dog_id: int,
+                         format: VisitListFormat = VisitListFormat.EMBEDDED,
+                         fields: Optional[str] = None,
+                         include: Optional[str] = None,
+                         db: Session = Depends(get_db),
+                         current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
     """
     English:
     --------
     Get all visits by dog id.
 
+    - **format** (optional): `embedded` (default) or `normalized`, as in `/visits/all/`.
+    - **fields**, **include** (optional): as in `/visits/all/`.
+
     Español:
     --------
     Lee todas las visitas por el id del perro.
 
+    - **format** (opcional): `embedded` (por defecto) o `normalized`, igual que en `/visits/all/`.
+    - **fields**, **include** (opcional): igual que en `/visits/all/`.
+
     """
-    if current_user.role.value not in [Role.ADMIN, Role.AUXILIAR]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    selection = parse_visit_selection(fields, include, format)
+    if selection is not None:
+        return Response(content=dump_rows_json(sparse_visit_list(db, selection, dog_id=dog_id)),
+                        media_type="application/json")
+    if format == VisitListFormat.NORMALIZED:
+        return Response(content=normalized_visit_list(db, dog_id), media_type="application/json")
     image_data = None
     visits_raw = get_all_visits_by_dog(db, dog_id)
     if not visits_raw:
@@ -139,24 +214,31 @@ async def get_visits_by_dog_id(dog_id: int, db: Session = Depends(get_db),
             pass
         visits.append(visit)
 
-    return visits
+    return json_response(VISIT_LIST_ADAPTER, visits)
 
 
 @router.get('/{visit_id}', response_model=VisitResponse)
-async def get_visit_by_id(visit_id: int, db: Session = Depends(get_db),
-                          current_user: TokenData = Depends(get_current_user)):
+async def get_visit_by_id(visit_id: int, fields: Optional[str] = None, include: Optional[str] = None,
+                          db: Session = Depends(get_db),
+                          current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
     """
     English:
     --------
     Get a visits by id.
 
+    - **fields**, **include** (optional): as in `/visits/all/`.
+
     Español:
     --------
     Lee una las visitas por el id.
 
+    - **fields**, **include** (opcional): igual que en `/visits/all/`.
+
     """
-    if current_user.role.value not in [Role.ADMIN, Role.AUXILIAR]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    selection = parse_visit_selection(fields, include)
+    if selection is not None:
+        visits = sparse_visit_list(db, selection, visit_id=visit_id)
+        return Response(content=dump_rows_json(visits[0]), media_type="application/json")
     visit = read_visit_by_id(db, visit_id)
     if not visit:
         raise HTTPException(status_code=404, detail="No hay visitas")
@@ -172,9 +254,7 @@ async def get_visit_by_id(visit_id: int, db: Session = Depends(get_db),
 
 @router.get("/{visit_id}/evidence", response_class=StreamingResponse)
 def get_visit_evidence(visit_id: int, db: Session = Depends(get_db),
-                       current_user: TokenData = Depends(get_current_user)):
-    if current_user.role.value not in [Role.ADMIN, Role.AUXILIAR]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+                       current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
     visit = read_visit_by_id(db, visit_id)
     if not visit or not visit.evidence:
         raise HTTPException(status_code=404, detail="Imagen no encontrada")
@@ -184,7 +264,7 @@ def get_visit_evidence(visit_id: int, db: Session = Depends(get_db),
 
 @router.put('/update/', response_model=dict)
 async def update_visit_by_id(visit_update: VisitUpdate, db: Session = Depends(get_db),
-                             current_user: TokenData = Depends(get_current_user)):
+                             current_user: TokenData = Depends(require_roles(*ALL_AUTH_ROLES))):
     """
     English:
     --------
@@ -206,8 +286,6 @@ async def update_visit_by_id(visit_update: VisitUpdate, db: Session = Depends(ge
     - **adopted_dog_id** (required): id del perro visitado.
     - **id** (required): id de la visita a ser actualizada.
     """
-    if current_user.role.value not in [Role.ADMIN, Role.AUXILIAR]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     # Verificamos la imagen
     image_data = None
     if visit_update.evidence:
@@ -237,7 +315,7 @@ async def update_visit_by_id(visit_update: VisitUpdate, db: Session = Depends(ge
 
 @router.delete('/delete/{id_visit}', response_model=dict)
 def delete_a_visit_by_id(id_visit: int, db: Session = Depends(get_db),
-                         current_user: TokenData = Depends(get_current_user)):
+                         current_user: TokenData = Depends(require_roles(Role.ADMIN))):
     """
     English:
     --------
@@ -251,7 +329,5 @@ def delete_a_visit_by_id(id_visit: int, db: Session = Depends(get_db),
 
     - **id_visit** (required): ID de la visita.
     """
-    if current_user.role.value not in [Role.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     visit_response = delete_visit_by_id(db, id_visit)
     return visit_response
@@ -0,0 +1,88 @@
+# app/cli.py
+"""
+Comandos de administración.
+
+Uso:
+    python -m app.cli import <static_dog|adoption_dog|adopted_dog|visit> <archivo> [--format csv|ndjson]
+    python -m app.cli create-admin
+    python -m app.cli reconcile-rollups [--since YYYY-MM-DD]
+"""
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+from app.core.init_data import create_admin_user
+from app.crud.rollup import reconcile_rollups
+from app.db.database import SessionLocal
+from app.models.schema.bulk_import import ImportKind, ImportFormat
+# Registra la invalidación de la caché del catálogo para las importaciones
+import app.services.catalog_cache  # noqa: F401
+from app.services.bulk_import_service import import_records, detect_format, IMPORT_CHUNK_SIZE
+
+
+def import_command(args) -> int:
+    file_format = ImportFormat(args.format) if args.format else detect_format(args.path)
+    if file_format is None:
+        print("Formato de archivo no soportado, use --format", file=sys.stderr)
+        return 2
+    content = Path(args.path).read_text(encoding="utf-8-sig")
+    db = SessionLocal()
+    try:
+        report = import_records(db, ImportKind(args.kind), content, file_format, args.chunk_size)
+    finally:
+        db.close()
+    print(f"Filas leídas: {report.total}, insertadas: {report.inserted}, con errores: {len(report.errors)}")
+    for error in report.errors:
+        print(f"  fila {error.row}: {error.detail}")
+    return 1 if report.errors else 0
+
+
+def create_admin_command(args) -> int:
+    # Con STARTUP_MODE=fast el administrador ya no se crea al iniciar, se crea una vez con este comando
+    created = create_admin_user()
+    print("Administrador creado" if created else "Ya existe un administrador")
+    return 0
+
+
+def reconcile_rollups_command(args) -> int:
+    # Pensado para ejecutarse cada noche (cron o tarea programada) fuera del horario de atención
+    db = SessionLocal()
+    try:
+        corrected = reconcile_rollups(db, args.since)
+    finally:
+        db.close()
+    for table, days in corrected.items():
+        print(f"{table}: {days} días corregidos")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Comandos de administración")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Importación masiva de perros o visitas")
+    import_parser.add_argument("kind", choices=[kind.value for kind in ImportKind])
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=[file_format.value for file_format in ImportFormat])
+    import_parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    import_parser.set_defaults(func=import_command)
+
+    admin_parser = subparsers.add_parser("create-admin", help="Crea el usuario administrador inicial si no existe")
+    admin_parser.set_defaults(func=create_admin_command)
+
+    rollup_parser = subparsers.add_parser("reconcile-rollups",
+                                          help="Recalcula los resúmenes diarios de adopciones y visitas")
+    rollup_parser.add_argument("--since", type=date.fromisoformat,
+                               help="Solo reconcilia desde esta fecha (YYYY-MM-DD); por defecto todo el historial")
+    rollup_parser.set_defaults(func=reconcile_rollups_command)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
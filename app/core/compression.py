@@ -0,0 +1,77 @@
+# app/core/compression.py
+import gzip
+from functools import lru_cache
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+
+COMPRESSION_MIN_SIZE = settings.COMPRESSION_MIN_SIZE
+GZIP_LEVEL = 6
+# Calidad intermedia: casi la misma proporción que 11 con una fracción del tiempo de CPU
+BROTLI_QUALITY = 5
+
+
+@lru_cache(maxsize=None)
+def _brotli():
+    """Brotli es opcional; si no está instalado solo se ofrece gzip."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def supported_encodings() -> list:
+    return ["br", "gzip"] if _brotli() is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Elige la codificación según `Accept-Encoding`: brotli si está disponible, luego gzip.
+
+    Respeta los valores `q`; `q=0` descarta la codificación.
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    candidates = [(accepted.get(name, accepted.get("*", 0.0)), -index, name)
+                  for index, name in enumerate(supported_encodings())]
+    quality, _, name = max(candidates)
+    return name if quality > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return _brotli().compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def should_compress(body: bytes) -> bool:
+    return len(body) >= COMPRESSION_MIN_SIZE
+
+
+def encoded_response(body: bytes, encoding: Optional[str], media_type: str = "application/json") -> Response:
+    """Respuesta con el cuerpo ya codificado; siempre indica `Vary` para los cachés intermedios."""
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def compressed_json_response(request: Request, body: bytes) -> Response:
+    """Comprime un cuerpo JSON si el cliente lo acepta y vale la pena por su tamaño."""
+    encoding = negotiate_encoding(request.headers.get("accept-encoding")) if should_compress(body) else None
+    return encoded_response(compress(body, encoding) if encoding else body, encoding)
@@ -1,7 +1,141 @@
-class Settings:
-    ADMIN_EMAIL = "admin@base.com"
-    ADMIN_USERNAME = "admin"
-    ADMIN_PASSWORD = "SecurePassword123"
+import ipaddress
+from functools import lru_cache
+from typing import Literal, Optional
 
+from pydantic import Field, field_validator, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-settings = Settings()
+
+class Settings(BaseSettings):
+    """
+    Configuración de la aplicación.
+
+    Los valores se leen de las variables de entorno o del archivo .env y se
+    validan al iniciar: una configuración inválida detiene el arranque en lugar
+    de fallar más tarde en una petición.
+    """
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+
+    APP_ENV: Literal["development", "production"] = "production"
+
+    # Administrador inicial
+    ADMIN_EMAIL: str = "admin@base.com"
+    ADMIN_USERNAME: str = "admin"
+    ADMIN_PASSWORD: str = "SecurePassword123"
+
+    # Token JWT
+    SECRET_KEY: str = Field(min_length=1)
+    ALGORITHM: str = Field(min_length=1)
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(gt=0)
+
+    # Cifrado de datos personales e imágenes
+    AES_KEY: str
+
+    # Base de datos
+    DATABASE_USER: Optional[str] = None
+    DATABASE_PASSWORD: Optional[str] = None
+    DATABASE_HOST: Optional[str] = None
+    DATABASE_PORT: Optional[str] = None
+    DATABASE_NAME: Optional[str] = None
+    DB_POOL_SIZE: int = Field(default=5, ge=1)
+    # "full" crea tablas y administrador al iniciar; "fast" confía en la revisión de Alembic
+    STARTUP_MODE: Literal["full", "fast"] = "full"
+
+    # URL pública de la API para armar los enlaces de las imágenes
+    API_URL: Optional[str] = None
+    # Tamaño máximo de las imágenes recibidas, en bytes
+    MAX_IMAGE_SIZE: int = Field(default=5 * 1024 * 1024, gt=0)
+    # Filas por transacción en la importación masiva
+    IMPORT_CHUNK_SIZE: int = Field(default=500, ge=1)
+    # Hilos para los endpoints síncronos (por defecto AnyIO usa 40)
+    THREADPOOL_SIZE: int = Field(default=40, ge=1)
+
+    # Caché de usuarios autenticados
+    CURRENT_USER_CACHE_TTL: int = Field(default=60, ge=0)
+    CURRENT_USER_CACHE_SIZE: int = Field(default=1024, ge=0)
+
+    # bcrypt: costo fijo si se define BCRYPT_ROUNDS, si no se calibra al iniciar; los hashes con
+    # un costo entre BCRYPT_MIN_ROUNDS y BCRYPT_MAX_ROUNDS se aceptan sin volver a generarlos
+    BCRYPT_ROUNDS: Optional[int] = Field(default=None, ge=4, le=31)
+    BCRYPT_MIN_ROUNDS: int = Field(default=10, ge=4, le=31)
+    BCRYPT_MAX_ROUNDS: int = Field(default=14, ge=4, le=31)
+    BCRYPT_TARGET_MS: float = Field(default=250, gt=0)
+    PASSWORD_HASH_WORKERS: int = Field(default=2, ge=1)
+    PASSWORD_HASH_MAX_QUEUE: int = Field(default=64, ge=1)
+
+    # Límite de intentos
+    RATE_LIMIT_STORE: Literal["memory", "sqlite"] = "memory"
+    RATE_LIMIT_SQLITE_PATH: str = "rate_limit.sqlite3"
+    # Proxies de confianza (IPs o redes separadas por comas, p. ej. el ingress de Azure Container Apps):
+    # solo a las peticiones que llegan desde ellos se les toma la IP del cliente de X-Forwarded-For
+    TRUSTED_PROXIES: str = ""
+
+    # Caché de respuestas del catálogo público
+    RESPONSE_CACHE_BACKEND: Literal["memory", "sqlite"] = "memory"
+    RESPONSE_CACHE_SQLITE_PATH: str = "response_cache.sqlite3"
+    RESPONSE_CACHE_TTL: float = Field(default=300, ge=0)
+    RESPONSE_CACHE_SIZE: int = Field(default=512, ge=0)
+    # Cache-Control de los listados públicos: segundos frescos y segundos servibles mientras se revalida
+    CATALOG_MAX_AGE: int = Field(default=60, ge=0)
+    CATALOG_STALE_WHILE_REVALIDATE: int = Field(default=300, ge=0)
+    # Búsqueda de perros: "memory" (índice invertido por proceso) o "database" (LIKE en la base)
+    DOG_SEARCH_BACKEND: Literal["memory", "database"] = "memory"
+    # Respuestas JSON más pequeñas que este tamaño (bytes) se envían sin comprimir
+    COMPRESSION_MIN_SIZE: int = Field(default=1024, ge=0)
+
+    # Segundos que se guardan las estadísticas del panel
+    STATS_CACHE_TTL: float = Field(default=300, ge=0)
+
+    # Correo
+    MAIL_USERNAME: Optional[str] = None
+    MAIL_PASSWORD: Optional[str] = None
+    SMTP_HOST: str = "smtp.gmail.com"
+    SMTP_PORT: int = Field(default=465, ge=1, le=65535)
+    SMTP_USE_TLS: bool = True
+    SMTP_POOL_SIZE: int = Field(default=2, ge=1)
+    SMTP_TIMEOUT: float = Field(default=30, gt=0)
+    TEMPLATE_CACHE_DIR: Optional[str] = None
+
+    # Bandeja de salida
+    OUTBOX_WORKER_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = Field(default=20, ge=1)
+    OUTBOX_POLL_SECONDS: float = Field(default=5, gt=0)
+    OUTBOX_MAX_ATTEMPTS: int = Field(default=6, ge=1)
+    OUTBOX_BASE_BACKOFF: float = Field(default=30, gt=0)
+    OUTBOX_MAX_BACKOFF: float = Field(default=3600, gt=0)
+    OUTBOX_LEASE_SECONDS: float = Field(default=300, gt=0)
+
+    # Notificaciones de cursos: solicitantes que se leen y encolan por lote
+    NOTIFICATION_BATCH_SIZE: int = Field(default=200, ge=1)
+
+    @field_validator("AES_KEY")
+    @classmethod
+    def validate_aes_key(cls, value: str) -> str:
+        if len(value.encode()) not in (16, 24, 32):
+            raise ValueError("AES_KEY debe tener 16, 24 o 32 bytes")
+        return value
+
+    @field_validator("TRUSTED_PROXIES")
+    @classmethod
+    def validate_trusted_proxies(cls, value: str) -> str:
+        for network in value.split(","):
+            if network.strip():
+                ipaddress.ip_network(network.strip(), strict=False)
+        return value
+
+    @model_validator(mode="after")
+    def validate_ranges(self):
+        if self.BCRYPT_MIN_ROUNDS > self.BCRYPT_MAX_ROUNDS:
+            raise ValueError("BCRYPT_MIN_ROUNDS no puede ser mayor que BCRYPT_MAX_ROUNDS")
+        if self.OUTBOX_BASE_BACKOFF > self.OUTBOX_MAX_BACKOFF:
+            raise ValueError("OUTBOX_BASE_BACKOFF no puede ser mayor que OUTBOX_MAX_BACKOFF")
+        return self
+
+
+@lru_cache()
+def get_settings() -> Settings:
+    """Lee la configuración una sola vez y la comparte en toda la aplicación."""
+    return Settings()
+
+
+settings = get_settings()
@@ -0,0 +1,44 @@
+# app/core/events.py
+"""
+Eventos de cambio de datos.
+
+Las funciones CRUD emiten un evento después de confirmar cada cambio y otros
+módulos (cachés, índices) se suscriben para reaccionar sin que el CRUD tenga
+que conocerlos.
+"""
+from collections import defaultdict
+from typing import Callable, Iterable, Optional
+
+STATIC_DOG_CHANGED = "static_dog_changed"
+ADOPTION_DOG_CHANGED = "adoption_dog_changed"
+ADOPTED_DOG_CHANGED = "adopted_dog_changed"
+COURSE_CHANGED = "course_changed"
+
+_subscribers = defaultdict(list)
+
+
+def subscribe(event: str, handler: Optional[Callable] = None):
+    """
+    Registra `handler(ids=...)` para un evento. Se puede usar como decorador.
+
+    `ids` es la lista de ids afectados, o None si no se conocen.
+    """
+    if handler is None:
+        return lambda function: subscribe(event, function)
+    _subscribers[event].append(handler)
+    return handler
+
+
+def unsubscribe(event: str, handler: Callable):
+    if handler in _subscribers[event]:
+        _subscribers[event].remove(handler)
+
+
+def emit(event: str, ids: Optional[Iterable[int]] = None):
+    """Notifica un cambio. Un suscriptor que falla no interrumpe la operación que ya se confirmó."""
+    ids = list(ids) if ids is not None else None
+    for handler in list(_subscribers[event]):
+        try:
+            handler(ids=ids)
+        except Exception as e:
+            print(f"Error en el suscriptor de {event}: {e}")
@@ -0,0 +1,39 @@
+# app/core/http_cache.py
+import hashlib
+from typing import Optional
+
+from app.core.config import settings
+
+# Cache-Control de los listados públicos
+CATALOG_MAX_AGE = settings.CATALOG_MAX_AGE
+CATALOG_STALE_WHILE_REVALIDATE = settings.CATALOG_STALE_WHILE_REVALIDATE
+
+
+def make_etag(*parts) -> str:
+    """ETag débil a partir de la ruta y la versión de la colección."""
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara `If-None-Match` con el ETag usando la comparación débil de RFC 9110."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def cache_headers(etag: str, max_age: int = CATALOG_MAX_AGE,
+                  stale_while_revalidate: int = CATALOG_STALE_WHILE_REVALIDATE) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}",
+    }
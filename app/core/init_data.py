@@ -6,7 +6,8 @@ from app.models.domain.user import Role, User
 from app.models.schema.user import UserCreate
 
 
-def create_admin_user():
+def create_admin_user() -> bool:
+    """Crea el administrador configurado si todavía no existe ninguno. Devuelve True si lo creó."""
     db = SessionLocal()
     try:
         admin = db.query(User).filter_by(role="admin").first()
@@ -16,5 +17,7 @@ def create_admin_user():
                                    password=settings.ADMIN_PASSWORD,
                                    role=Role.ADMIN)
             create_auth_user(db, auth_user)
+            return True
+        return False
     finally:
         db.close()
@@ -0,0 +1,190 @@
+# app/core/rate_limit.py
+import ipaddress
+import math
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+
+# Almacenamiento de los buckets: "memory" (por proceso) o "sqlite" (compartido entre workers)
+RATE_LIMIT_STORE = settings.RATE_LIMIT_STORE
+RATE_LIMIT_SQLITE_PATH = settings.RATE_LIMIT_SQLITE_PATH
+TRUSTED_PROXIES = tuple(ipaddress.ip_network(network.strip(), strict=False)
+                        for network in settings.TRUSTED_PROXIES.split(",") if network.strip())
+# Máximo de claves que se guardan en memoria antes de descartar los buckets llenos
+RATE_LIMIT_MAX_KEYS = 10000
+
+
+def _refill(tokens: float, updated_at: float, now: float, capacity: int, refill_rate: float) -> float:
+    return min(capacity, tokens + (now - updated_at) * refill_rate)
+
+
+class InMemoryRateLimitStore:
+    """Buckets guardados en memoria del proceso."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, refill_rate: float, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = _refill(tokens, updated_at, now, capacity, refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            # Momento en el que el bucket vuelve a estar lleno y ya no hace falta guardarlo
+            full_at = now + (capacity - tokens) / refill_rate
+            self._buckets[key] = (tokens, now, full_at)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+        return allowed, 0.0 if allowed else (1 - tokens) / refill_rate
+
+    def _prune(self, now: float):
+        for key in [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteRateLimitStore:
+    """
+    Buckets guardados en un archivo SQLite compartido por todos los workers del equipo.
+
+    Cada consumo se hace dentro de una transacción `BEGIN IMMEDIATE`, por lo que dos
+    procesos no pueden leer y escribir el mismo bucket a la vez.
+    """
+
+    def __init__(self, path: str = RATE_LIMIT_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, full_at REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def consume(self, key: str, capacity: int, refill_rate: float, now: float) -> Tuple[bool, float]:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?",
+                                     (key,)).fetchone()
+            tokens = capacity if row is None else _refill(row[0], row[1], now, capacity, refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            full_at = now + (capacity - tokens) / refill_rate
+            connection.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at, "
+                "full_at = excluded.full_at",
+                (key, tokens, now, full_at),
+            )
+            connection.execute("DELETE FROM rate_limit_buckets WHERE full_at <= ?", (now,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return allowed, 0.0 if allowed else (1 - tokens) / refill_rate
+
+    def clear(self):
+        self._connection().execute("DELETE FROM rate_limit_buckets")
+
+
+def _is_trusted_proxy(host: Optional[str], trusted_proxies) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except (TypeError, ValueError):
+        return False
+    return any(address in network for network in trusted_proxies)
+
+
+def client_ip(request: Request, trusted_proxies=None) -> str:
+    """
+    IP del cliente que hizo la petición.
+
+    Detrás del ingress todas las conexiones llegan desde la IP del proxy. Si la
+    conexión viene de un proxy de confianza se recorre `X-Forwarded-For` de
+    derecha a izquierda saltando los proxies de confianza; la primera IP que no
+    lo es corresponde al cliente. Las entradas anteriores las puede inventar el
+    propio cliente, por eso no se usan.
+    """
+    trusted_proxies = TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies
+    host = request.client.host if request.client else None
+    if not _is_trusted_proxy(host, trusted_proxies):
+        return host or "unknown"
+    forwarded = [address.strip() for header in request.headers.getlist("x-forwarded-for")
+                 for address in header.split(",") if address.strip()]
+    for address in reversed(forwarded):
+        if not _is_trusted_proxy(address, trusted_proxies):
+            return address
+    return forwarded[0] if forwarded else host
+
+
+def create_rate_limit_store(kind: str = RATE_LIMIT_STORE):
+    if kind == "sqlite":
+        return SQLiteRateLimitStore(RATE_LIMIT_SQLITE_PATH)
+    return InMemoryRateLimitStore()
+
+
+rate_limit_store = create_rate_limit_store()
+
+
+class RateLimiter:
+    """
+    Limitador de tipo token bucket.
+
+    Cada clave dispone de `capacity` intentos que se recargan a razón de
+    `capacity` por `period` segundos. Al agotarse responde 429 con `Retry-After`.
+    """
+
+    def __init__(self, name: str, capacity: int, period: float, store=None):
+        self.name = name
+        self.capacity = capacity
+        self.refill_rate = capacity / period
+        self.store = store
+
+    def hit(self, key: str):
+        store = self.store or rate_limit_store
+        allowed, retry_after = store.consume(f"{self.name}:{key}", self.capacity, self.refill_rate, time.time())
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Demasiados intentos, inténtelo más tarde",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    def by_ip(self, request: Request):
+        """Dependencia que limita por la IP del cliente."""
+        self.hit(f"ip:{client_ip(request)}")
+
+
+def reset_rate_limits():
+    rate_limit_store.clear()
+
+
+# Inicio de sesión: por IP y por username desde cada IP
+login_ip_limiter = RateLimiter("login", capacity=20, period=60)
+login_user_limiter = RateLimiter("login_user", capacity=5, period=60)
+# Envío del código de recuperación: por IP y por email
+reset_send_ip_limiter = RateLimiter("reset_send", capacity=5, period=15 * 60)
+reset_send_email_limiter = RateLimiter("reset_send_email", capacity=3, period=15 * 60)
+# Verificación y uso del código: por IP. No hay un límite global porque cualquier cliente anónimo podría
+# agotarlo y bloquear la recuperación de contraseña a todos los usuarios
+reset_code_ip_limiter = RateLimiter("reset_code", capacity=10, period=60)
@@ -0,0 +1,154 @@
+# app/core/response_cache.py
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from starlette.requests import Request
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Almacenamiento: "memory" (por proceso) o "sqlite" (compartido entre workers)
+RESPONSE_CACHE_BACKEND = settings.RESPONSE_CACHE_BACKEND
+RESPONSE_CACHE_SQLITE_PATH = settings.RESPONSE_CACHE_SQLITE_PATH
+# Segundos que vive una respuesta aunque no llegue ninguna invalidación
+RESPONSE_CACHE_TTL = settings.RESPONSE_CACHE_TTL
+# Máximo de respuestas en memoria; al superarlo se descarta la menos usada
+RESPONSE_CACHE_SIZE = settings.RESPONSE_CACHE_SIZE
+
+
+def cache_key(request: Request) -> str:
+    """Clave de la respuesta: ruta y parámetros de consulta ordenados."""
+    params = "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{params}"
+
+
+class InMemoryResponseCache:
+    """
+    Respuestas guardadas en memoria del proceso, sobre `TTLCache` (LRU y TTL).
+
+    Cada espacio de nombres tiene una generación que forma parte de la clave;
+    invalidarlo solo incrementa la generación y las entradas viejas dejan de
+    encontrarse hasta que el LRU las descarta. Una respuesta calculada antes de
+    una invalidación no se guarda.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self._entries = TTLCache(maxsize=max_entries, ttl=ttl)
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        return self._entries.get((namespace, self._generations.get(namespace, 0), key))
+
+    def get_or_set(self, namespace: str, key: str, producer: Callable[[], bytes]) -> bytes:
+        generation = self._generations.get(namespace, 0)
+        value = self._entries.get((namespace, generation, key))
+        if value is not None:
+            return value
+        value = producer()
+        with self._lock:
+            if self._generations.get(namespace, 0) == generation:
+                self._entries.set((namespace, generation, key), value)
+        return value
+
+    def invalidate(self, namespace: str):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class SQLiteResponseCache:
+    """
+    Respuestas guardadas en un archivo SQLite compartido por todos los workers del equipo.
+
+    La invalidación borra el espacio de nombres completo e incrementa su versión,
+    así un cambio hecho en un worker se ve en todos los demás y una respuesta
+    calculada antes del cambio no se guarda.
+    """
+
+    def __init__(self, path: str = RESPONSE_CACHE_SQLITE_PATH, ttl: float = RESPONSE_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS response_cache "
+            "(namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, expires_at REAL NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS response_cache_versions "
+            "(namespace TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _version(self, namespace: str) -> int:
+        row = self._connection().execute(
+            "SELECT version FROM response_cache_versions WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        return 0 if row is None else row[0]
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT value FROM response_cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time()),
+        ).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def get_or_set(self, namespace: str, key: str, producer: Callable[[], bytes]) -> bytes:
+        version = self._version(namespace)
+        value = self.get(namespace, key)
+        if value is not None:
+            return value
+        value = producer()
+        if self.ttl <= 0:
+            return value
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO response_cache (namespace, key, value, expires_at) "
+            "SELECT ?, ?, ?, ? WHERE COALESCE((SELECT version FROM response_cache_versions "
+            "WHERE namespace = ?), 0) = ?",
+            (namespace, key, value, now + self.ttl, namespace, version),
+        )
+        connection.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+        return value
+
+    def invalidate(self, namespace: str):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT INTO response_cache_versions (namespace, version) VALUES (?, 1) "
+                "ON CONFLICT(namespace) DO UPDATE SET version = version + 1",
+                (namespace,),
+            )
+            connection.execute("DELETE FROM response_cache WHERE namespace = ?", (namespace,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        self._connection().execute("DELETE FROM response_cache")
+
+
+def create_response_cache(kind: str = RESPONSE_CACHE_BACKEND):
+    if kind == "sqlite":
+        return SQLiteResponseCache(RESPONSE_CACHE_SQLITE_PATH)
+    return InMemoryResponseCache()
+
+
+response_cache = create_response_cache()
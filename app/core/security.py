@@ -1,24 +1,30 @@
 # app/core/security.py
-import os
 from datetime import datetime, timedelta
 
-from dotenv import load_dotenv
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.db.session import get_db
-from app.models.domain.user import User
+from app.models.domain.user import User, Role
 from typing import Optional
 
-load_dotenv()
-
 # Configuración del token
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+SECRET_KEY = settings.SECRET_KEY
+ALGORITHM = settings.ALGORITHM
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+
+# Caché de usuarios autenticados, por username (subject del token)
+CURRENT_USER_CACHE_TTL = settings.CURRENT_USER_CACHE_TTL
+CURRENT_USER_CACHE_SIZE = settings.CURRENT_USER_CACHE_SIZE
+
+ALL_AUTH_ROLES = [Role.ADMIN, Role.AUXILIAR]
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
+current_user_cache = TTLCache(maxsize=CURRENT_USER_CACHE_SIZE, ttl=CURRENT_USER_CACHE_TTL)
 
 
 # Crear el token JWT
@@ -50,6 +56,13 @@ def verify_access_token(token: str, credentials_exception):
         raise credentials_exception
 
 
+# Invalidar el usuario en caché cuando cambian sus datos o se elimina
+def invalidate_current_user(*usernames: str):
+    for username in usernames:
+        if username:
+            current_user_cache.delete(username)
+
+
 # Obtener el usuario actual usando el token
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     credentials_exception = HTTPException(
@@ -58,9 +71,28 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         headers={"WWW-Authenticate": "Bearer"},
     )
     username = verify_access_token(token, credentials_exception)
-    user = get_user(db, username=username)
+    user = current_user_cache.get(username)
     if user is None:
-        raise credentials_exception
+        db_user = get_user(db, username=username)
+        if db_user is None:
+            raise credentials_exception
+        # Se guarda una copia sin sesión ni contraseña para poder compartirla entre peticiones
+        user = User(
+            id=db_user.id,
+            username=db_user.username,
+            email=db_user.email,
+            role=db_user.role,
+            is_active=db_user.is_active
+        )
+        current_user_cache.set(username, user)
     return user
 
 
+# Dependencia que verifica que el usuario actual tenga alguno de los roles
+def require_roles(*roles: Role):
+    def role_guard(current_user: User = Depends(get_current_user)) -> User:
+        if current_user.role.value not in roles:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        return current_user
+
+    return role_guard
@@ -1,10 +1,15 @@
+from typing import Iterator, List, Optional, Tuple
+
 from fastapi import HTTPException
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.single_flight import single_flight
 from app.models.domain.applicant import Applicant
 from app.models.domain.course import Course
 from app.models.schema.applicant import ApplicantCreate
+from app.services.crypt import decrypt_str_data_batch
 
 
 def create_applicant(db: Session, applicant: ApplicantCreate, course: Course, image: bytes):
@@ -38,6 +43,32 @@ def read_all_applicants_by_course(db: Session, course_id):
     return applicants
 
 
+def read_applicant_contacts_by_course(db: Session, course_id: int, batch_size: int = 200) \
+        -> Iterator[List[Tuple[int, str]]]:
+    """
+    Devuelve los contactos (id, email) de los solicitantes de un curso por lotes.
+
+    Solo se consultan las columnas necesarias, sin la foto, y cada lote se
+    descifra con el descifrado por lotes. Los lotes se recorren por id para no
+    cargar todos los solicitantes a la vez.
+    """
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Applicant.id, Applicant.email)
+            .where(Applicant.course_id == course_id, Applicant.id > last_id)
+            .order_by(Applicant.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        emails = decrypt_str_data_batch([row.email for row in rows])
+        yield [(row.id, email) for row, email in zip(rows, emails)]
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1].id
+
+
 def read_all_applicants_by_course_crypted(db: Session, course_id):
     """Devuelve todos los usuarios.
     """
@@ -54,6 +85,14 @@ def read_applicant_by_id(db: Session, applicant_id):
     return applicant
 
 
+def read_applicant_image(db: Session, applicant_id: int) -> Optional[bytes]:
+    """Devuelve solo la imagen, sin descifrar los datos del solicitante."""
+    return single_flight.do(
+        ("image", Applicant.__tablename__, applicant_id),
+        lambda: db.execute(select(Applicant.image).where(Applicant.id == applicant_id)).scalar_one_or_none()
+    )
+
+
 def read_number_of_applicants_by_course(db, course_id):
     applicants = read_all_applicants_by_course_crypted(db, course_id)
     count = len(applicants)
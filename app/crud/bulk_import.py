@@ -0,0 +1,74 @@
+# app/crud/bulk_import.py
+from typing import List, Type
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.domain.dog import AdoptedDog, AdoptionDog
+from app.models.domain.owner import Owner
+
+
+def insert_rows_without_commit(db: Session, model: Type, rows: List[dict]) -> List[int]:
+    """
+    Inserta varias filas de un mismo modelo con un solo `INSERT` por lote.
+
+    SQLAlchemy agrupa los parámetros en sentencias `INSERT ... VALUES (...), (...)`
+    y devuelve los ids generados en el mismo orden en que se recibieron las filas.
+    El commit queda a cargo de quien llama.
+    """
+    if not rows:
+        return []
+    result = db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+    return list(result.scalars())
+
+
+def reserve_dog_ids_without_commit(db: Session, rows: List[dict]) -> List[int]:
+    """
+    Reserva ids para perros adoptados importados en la tabla de perros de adopción.
+
+    Un perro conserva su id al pasar de una tabla a otra, así que los perros en
+    adopción y los adoptados comparten los ids de `adoption_dogs`. Los perros se
+    insertan ahí sin imagen y se eliminan enseguida: la columna IDENTITY no reutiliza
+    esos ids, de modo que ningún perro en adopción tomará el id de uno importado.
+    """
+    dog_columns = [column.name for column in AdoptionDog.__table__.columns if column.name != "image"]
+    ids = insert_rows_without_commit(db, AdoptionDog, [
+        {column: value for column, value in row.items() if column in dog_columns} for row in rows
+    ])
+    # Por lotes, para no superar el límite de parámetros de SQL Server
+    for start in range(0, len(ids), 1000):
+        db.execute(delete(AdoptionDog).where(AdoptionDog.id.in_(ids[start:start + 1000])))
+    return ids
+
+
+def insert_adopted_dogs_with_owners_without_commit(db: Session, rows: List[dict], owners: List[Owner]) -> List[int]:
+    """
+    Inserta los dueños y sus perros adoptados por lotes.
+
+    `rows[i]` es el perro adoptado de `owners[i]`. Los datos de los dueños se
+    cifran con el cifrado por lotes antes de insertarlos. Los ids de los perros
+    se reservan con `reserve_dog_ids_without_commit` y se insertan explícitamente.
+    """
+    if not rows:
+        return []
+    dog_ids = reserve_dog_ids_without_commit(db, rows)
+    Owner.crypt_owners_data(owners)
+    owner_ids = insert_rows_without_commit(db, Owner, [
+        {"name": owner.name, "direction": owner.direction, "cellphone": owner.cellphone}
+        for owner in owners
+    ])
+    for row, owner_id, dog_id in zip(rows, owner_ids, dog_ids):
+        row["owner_id"] = owner_id
+        row["id"] = dog_id
+    # Con el id explícito SQLAlchemy activa IDENTITY_INSERT en SQL Server
+    db.execute(insert(AdoptedDog), rows)
+    return dog_ids
+
+
+def read_existing_adopted_dog_ids(db: Session, dog_ids: List[int]) -> set:
+    """
+    Devuelve cuáles de los ids recibidos pertenecen a perros adoptados existentes.
+    """
+    if not dog_ids:
+        return set()
+    return set(db.scalars(select(AdoptedDog.id).where(AdoptedDog.id.in_(set(dog_ids)))))
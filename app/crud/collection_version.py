@@ -0,0 +1,29 @@
+# app/crud/collection_version.py
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+
+def read_collection_versions(db: Session, *models) -> List[Tuple[Optional[datetime], int]]:
+    """Versión de cada modelo por separado (última modificación y número de filas), en una sola consulta."""
+    columns = []
+    for model in models:
+        columns.append(select(func.max(model.updated_at)).scalar_subquery())
+        columns.append(select(func.count()).select_from(model).scalar_subquery())
+    row = db.execute(select(*columns)).one()
+    return list(zip(row[0::2], row[1::2]))
+
+
+def read_collection_version(db: Session, *models) -> Tuple[Optional[datetime], int]:
+    """
+    Devuelve la versión de una colección: la última modificación y el número de filas.
+
+    Con varios modelos (por ejemplo cursos y horarios) se toma la modificación más
+    reciente y la suma de filas. Es una sola consulta de agregados que no carga
+    ninguna fila, por lo que sirve para responder 304 sin leer la colección.
+    """
+    versions = read_collection_versions(db, *models)
+    updated_at = [value for value, _ in versions if value is not None]
+    return (max(updated_at) if updated_at else None), sum(count for _, count in versions)
@@ -5,7 +5,8 @@ from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.models.domain.course import Course
+from app.core.events import emit, COURSE_CHANGED
+from app.models.domain.course import Course, CourseNotification
 from app.models.domain.schedule import Schedule
 from app.models.domain.token import AuthToken
 from app.models.schema.course import CourseCreate
@@ -36,6 +37,7 @@ def create_course(db: Session, course: CourseCreate) -> dict:
         db.add(db_course)
         db.commit()
         db.refresh(db_course)
+        emit(COURSE_CHANGED, ids=[db_course.id])
         return {"message": "Curso creado"}
     except IntegrityError as ie:
         db.rollback()
@@ -88,6 +90,7 @@ def update_course_by_id(db: Session, course: CourseCreate, course_id: int):
     try:
         db.merge(db_course)
         db.commit()
+        emit(COURSE_CHANGED, ids=[course_id])
         return {"detail": "Curso actualizado"}
     except IntegrityError as ie:
         db.rollback()
@@ -116,9 +119,18 @@ def delete_course(db: Session, course_id: int):
         try:
             db.delete(course)
             db.commit()
+            emit(COURSE_CHANGED, ids=[course_id])
             return {"success": True, "message": "Curso eliminado"}
         except IntegrityError as ie:
             db.rollback()
             raise HTTPException(
                 status_code=500, detail=ie
             )
+
+
+def create_course_notification_without_commit(db: Session, notification: CourseNotification):
+    db.add(notification)
+
+
+def read_course_notification(db: Session, notification_id: str):
+    return db.query(CourseNotification).filter(CourseNotification.id == notification_id).first()
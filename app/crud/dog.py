@@ -1,12 +1,32 @@
 # Poliperritos/app/crud/dog.py
 import binascii
-from typing import List
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple
 
+from sqlalchemy import insert, select, delete, literal, func, text, inspect, union_all, null, case
 from sqlalchemy.exc import IntegrityError, InvalidRequestError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only, selectinload
 
+from app.core.single_flight import single_flight
+from app.core.events import emit, STATIC_DOG_CHANGED, ADOPTION_DOG_CHANGED, ADOPTED_DOG_CHANGED
+from app.crud.rollup import add_daily_count, add_daily_counts, read_visit_days
 from app.models.domain.dog import *
+from app.models.domain.rollup import DailyAdoptionStats, DailyVisitStats
+from app.models.domain.visit import Visit
 from app.models.schema.dog import *
+from app.services.crypt import decrypt_str_data_batch_lenient
+
+# Tablas de perros según el tipo, con el mismo nombre que en las rutas
+DOG_TABLES = {
+    "static_dog": StaticDog,
+    "adoption_dog": AdoptionDog,
+    "adopted_dog": AdoptedDog,
+}
+
+# Columnas comunes que se copian entre las tablas de perros al adoptar o des adoptar
+DOG_TRANSFER_COLUMNS = ["id", "id_chip", "name", "about", "age", "is_vaccinated", "image", "gender", "entry_date",
+                        "is_sterilized", "is_dewormed", "operation"]
 
 
 # Crud 4 Static Dogs
@@ -79,6 +99,7 @@ def create_static_dog(db: Session, static_dog: StaticDogCreate, image: bytes = N
     try:
         db.add(db_static_dog)
         db.commit()
+        emit(STATIC_DOG_CHANGED, ids=inspect(db_static_dog).identity)
         return {"detail": "Perro Permanente creado"}
     except IntegrityError:
 
@@ -127,6 +148,7 @@ def update_static_dog(db: Session, static_dog: StaticDogCreate, id_dog: int, ima
     try:
         db.merge(db_static_dog_update)
         db.commit()
+        emit(STATIC_DOG_CHANGED, ids=[id_dog])
         return {"detail": "Perro Permanente Actualizado"}
     except IntegrityError:
         db.rollback()
@@ -147,6 +169,7 @@ def delete_an_static_dog_by_id(db: Session, dog_id: int):
         except IntegrityError:
             db.rollback()  # Deshacer los cambios en caso de error
             return False
+        emit(STATIC_DOG_CHANGED, ids=[dog_id])
         return True
 
 
@@ -197,6 +220,7 @@ def create_adoption_dog(db: Session, adoption_dog: AdoptionDogCreate, image: byt
     try:
         db.add(db_adoption_dog)
         db.commit()
+        emit(ADOPTION_DOG_CHANGED, ids=inspect(db_adoption_dog).identity)
         return {"detail": "Perro de adopción creado"}
     except IntegrityError:
         db.rollback()
@@ -206,14 +230,84 @@ def create_adoption_dog(db: Session, adoption_dog: AdoptionDogCreate, image: byt
         return None
 
 
-def read_all_adoption_dogs(db: Session) -> List[AdoptionDog]:
+# Filtros del catálogo de adopción que además se cuentan (facetas)
+ADOPTION_FACETS = ("gender", "is_vaccinated", "is_sterilized", "is_dewormed")
+
+
+def adoption_dog_conditions(filters: Optional[AdoptionDogFilters], facets: bool = True) -> list:
+    """
+    Condiciones SQL de los filtros del catálogo de adopción.
+
+    Con `facets=False` solo se devuelven los rangos (edad y fecha de ingreso).
+    """
+    if filters is None:
+        return []
+    conditions = []
+    if facets:
+        for facet in ADOPTION_FACETS:
+            value = getattr(filters, facet)
+            if value is not None:
+                conditions.append(getattr(AdoptionDog, facet) == value)
+    if filters.min_age is not None:
+        conditions.append(AdoptionDog.age >= filters.min_age)
+    if filters.max_age is not None:
+        conditions.append(AdoptionDog.age <= filters.max_age)
+    if filters.entry_date_from is not None:
+        conditions.append(AdoptionDog.entry_date >= filters.entry_date_from)
+    if filters.entry_date_to is not None:
+        conditions.append(AdoptionDog.entry_date <= filters.entry_date_to)
+    return conditions
+
+
+def read_all_adoption_dogs(db: Session, filters: Optional[AdoptionDogFilters] = None) -> List[AdoptionDog]:
     """
     Devuelve una lista de todos los perros para adopción en la base de datos.
     :rtype: List[AdoptionDog]
     :param db:
+    :param filters: filtros opcionales del catálogo
     :return:
     """
-    return db.query(AdoptionDog).all()
+    query = db.query(AdoptionDog)
+    conditions = adoption_dog_conditions(filters)
+    if conditions:
+        query = query.filter(*conditions).order_by(AdoptionDog.id)
+    return query.all()
+
+
+def _facet_key(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value.value if isinstance(value, Gender) else str(value)
+
+
+def read_adoption_dog_facets(db: Session, filters: Optional[AdoptionDogFilters] = None) -> Tuple[int, dict]:
+    """
+    Devuelve el total de perros que cumplen los filtros y los conteos por faceta.
+
+    Es una sola consulta agrupada por las cuatro facetas y filtrada solo por los
+    rangos; el resto se combina en Python sobre a lo sumo 16 grupos. El conteo de
+    cada faceta aplica todos los filtros menos el suyo, así el cliente ve cuántos
+    perros tendría si cambiara ese filtro.
+    """
+    columns = [getattr(AdoptionDog, facet) for facet in ADOPTION_FACETS]
+    groups = db.query(*columns, func.count()).filter(*adoption_dog_conditions(filters, facets=False)) \
+        .group_by(*columns).all()
+    selected = {facet: getattr(filters, facet) if filters is not None else None for facet in ADOPTION_FACETS}
+
+    def matches(group, skip=None) -> bool:
+        return all(value is None or facet == skip or group[position] == value
+                   for position, (facet, value) in enumerate(selected.items()))
+
+    facets = {}
+    for position, facet in enumerate(ADOPTION_FACETS):
+        values = [gender.value for gender in Gender] if facet == "gender" else ["true", "false"]
+        counts = dict.fromkeys(values, 0)
+        for group in groups:
+            if matches(group, skip=facet):
+                counts[_facet_key(group[position])] += group[-1]
+        facets[facet] = counts
+    total = sum(group[-1] for group in groups if matches(group))
+    return total, facets
 
 
 def read_adoption_dog_by_id(db: Session, dog_id: int) -> AdoptionDog:
@@ -247,6 +341,7 @@ def update_adoption_dog(db: Session, adoption_dog: AdoptionDogCreate, id_dog: in
     try:
         db.merge(db_adoption_dog_update)
         db.commit()
+        emit(ADOPTION_DOG_CHANGED, ids=[id_dog])
         return {"detail": "Perro de Adopción Actualizado"}
     except IntegrityError:
         db.rollback()
@@ -265,17 +360,22 @@ def delete_an_adoption_dog_by_id(db: Session, dog_id: int):
         except IntegrityError:
             db.rollback()  # Deshacer los cambios en caso de error
             return False
+        emit(ADOPTION_DOG_CHANGED, ids=[dog_id])
         return True
 
 
 def adopt_dog(db: Session, adopted_dog: AdoptedDog):
-    adoption_dog = read_adoption_dog_by_id(db, adopted_dog.id)
+    dog_id = adopted_dog.id
+    adoption_dog = read_adoption_dog_by_id(db, dog_id)
     adopted_dog.owner.crypt_owner_data()
     try:
         db.add(adopted_dog)
         db.add(adopted_dog.owner)
         db.delete(adoption_dog)
+        add_daily_count(db, DailyAdoptionStats, adopted_dog.adopted_date)
         db.commit()
+        emit(ADOPTION_DOG_CHANGED, ids=[dog_id])
+        emit(ADOPTED_DOG_CHANGED, ids=[dog_id])
         return {"detail": "Perro Adoptado creado"}
     except IntegrityError:
         db.rollback()
@@ -287,9 +387,86 @@ def create_adopted_dog_without_commit(db: Session, adopted_dog: AdoptedDog):
     if adoption_dog:
         db.add(adopted_dog)
         db.delete(adoption_dog)
+        add_daily_count(db, DailyAdoptionStats, adopted_dog.adopted_date)
     return adoption_dog
 
 
+@contextmanager
+def _identity_insert(db: Session, table):
+    # SQL Server no permite insertar ids explícitos en una columna IDENTITY sin activarlo,
+    # SQLAlchemy solo lo hace automáticamente en los INSERT ... VALUES
+    dialect = db.get_bind().dialect
+    if dialect.name != "mssql":
+        yield
+        return
+    table_name = dialect.identifier_preparer.format_table(table)
+    db.execute(text(f"SET IDENTITY_INSERT {table_name} ON"))
+    try:
+        yield
+    finally:
+        db.execute(text(f"SET IDENTITY_INSERT {table_name} OFF"))
+
+
+def transfer_adoption_dog_to_adopted(db: Session, dog_id: int, owner_id: int, adopted_date: date) -> bool:
+    """
+    Mueve un perro de adopción a la tabla de adoptados sin hacer commit.
+
+    La copia se hace con un `INSERT ... SELECT` seguido de un `DELETE`, por lo que
+    la imagen nunca sale de la base de datos.
+
+    Returns:
+    - bool: `False` si no existe el perro de adopción.
+    """
+    source = AdoptionDog.__table__
+    query = select(
+        *[source.c[column] for column in DOG_TRANSFER_COLUMNS],
+        literal(adopted_date, Date).label("adopted_date"),
+        literal(owner_id, Integer).label("owner_id"),
+        literal(datetime.utcnow(), DateTime).label("updated_at"),
+    ).where(source.c.id == dog_id)
+    with _identity_insert(db, AdoptedDog.__table__):
+        result = db.execute(insert(AdoptedDog).from_select(
+            DOG_TRANSFER_COLUMNS + ["adopted_date", "owner_id", "updated_at"], query))
+    if not result.rowcount:
+        return False
+    db.execute(delete(AdoptionDog).where(AdoptionDog.id == dog_id))
+    add_daily_count(db, DailyAdoptionStats, adopted_date)
+    return True
+
+
+def transfer_adopted_dog_to_adoption(db: Session, dog_id: int):
+    """
+    Devuelve un perro adoptado a la tabla de adopción sin hacer commit.
+
+    Borra sus visitas y, si el dueño no tiene más perros, también al dueño.
+
+    Returns:
+    - bool: `False` si no existe el perro adoptado.
+    """
+    adopted = db.execute(select(AdoptedDog.id, AdoptedDog.owner_id, AdoptedDog.adopted_date)
+                         .where(AdoptedDog.id == dog_id)).first()
+    if adopted is None:
+        return False
+    # Las visitas se borran con el perro, también se descuentan del resumen
+    add_daily_counts(db, DailyVisitStats, {day: -total for day, total in read_visit_days(db, dog_id).items()})
+    add_daily_count(db, DailyAdoptionStats, adopted.adopted_date, -1)
+    source = AdoptedDog.__table__
+    query = select(
+        *[source.c[column] for column in DOG_TRANSFER_COLUMNS],
+        literal(datetime.utcnow(), DateTime).label("updated_at"),
+    ).where(source.c.id == dog_id)
+    with _identity_insert(db, AdoptionDog.__table__):
+        db.execute(insert(AdoptionDog).from_select(DOG_TRANSFER_COLUMNS + ["updated_at"], query))
+    db.execute(delete(Visit).where(Visit.adopted_dog_id == dog_id))
+    db.execute(delete(AdoptedDog).where(AdoptedDog.id == dog_id))
+    if adopted.owner_id is not None:
+        remaining_dogs = db.scalar(select(func.count()).select_from(AdoptedDog)
+                                   .where(AdoptedDog.owner_id == adopted.owner_id))
+        if not remaining_dogs:
+            db.execute(delete(Owner).where(Owner.id == adopted.owner_id))
+    return True
+
+
 def read_all_adopted_dogs(db: Session):
     """
     Devuelve una lista de todos los perros adoptados en la base de datos.
@@ -341,6 +518,7 @@ def update_adopted_dog(db: Session, adoption_dog: AdoptionDogCreate, id_dog: int
     try:
         db.merge(db_adoption_dog_update)
         db.commit()
+        emit(ADOPTED_DOG_CHANGED, ids=[id_dog])
         return {"detail": "Perro Adoptado Actualizado"}
     except IntegrityError:
         db.rollback()
@@ -348,19 +526,127 @@ def update_adopted_dog(db: Session, adoption_dog: AdoptionDogCreate, id_dog: int
 
 
 def unadopt_dog(db: Session, adoption_dog: AdoptionDog):
-    dog = db.query(AdoptedDog).filter(AdoptedDog.id == adoption_dog.id).first()
+    dog_id = adoption_dog.id
+    dog = db.query(AdoptedDog).filter(AdoptedDog.id == dog_id).first()
     print(dog)
     try:
         db.add(adoption_dog)
         if dog is not None:
+            add_daily_counts(db, DailyVisitStats, {day: -total for day, total in read_visit_days(db, dog_id).items()})
+            add_daily_count(db, DailyAdoptionStats, dog.adopted_date, -1)
             db.delete(dog)
         db.commit()
+        emit(ADOPTION_DOG_CHANGED, ids=[dog_id])
+        emit(ADOPTED_DOG_CHANGED, ids=[dog_id])
         return {"detail": "Perro des adoptado"}
     except IntegrityError as e:
         db.rollback()
         return {"detail": e}
 
 
+def read_existing_adoption_dog_ids(db: Session, dog_ids: List[int]) -> set:
+    """
+    Devuelve cuáles de los ids recibidos pertenecen a perros de adopción existentes.
+    """
+    if not dog_ids:
+        return set()
+    return set(db.scalars(select(AdoptionDog.id).where(AdoptionDog.id.in_(set(dog_ids)))))
+
+
+def read_dogs_sparse(db: Session, model, fields: Sequence[str], include_owner: bool = False,
+                     dog_ids: Optional[Iterable[int]] = None, conditions: Sequence = ()) -> List[dict]:
+    """
+    Devuelve perros de la tabla `model` como diccionarios con solo los campos pedidos.
+
+    La consulta usa `load_only`, así que las columnas que no se piden no se leen.
+    La imagen nunca se carga: en su lugar `image` indica si existe. El dueño
+    (solo perros adoptados) se consulta únicamente con `include_owner` y cada
+    dueño distinto se descifra una sola vez, con el descifrado por lotes.
+    """
+    columns = [getattr(model, field) for field in fields if field != "image"]
+    if include_owner:
+        columns.append(model.owner_id)
+    query = db.query(model).options(load_only(*columns))
+    if "image" in fields:
+        # SQL Server no admite un predicado como columna del SELECT, por eso CASE
+        query = query.add_columns(case((model.image.is_not(None), 1), else_=0).label("has_image"))
+    if include_owner:
+        query = query.options(selectinload(model.owner))
+    if dog_ids is not None:
+        query = query.filter(model.id.in_(list(dog_ids)))
+    if conditions:
+        query = query.filter(*conditions)
+    results = query.order_by(model.id).all()
+
+    rows = []
+    dogs = []
+    for result in results:
+        dog, has_image = (result[0], result[1]) if "image" in fields else (result, None)
+        row = {field: getattr(dog, field) for field in fields if field != "image"}
+        if "image" in fields:
+            row["image"] = has_image
+        rows.append(row)
+        dogs.append(dog)
+
+    if include_owner:
+        owners = {dog.owner.id: dog.owner for dog in dogs if dog.owner is not None}
+        directions = decrypt_str_data_batch_lenient([owner.direction for owner in owners.values()])
+        cellphones = decrypt_str_data_batch_lenient([owner.cellphone for owner in owners.values()])
+        owner_rows = {owner.id: {"id": owner.id, "name": owner.name, "direction": direction, "cellphone": cellphone}
+                      for owner, direction, cellphone in zip(owners.values(), directions, cellphones)}
+        for row, dog in zip(rows, dogs):
+            row["owner"] = owner_rows.get(dog.owner_id)
+    return rows
+
+
+def read_dogs_by_chip(db: Session, id_chip: int) -> List[dict]:
+    """
+    Busca un chip en las tres tablas de perros con una sola consulta `UNION ALL`.
+
+    Cada rama usa el índice de `id_chip` de su tabla; la de perros adoptados
+    además une al dueño, que se devuelve descifrado. Normalmente hay un solo
+    resultado, pero se devuelven todos por si el chip está repetido.
+    """
+    branches = []
+    for kind, model in DOG_TABLES.items():
+        if model is AdoptedDog:
+            owner_columns = [Owner.id, Owner.name, Owner.direction, Owner.cellphone]
+            source = AdoptedDog.__table__.outerjoin(Owner.__table__, AdoptedDog.owner_id == Owner.id)
+        else:
+            owner_columns = [null(), null(), null(), null()]
+            source = model.__table__
+        branches.append(
+            select(literal(kind).label("kind"), model.id, model.name,
+                   case((model.image.is_not(None), 1), else_=0).label("has_image"),
+                   *[column.label(label) for column, label in
+                     zip(owner_columns, ("owner_id", "owner_name", "owner_direction", "owner_cellphone"))])
+            .select_from(source)
+            .where(model.id_chip == id_chip)
+        )
+    rows = db.execute(union_all(*branches)).all()
+
+    owners = [row for row in rows if row.owner_id is not None]
+    directions = decrypt_str_data_batch_lenient([row.owner_direction for row in owners])
+    cellphones = decrypt_str_data_batch_lenient([row.owner_cellphone for row in owners])
+    decrypted = {row.owner_id: {"id": row.owner_id, "name": row.owner_name, "direction": direction,
+                                "cellphone": cellphone}
+                 for row, direction, cellphone in zip(owners, directions, cellphones)}
+    return [{"kind": row.kind, "id": row.id, "id_chip": id_chip, "name": row.name, "has_image": bool(row.has_image),
+             "owner": decrypted.get(row.owner_id)} for row in rows]
+
+
+def read_dog_image(db: Session, model, dog_id: int) -> Optional[bytes]:
+    """
+    Devuelve solo la imagen de un perro de la tabla `model` (StaticDog, AdoptionDog o AdoptedDog).
+
+    Las peticiones simultáneas de la misma imagen comparten una sola consulta.
+    """
+    return single_flight.do(
+        ("image", model.__tablename__, dog_id),
+        lambda: db.execute(select(model.image).where(model.id == dog_id)).scalar_one_or_none()
+    )
+
+
 def is_the_owner_whit_more_than_a_dog(db, owner_id: int) -> bool:
     if len(db.query(AdoptedDog).filter(AdoptedDog.owner_id == owner_id).all()) > 1:
         return True
@@ -0,0 +1,112 @@
+# app/crud/outbox.py
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.domain.email_outbox import EmailOutbox, EmailStatus
+from app.services.crypt import encrypt_str_data
+
+
+def enqueue_email(db: Session, recipient: str, subject: str, context: dict, template: str) -> EmailOutbox:
+    """Guarda un correo en la bandeja de salida para que lo envíe el worker."""
+    email = EmailOutbox(recipient=recipient, subject=subject, template=template,
+                        status=EmailStatus.PENDING, attempts=0, next_attempt_at=datetime.utcnow())
+    email.set_context(context)
+    db.add(email)
+    db.commit()
+    db.refresh(email)
+    return email
+
+
+def enqueue_emails_without_commit(db: Session, recipients: Iterable[str], subject: str, context: dict,
+                                  template: str, notification_id: Optional[str] = None):
+    """
+    Agrega a la sesión el mismo correo para varios destinatarios, sin confirmar.
+
+    El contexto es igual para todos, así que se cifra una sola vez.
+    """
+    now = datetime.utcnow()
+    encrypted_context = encrypt_str_data(json.dumps(context))
+    db.add_all([EmailOutbox(recipient=recipient, subject=subject, template=template, context=encrypted_context,
+                            status=EmailStatus.PENDING, attempts=0, next_attempt_at=now,
+                            notification_id=notification_id)
+                for recipient in recipients])
+
+
+def count_emails_by_status(db: Session, notification_id: str) -> Dict[EmailStatus, int]:
+    rows = db.execute(
+        select(EmailOutbox.status, func.count()).where(EmailOutbox.notification_id == notification_id)
+        .group_by(EmailOutbox.status)
+    ).all()
+    return {status: count for status, count in rows}
+
+
+def read_failed_email_errors(db: Session, notification_id: str) -> List[str]:
+    """Errores de los correos de una notificación que ya no se volverán a intentar."""
+    rows = db.execute(
+        select(EmailOutbox.id, EmailOutbox.last_error)
+        .where(EmailOutbox.notification_id == notification_id, EmailOutbox.status == EmailStatus.FAILED)
+        .order_by(EmailOutbox.id)
+    ).all()
+    return [f"Correo {email_id}: {error}" for email_id, error in rows]
+
+
+def claim_due_emails(db: Session, limit: int, lease_seconds: float) -> List[EmailOutbox]:
+    """
+    Reserva hasta `limit` correos cuyo próximo intento ya venció.
+
+    La reserva se hace con un `UPDATE` condicionado al estado y a la fecha del
+    próximo intento, así dos workers no envían el mismo correo. Si un worker se
+    cae a mitad del envío, el correo vuelve a estar disponible al vencer el plazo
+    `lease_seconds`.
+    """
+    now = datetime.utcnow()
+    due = [EmailStatus.PENDING, EmailStatus.SENDING]
+    ids = list(db.scalars(
+        select(EmailOutbox.id)
+        .where(EmailOutbox.status.in_(due), EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(limit)
+    ))
+    if not ids:
+        return []
+    token = str(uuid.uuid4())
+    db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(ids), EmailOutbox.status.in_(due), EmailOutbox.next_attempt_at <= now)
+        .values(status=EmailStatus.SENDING, claim_token=token,
+                next_attempt_at=now + timedelta(seconds=lease_seconds))
+    )
+    db.commit()
+    return list(db.scalars(select(EmailOutbox).where(EmailOutbox.claim_token == token).order_by(EmailOutbox.id)))
+
+
+def mark_emails_sent(db: Session, email_ids: List[int]):
+    if not email_ids:
+        return
+    db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(email_ids))
+        .values(status=EmailStatus.SENT, sent_at=datetime.utcnow(), context=None, claim_token=None,
+                last_error=None)
+    )
+    db.commit()
+
+
+def mark_email_failed(db: Session, email_id: int, error: str, retry_in: float, give_up: bool):
+    """Registra un intento fallido y programa el siguiente o marca el correo como fallido."""
+    db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id == email_id)
+        .values(status=EmailStatus.FAILED if give_up else EmailStatus.PENDING,
+                attempts=EmailOutbox.attempts + 1,
+                next_attempt_at=datetime.utcnow() + timedelta(seconds=retry_in),
+                claim_token=None,
+                last_error=error[:2000])
+    )
+    db.commit()
+
@@ -1,5 +1,6 @@
 # MecanicaMs/app/crud/dog.py
 import binascii
+from typing import List
 
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
@@ -42,6 +43,22 @@ def read_owner_by_id(db: Session, owner_id: int):
     return owner
 
 
+def owner_exists(db: Session, owner_id: int) -> bool:
+    """
+    Indica si existe un dueño sin cargar ni descifrar sus datos.
+    """
+    return db.query(Owner.id).filter(Owner.id == owner_id).first() is not None
+
+
+def read_existing_owner_ids(db: Session, owner_ids: List[int]) -> set:
+    """
+    Devuelve cuáles de los ids recibidos pertenecen a dueños existentes.
+    """
+    if not owner_ids:
+        return set()
+    return {owner_id for (owner_id,) in db.query(Owner.id).filter(Owner.id.in_(set(owner_ids))).all()}
+
+
 def get_all_owners(db: Session):
     """
      Devuelve una lista de dueños estáticos existentes.
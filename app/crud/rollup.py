@@ -0,0 +1,137 @@
+# app/crud/rollup.py
+"""
+Tablas de resumen diario (`daily_adoption_stats` y `daily_visit_stats`).
+
+Las funciones que adoptan, des adoptan o registran visitas suman o restan al
+día correspondiente dentro de su propia transacción, así el resumen se
+confirma junto con el cambio. `reconcile_rollups` recalcula los días a partir
+de las tablas originales y corrige cualquier diferencia; está pensado para
+ejecutarse cada noche (`python -m app.cli reconcile-rollups`).
+"""
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import delete, extract, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.domain.dog import AdoptedDog
+from app.models.domain.rollup import DailyAdoptionStats, DailyVisitStats
+from app.models.domain.visit import Visit
+
+# Columna de la tabla original que se cuenta en cada resumen
+ROLLUP_SOURCES = {
+    DailyAdoptionStats: AdoptedDog.adopted_date,
+    DailyVisitStats: Visit.visit_date,
+}
+
+
+def count_days(days: Iterable[Optional[date]], delta: int = 1) -> Dict[date, int]:
+    """Agrupa fechas en `{día: delta * cantidad}`, ignorando las vacías."""
+    return {day: delta * total for day, total in Counter(day for day in days if day is not None).items()}
+
+
+def add_daily_counts(db: Session, model, counts: Mapping[date, int]):
+    """
+    Suma `counts` a los días del resumen sin hacer commit.
+
+    Primero intenta un UPDATE; si el día no existe lo inserta dentro de un
+    SAVEPOINT, de modo que si otra transacción lo insertó al mismo tiempo solo
+    se repite el UPDATE sin perder la operación principal.
+    """
+    for day, delta in counts.items():
+        if day is None or not delta:
+            continue
+        increment = update(model).where(model.day == day).values(total=model.total + delta)
+        if db.execute(increment).rowcount:
+            continue
+        try:
+            with db.begin_nested():
+                db.execute(insert(model).values(day=day, total=delta))
+        except IntegrityError:
+            db.execute(increment)
+
+
+def add_daily_count(db: Session, model, day: Optional[date], delta: int = 1):
+    add_daily_counts(db, model, {day: delta})
+
+
+def read_visit_days(db: Session, dog_id: int) -> Dict[date, int]:
+    """Visitas de un perro agrupadas por día, para descontarlas cuando se borran con el perro."""
+    return dict(db.execute(select(Visit.visit_date, func.count()).where(Visit.adopted_dog_id == dog_id)
+                           .group_by(Visit.visit_date)).all())
+
+
+def reconcile_daily_stats(db: Session, model, since: Optional[date] = None) -> int:
+    """
+    Recalcula el resumen desde la tabla original y corrige los días distintos, sin hacer commit.
+
+    Devuelve cuántos días se corrigieron.
+    """
+    source = ROLLUP_SOURCES[model]
+    actual_query = select(source, func.count()).where(source.is_not(None)).group_by(source)
+    stored_query = select(model.day, model.total)
+    if since is not None:
+        actual_query = actual_query.where(source >= since)
+        stored_query = stored_query.where(model.day >= since)
+    actual = dict(db.execute(actual_query).all())
+    stored = dict(db.execute(stored_query).all())
+
+    corrected = 0
+    for day in set(actual) | set(stored):
+        expected = actual.get(day, 0)
+        if stored.get(day, 0) == expected:
+            continue
+        corrected += 1
+        if not expected:
+            db.execute(delete(model).where(model.day == day))
+        elif day in stored:
+            db.execute(update(model).where(model.day == day).values(total=expected))
+        else:
+            db.execute(insert(model).values(day=day, total=expected))
+    return corrected
+
+
+def reconcile_rollups(db: Session, since: Optional[date] = None) -> Dict[str, int]:
+    """Reconcilia los dos resúmenes en una sola transacción."""
+    try:
+        result = {model.__tablename__: reconcile_daily_stats(db, model, since) for model in ROLLUP_SOURCES}
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+
+
+def read_daily_trend(db: Session, model, period: str, start: Optional[date] = None,
+                     end: Optional[date] = None) -> List[dict]:
+    """
+    Totales del resumen agrupados por día, mes o año, leyendo solo la tabla de resumen.
+
+    Cada punto lleva la fecha de inicio del período (`2025-03-01` para marzo).
+    """
+    query = select(model.day, model.total)
+    if period == "day":
+        query = query.order_by(model.day)
+    else:
+        year = extract("year", model.day).label("year")
+        month = extract("month", model.day).label("month") if period == "month" else None
+        groups = [year] if month is None else [year, month]
+        query = select(*groups, func.sum(model.total)).group_by(*groups).order_by(*groups)
+    if start is not None:
+        query = query.where(model.day >= start)
+    if end is not None:
+        query = query.where(model.day <= end)
+
+    points = []
+    for row in db.execute(query).all():
+        if period == "day":
+            period_start, total = row
+        elif period == "month":
+            period_start, total = date(int(row[0]), int(row[1]), 1), row[2]
+        else:
+            period_start, total = date(int(row[0]), 1, 1), row[1]
+        if total:
+            points.append({"period": period_start, "total": int(total)})
+    return points
@@ -0,0 +1,126 @@
+# app/crud/stats.py
+"""
+Consultas de agregados para el panel de estadísticas.
+
+Todas devuelven solo números agrupados: ninguna carga filas completas ni imágenes.
+"""
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Date, Float, Integer, case, cast, extract, func, literal, select, true, union_all
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.crud.dog import DOG_TABLES
+from app.models.domain.applicant import Applicant
+from app.models.domain.course import Course
+from app.models.domain.dog import AdoptedDog
+from app.models.domain.visit import Visit
+
+
+class days_between(FunctionElement):
+    """Días entre dos fechas (`end - start`), traducido al dialecto de la base."""
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(days_between)
+def _days_between_default(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return f"({compiler.process(end, **kw)} - {compiler.process(start, **kw)})"
+
+
+@compiles(days_between, "mssql")
+def _days_between_mssql(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return f"DATEDIFF(day, {compiler.process(start, **kw)}, {compiler.process(end, **kw)})"
+
+
+@compiles(days_between, "sqlite")
+def _days_between_sqlite(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return f"(julianday({compiler.process(end, **kw)}) - julianday({compiler.process(start, **kw)}))"
+
+
+def _ratio(part: Optional[int], total: int) -> float:
+    return round((part or 0) / total, 4) if total else 0.0
+
+
+def read_dog_category_stats(db: Session) -> List[dict]:
+    """Total de perros por tipo y proporción de vacunados y esterilizados, en una sola consulta."""
+    # En SQL Server una columna BIT no es una condición: se compara explícitamente
+    branches = [
+        select(literal(kind).label("kind"), func.count().label("total"),
+               func.sum(case((model.is_vaccinated == true(), 1), else_=0)).label("vaccinated"),
+               func.sum(case((model.is_sterilized == true(), 1), else_=0)).label("sterilized"))
+        .select_from(model)
+        for kind, model in DOG_TABLES.items()
+    ]
+    return [{"kind": row.kind, "total": row.total, "vaccinated": row.vaccinated or 0,
+             "sterilized": row.sterilized or 0, "vaccinated_ratio": _ratio(row.vaccinated, row.total),
+             "sterilized_ratio": _ratio(row.sterilized, row.total)}
+            for row in db.execute(union_all(*branches)).all()]
+
+
+def _per_month(db: Session, column) -> List[dict]:
+    year = extract("year", column).label("year")
+    month = extract("month", column).label("month")
+    rows = db.execute(
+        select(year, month, func.count().label("count")).where(column.is_not(None))
+        .group_by(year, month).order_by(year, month)
+    ).all()
+    return [{"year": int(row.year), "month": int(row.month), "count": row.count} for row in rows]
+
+
+def read_adoptions_per_month(db: Session) -> List[dict]:
+    return _per_month(db, AdoptedDog.adopted_date)
+
+
+def read_visits_per_month(db: Session) -> List[dict]:
+    return _per_month(db, Visit.visit_date)
+
+
+def read_average_days_to_adoption(db: Session) -> Optional[float]:
+    """Promedio de días entre el ingreso y la adopción de los perros que tienen ambas fechas."""
+    average = db.execute(
+        # En SQL Server AVG de enteros devuelve un entero
+        select(func.avg(cast(days_between(AdoptedDog.entry_date, AdoptedDog.adopted_date), Float)))
+        .where(AdoptedDog.entry_date.is_not(None))
+    ).scalar()
+    return None if average is None else round(float(average), 1)
+
+
+def read_course_seats(db: Session, today: Optional[date] = None) -> List[dict]:
+    """Cupos de los cursos que aún no terminan: capacidad, inscritos y cupos libres."""
+    today = today or date.today()
+    applicants = func.count(Applicant.id).label("applicants")
+    rows = db.execute(
+        select(Course.id, Course.name, Course.capacity, applicants)
+        .select_from(Course).outerjoin(Applicant, Applicant.course_id == Course.id)
+        .where(Course.end_date >= literal(today, Date))
+        .group_by(Course.id, Course.name, Course.capacity)
+        .order_by(Course.id)
+    ).all()
+    return [{"course_id": row.id, "name": row.name, "capacity": row.capacity, "applicants": row.applicants,
+             "open_seats": max(row.capacity - row.applicants, 0)} for row in rows]
+
+
+def _columns(rows, names: Tuple[str, ...]) -> Dict[str, tuple]:
+    columns = tuple(zip(*rows)) if rows else tuple(() for _ in names)
+    return dict(zip(names, columns))
+
+
+def read_adopted_dog_columns(db: Session) -> Dict[str, tuple]:
+    """Columnas de los perros adoptados para el análisis por cohortes, en una sola consulta."""
+    names = ("id", "entry_date", "adopted_date", "age", "gender")
+    rows = db.execute(select(AdoptedDog.id, AdoptedDog.entry_date, AdoptedDog.adopted_date, AdoptedDog.age,
+                             AdoptedDog.gender).order_by(AdoptedDog.id)).all()
+    return _columns(rows, names)
+
+
+def read_visit_columns(db: Session) -> Dict[str, tuple]:
+    """Perro y fecha de todas las visitas, ordenadas por perro y fecha, en una sola consulta."""
+    rows = db.execute(select(Visit.adopted_dog_id, Visit.visit_date)
+                      .order_by(Visit.adopted_dog_id, Visit.visit_date)).all()
+    return _columns(rows, ("adopted_dog_id", "visit_date"))
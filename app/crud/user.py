@@ -2,6 +2,7 @@ from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.security import invalidate_current_user
 from app.models.domain.owner import Owner
 from app.models.domain.user import User
 from app.models.schema.user import UserCreate, UserUpdate
@@ -93,9 +94,22 @@ def update_password(db: Session, user_id: int, new_password: str):
     if user:
         user.hashed_password = get_password_hash(new_password)
         db.add(user)
+        invalidate_current_user(user.username)
         return user
 
 
+def update_password_hash(db: Session, user: User, new_hash: str):
+    """
+    Guarda el hash recalculado con el costo de bcrypt vigente.
+    """
+    try:
+        user.hashed_password = new_hash
+        db.add(user)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+
+
 def update_auth_user_basic_information(db: Session, user: UserUpdate, actual_username: str):
     db_user = db.query(User).filter(User.username == actual_username).first()
     if user.username != db_user.username and user.username:
@@ -106,6 +120,7 @@ def update_auth_user_basic_information(db: Session, user: UserUpdate, actual_use
         db.merge(db_user)
         db.commit()
         db.refresh(db_user)
+        invalidate_current_user(actual_username, db_user.username)
         return {"detail": "Información Actualizada"}
     except IntegrityError as ie:
         db.rollback()
@@ -140,6 +155,7 @@ def update_auth_user_password(db: Session, current_user_username: str, actual_pa
         db_user.hashed_password = get_password_hash(new_password)
         db.add(db_user)
         db.commit()
+        invalidate_current_user(current_user_username)
         return {"detail": "Contraseña Actualizada"}
     except IntegrityError as ie:
         db.rollback()
@@ -173,8 +189,10 @@ def delete_auth_user(db: Session, user_id: int, current_user_username: str):
         )
     else:
         try:
+            username = user.username
             db.delete(user)
             db.commit()
+            invalidate_current_user(username)
             return {"success": True, "message": "Usuario eliminado"}
         except IntegrityError as ie:
             db.rollback()
@@ -1,13 +1,22 @@
 import binascii
+from typing import List, Optional, Sequence
 
 from fastapi import HTTPException
+from sqlalchemy import case, select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 
 from app.models.domain.dog import AdoptedDog
+from app.crud.rollup import add_daily_count, add_daily_counts
+from app.models.domain.owner import Owner
+from app.models.domain.rollup import DailyVisitStats
 from app.models.domain.visit import Visit
 from app.models.schema.visit import VisitCreate, VisitUpdate
-from app.services.crypt import decrypt_str_data
+from app.services.crypt import decrypt_str_data, decrypt_str_data_batch_lenient
+
+# Columnas del perro adoptado que se envían en el listado normalizado (la imagen se reemplaza por su URL)
+NORMALIZED_DOG_COLUMNS = ["id", "id_chip", "name", "about", "age", "is_vaccinated", "gender", "entry_date",
+                          "is_sterilized", "is_dewormed", "operation", "adopted_date", "owner_id"]
 
 
 def create_a_visit(db: Session, visit: VisitCreate, adopted_dog: AdoptedDog, evidence: bytes = None):
@@ -23,6 +32,7 @@ def create_a_visit(db: Session, visit: VisitCreate, adopted_dog: AdoptedDog, evi
     try:
         db.refresh(adopted_dog.owner)
         db.add(db_visit)
+        add_daily_count(db, DailyVisitStats, db_visit.visit_date)
         db.commit()
         db.refresh(db_visit)
         return {"detail": "Visita Registrada"}
@@ -76,6 +86,85 @@ def get_all_visits_by_dog(db: Session, dog_id: int):
     return visits_raw
 
 
+def select_visit_dog_ids(dog_id: Optional[int] = None, visit_id: Optional[int] = None):
+    """
+    Subconsulta con los ids de los perros de las visitas.
+
+    Se filtra con ella en lugar de enviar un parámetro por id: SQL Server no
+    admite más de 2100 parámetros por consulta.
+    """
+    query = select(Visit.adopted_dog_id)
+    if dog_id is not None:
+        query = query.where(Visit.adopted_dog_id == dog_id)
+    if visit_id is not None:
+        query = query.where(Visit.id == visit_id)
+    return query
+
+
+def read_visits_normalized(db: Session, dog_id: Optional[int] = None) -> dict:
+    """
+    Devuelve las visitas con los perros y dueños por separado, una vez cada uno.
+
+    Son tres consultas por columnas: las visitas, los perros distintos y los
+    dueños distintos. No se cargan la evidencia ni las imágenes (solo si
+    existen) y cada dueño se descifra una sola vez con el descifrado por lotes,
+    sin importar cuántas visitas tenga su perro.
+
+    Returns:
+    - dict: `visits`, `dogs` y `owners`; perros y dueños indexados por id.
+    """
+    # SQL Server no admite un predicado como columna del SELECT, por eso CASE
+    query = select(Visit.id, Visit.visit_date, Visit.observations, Visit.adopted_dog_id,
+                   case((Visit.evidence.is_not(None), 1), else_=0).label("has_evidence")).order_by(Visit.id)
+    if dog_id is not None:
+        query = query.where(Visit.adopted_dog_id == dog_id)
+    visits = [row._asdict() for row in db.execute(query)]
+    if not visits:
+        return {"visits": visits, "dogs": {}, "owners": {}}
+
+    # Perros y dueños se filtran con subconsultas y no con la lista de ids
+    visit_dog_ids = select_visit_dog_ids(dog_id)
+    dog_query = select(*[AdoptedDog.__table__.c[column] for column in NORMALIZED_DOG_COLUMNS],
+                       case((AdoptedDog.image.is_not(None), 1), else_=0).label("has_image"))
+    dog_query = dog_query.where(AdoptedDog.id.in_(visit_dog_ids))
+    dogs = {row.id: row._asdict() for row in db.execute(dog_query)}
+
+    owners = {}
+    if any(dog["owner_id"] is not None for dog in dogs.values()):
+        owner_ids = select(AdoptedDog.owner_id).where(AdoptedDog.id.in_(visit_dog_ids))
+        rows = db.execute(select(Owner.id, Owner.name, Owner.direction, Owner.cellphone)
+                          .where(Owner.id.in_(owner_ids))).all()
+        directions = decrypt_str_data_batch_lenient([row.direction for row in rows])
+        cellphones = decrypt_str_data_batch_lenient([row.cellphone for row in rows])
+        owners = {row.id: {"id": row.id, "name": row.name, "direction": direction, "cellphone": cellphone}
+                  for row, direction, cellphone in zip(rows, directions, cellphones)}
+    return {"visits": visits, "dogs": dogs, "owners": owners}
+
+
+def read_visits_sparse(db: Session, fields: Sequence[str], dog_id: Optional[int] = None,
+                       visit_id: Optional[int] = None) -> List[dict]:
+    """
+    Devuelve visitas como diccionarios con solo los campos pedidos, sin cargar
+    el perro ni el dueño. La evidencia no se lee: `evidence` indica si existe.
+    """
+    columns = [getattr(Visit, field) for field in fields if field != "evidence"]
+    query = db.query(Visit).options(load_only(*columns))
+    if "evidence" in fields:
+        query = query.add_columns(case((Visit.evidence.is_not(None), 1), else_=0).label("has_evidence"))
+    if dog_id is not None:
+        query = query.filter(Visit.adopted_dog_id == dog_id)
+    if visit_id is not None:
+        query = query.filter(Visit.id == visit_id)
+    rows = []
+    for result in query.order_by(Visit.id).all():
+        visit, has_evidence = (result[0], result[1]) if "evidence" in fields else (result, None)
+        row = {field: getattr(visit, field) for field in fields if field != "evidence"}
+        if "evidence" in fields:
+            row["evidence"] = has_evidence
+        rows.append(row)
+    return rows
+
+
 def read_visit_by_id(db: Session, visit_id: int):
     """
     Devuelve una visita por el id.
@@ -95,6 +184,9 @@ def update_visit(db: Session, visit_update: VisitUpdate, adopted_dog: AdoptedDog
         adopted_dog=adopted_dog
     )
     try:
+        previous_date = db.scalar(select(Visit.visit_date).where(Visit.id == visit_update.id))
+        if previous_date != visit_update.visit_date:
+            add_daily_counts(db, DailyVisitStats, {previous_date: -1, visit_update.visit_date: 1})
         db.merge(db_visit_update)
         db.commit()
         return {"detail": "Visita Actualizada"}
@@ -122,6 +214,7 @@ def delete_visit_by_id(db: Session, visit_id: int):
         )
     else:
         try:
+            add_daily_count(db, DailyVisitStats, visit.visit_date, -1)
             db.delete(visit)
             db.commit()
             return {"success": True, "message": "Visita eliminada"}
@@ -1,24 +1,24 @@
-import os
-
 import sqlalchemy
-from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-load_dotenv()  # Cargar variables desde .env
+from app.core.config import settings
 
 DATABASE_URL = (
-    f"mssql+pyodbc://{os.getenv('DATABASE_USER')}:{os.getenv('DATABASE_PASSWORD')}"
-    f"@{os.getenv('DATABASE_HOST')},{os.getenv('DATABASE_PORT')}/"
-    f"{os.getenv('DATABASE_NAME')}?driver=ODBC+Driver+18+for+SQL+Server"
+    f"mssql+pyodbc://{settings.DATABASE_USER}:{settings.DATABASE_PASSWORD}"
+    f"@{settings.DATABASE_HOST},{settings.DATABASE_PORT}/"
+    f"{settings.DATABASE_NAME}?driver=ODBC+Driver+18+for+SQL+Server"
     "&Encrypt=yes&TrustServerCertificate=no"
     "&hostNameInCertificate=*.database.windows.net&loginTimeout=60"
 )
 
 
-# Crear el motor de la base de datos
-engine = create_engine(DATABASE_URL, echo=True)
+# Conexiones que se mantienen abiertas en el pool y que se abren al iniciar
+DB_POOL_SIZE = settings.DB_POOL_SIZE
+
+# Crear el motor de la base de datos; pool_pre_ping descarta conexiones cerradas por Azure antes de usarlas
+engine = create_engine(DATABASE_URL, echo=True, pool_size=DB_POOL_SIZE, pool_pre_ping=True)
 
 # Crear una clase base para los modelos
 Base = sqlalchemy.orm.declarative_base()
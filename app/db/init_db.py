@@ -1,10 +1,25 @@
-from app.db.database import Base, engine
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.init_data import create_admin_user
+from app.db.database import Base, engine, DB_POOL_SIZE
 import app.models.domain.dog
 import app.models.domain.owner
 import app.models.domain.visit
 import app.models.domain.token
 import app.models.domain.schedule
 import app.models.domain.course
+import app.models.domain.email_outbox
+import app.models.domain.rollup
+
+# "full": crea las tablas y el administrador en cada arranque (comportamiento original)
+# "fast": confía en la revisión de Alembic y no crea tablas ni administrador (ver `python -m app.cli create-admin`)
+STARTUP_MODE = settings.STARTUP_MODE
+ALEMBIC_INI = Path(__file__).resolve().parent.parent.parent / "alembic.ini"
 
 
 # Se inicia la base de datos y de ser el caso crea la tabla
@@ -15,3 +30,58 @@ def init_db():
         print("Tablas creadas exitosamente.")
     except Exception as e:
         print(f"Error al crear tablas: {e}")
+
+
+def alembic_head_revision() -> Optional[str]:
+    """Devuelve la última revisión de las migraciones de Alembic."""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def read_database_revision(connection) -> Optional[str]:
+    """Devuelve la revisión registrada en la tabla `alembic_version`, o None si no existe."""
+    try:
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except SQLAlchemyError:
+        connection.rollback()
+        return None
+
+
+def warm_connection_pool(size: int = DB_POOL_SIZE) -> Optional[str]:
+    """
+    Abre `size` conexiones del pool para que las primeras peticiones no paguen el login.
+
+    Aprovecha la primera conexión para leer la revisión de Alembic y la devuelve.
+    """
+    connections = [engine.connect() for _ in range(max(size, 1))]
+    try:
+        return read_database_revision(connections[0])
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def startup_db(mode: str = STARTUP_MODE) -> bool:
+    """
+    Prepara la base de datos al iniciar la aplicación.
+
+    En modo "fast" se calienta el pool y, si la revisión de la base coincide con
+    la última migración, no se ejecuta `create_all` ni la creación del
+    administrador. Si la revisión no coincide se vuelve al modo completo.
+    Devuelve True si se usó el camino rápido.
+    """
+    if mode == "fast":
+        database_revision = warm_connection_pool()
+        head_revision = alembic_head_revision()
+        if database_revision is not None and database_revision == head_revision:
+            print(f"Esquema en la revisión {database_revision}, se omite la creación de tablas.")
+            return True
+        print(f"La revisión de la base ({database_revision}) no coincide con {head_revision}, "
+              f"se inicia en modo completo.")
+    init_db()
+    create_admin_user()
+    return False
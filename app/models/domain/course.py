@@ -1,5 +1,7 @@
 # app/models/domain/owner.py
-from sqlalchemy import Column, Integer, String, Text, Date, Float
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, Date, Float, DateTime, func
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
@@ -16,6 +18,26 @@ class Course(Base):
     end_date = Column(Date, nullable=False)
     price = Column(Float, nullable=False)
     capacity = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow,
+                        server_default=func.now())
     schedule = relationship("Schedule", back_populates="course", cascade="all, delete-orphan")
     applicant = relationship('Applicant', back_populates='course', cascade='all, delete-orphan')  # Relación con Applicant
 
+
+
+class CourseNotification(Base):
+    """
+    Notificación enviada a los solicitantes de un curso.
+
+    Los correos se guardan en la bandeja de salida con el id de la notificación;
+    el avance se calcula a partir de su estado, así cualquier worker puede
+    responderlo y sobrevive a los reinicios. `course_id` no es una clave foránea
+    para que el registro se conserve aunque se elimine el curso.
+    """
+    __tablename__ = "course_notifications"
+
+    id = Column(String(36), primary_key=True)
+    course_id = Column(Integer, nullable=False, index=True)
+    subject = Column(String(255), nullable=False)
+    total = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
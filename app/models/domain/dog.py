@@ -1,7 +1,9 @@
 # app/models/domain/dog.py
+from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, Boolean, Enum as SQLAEnum, Text, LargeBinary
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Boolean, Enum as SQLAEnum, Text, LargeBinary, \
+    DateTime, func, Index
 from sqlalchemy.dialects.mysql import LONGBLOB
 from sqlalchemy.orm import relationship
 from app.models.schema.owner import OwnerCreate
@@ -30,6 +32,9 @@ class Dog(Base):
     is_sterilized = Column(Boolean, unique=False, nullable=False)
     is_dewormed = Column(Boolean, unique=False, nullable=False)
     operation = Column(String(255), nullable=True)
+    # Última modificación; junto con el número de filas forma la versión de la colección (ETag)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow,
+                        server_default=func.now())
 
 
 class StaticDog(Dog):
@@ -38,6 +43,10 @@ class StaticDog(Dog):
 
 class AdoptionDog(Dog):
     __tablename__ = "adoption_dogs"
+    # Filtros y conteos del catálogo de adopción
+    __table_args__ = (
+        Index("ix_adoption_dogs_facets", "gender", "is_vaccinated", "is_sterilized", "is_dewormed", "age"),
+    )
 
     def adopt(self, date: Date, owner_create: OwnerCreate):
         owner = Owner(
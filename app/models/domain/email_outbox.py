@@ -0,0 +1,47 @@
+# app/models/domain/email_outbox.py
+import enum
+import json
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum
+
+from app.db.database import Base
+from app.services.crypt import encrypt_str_data, decrypt_str_data
+
+
+class EmailStatus(enum.Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class EmailOutbox(Base):
+    """
+    Correo pendiente de envío.
+
+    El contexto de la plantilla puede incluir códigos de recuperación o
+    contraseñas generadas, por lo que se guarda cifrado y se borra al enviarse.
+    """
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    template = Column(String(100), nullable=False)
+    context = Column(Text, nullable=True)
+    status = Column(Enum(EmailStatus), nullable=False, default=EmailStatus.PENDING, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    claim_token = Column(String(36), nullable=True)
+    last_error = Column(Text, nullable=True)
+    # Notificación de curso a la que pertenece el correo, si la hay
+    notification_id = Column(String(36), nullable=True, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    def set_context(self, context: dict):
+        self.context = encrypt_str_data(json.dumps(context))
+
+    def get_context(self) -> dict:
+        return json.loads(decrypt_str_data(self.context)) if self.context else {}
@@ -3,7 +3,7 @@ from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
-from app.services.crypt import decrypt_str_data, encrypt_str_data
+from app.services.crypt import decrypt_str_data, encrypt_str_data, encrypt_str_data_batch
 
 
 # Se crea el modelo paara un usuario
@@ -24,3 +24,13 @@ class Owner(Base):
     def decrypt_owner_data(self):
         self.direction = decrypt_str_data(self.direction)
         self.cellphone = decrypt_str_data(self.cellphone)
+
+    @staticmethod
+    def crypt_owners_data(owners):
+        """Cifra los datos de varios dueños reutilizando el cifrado por lotes."""
+        owners = list(owners)
+        directions = encrypt_str_data_batch([owner.direction for owner in owners])
+        cellphones = encrypt_str_data_batch([owner.cellphone for owner in owners])
+        for owner, direction, cellphone in zip(owners, directions, cellphones):
+            owner.direction = direction
+            owner.cellphone = cellphone
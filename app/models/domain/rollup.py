@@ -0,0 +1,20 @@
+# app/models/domain/rollup.py
+from sqlalchemy import Column, Integer, Date
+
+from app.db.database import Base
+
+
+class DailyAdoptionStats(Base):
+    """Perros adoptados por día de adopción, mantenido por las funciones que adoptan y des adoptan."""
+    __tablename__ = "daily_adoption_stats"
+
+    day = Column(Date, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+
+class DailyVisitStats(Base):
+    """Visitas registradas por día de visita."""
+    __tablename__ = "daily_visit_stats"
+
+    day = Column(Date, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
@@ -1,7 +1,8 @@
 # app/models/domain/owner.py
+from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, Enum as SQLAEnum
+from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, Enum as SQLAEnum, DateTime, func
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
@@ -27,5 +28,7 @@ class Schedule(Base):
     start_hour = Column(String(10), nullable=False)
     end_hour = Column(String(10), nullable=False)
     course_id = Column(Integer, ForeignKey('course.id'))
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow,
+                        server_default=func.now())
 
     course = relationship("Course", back_populates="schedule")
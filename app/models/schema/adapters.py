@@ -0,0 +1,38 @@
+# app/models/schema/adapters.py
+"""
+`TypeAdapter`s de los listados, construidos una sola vez al importar.
+
+Los listados grandes se validan desde los objetos del ORM y se serializan a
+JSON en una sola pasada de pydantic-core, sin el paso intermedio por
+diccionarios de Python que hace FastAPI con `response_model`.
+"""
+from typing import Any, Iterable, List
+
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+from app.models.schema.applicant import ApplicantResponse
+from app.models.schema.course import CourseResponse
+from app.models.schema.dog import StaticDogResponse, AdoptedDogResponse, AdoptionDogFacetedResponse
+from app.models.schema.owner import OwnerSecureResponse
+from app.models.schema.user import UserResponse
+from app.models.schema.visit import VisitResponse, VisitListNormalizedResponse
+
+STATIC_DOG_LIST_ADAPTER = TypeAdapter(List[StaticDogResponse])
+ADOPTED_DOG_LIST_ADAPTER = TypeAdapter(List[AdoptedDogResponse])
+VISIT_LIST_ADAPTER = TypeAdapter(List[VisitResponse])
+OWNER_LIST_ADAPTER = TypeAdapter(List[OwnerSecureResponse])
+USER_LIST_ADAPTER = TypeAdapter(List[UserResponse])
+COURSE_LIST_ADAPTER = TypeAdapter(List[CourseResponse])
+APPLICANT_LIST_ADAPTER = TypeAdapter(List[ApplicantResponse])
+VISIT_LIST_NORMALIZED_ADAPTER = TypeAdapter(VisitListNormalizedResponse)
+ADOPTION_DOG_FACETED_ADAPTER = TypeAdapter(AdoptionDogFacetedResponse)
+
+
+def dump_json(adapter: TypeAdapter, rows: Iterable[Any]) -> bytes:
+    """Valida los objetos del ORM con el adaptador y devuelve el JSON en bytes."""
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+
+def json_response(adapter: TypeAdapter, rows: Iterable[Any]) -> Response:
+    return Response(content=dump_json(adapter, rows), media_type="application/json")
@@ -0,0 +1,35 @@
+# app/models/schema/bulk_import.py
+from enum import Enum
+from typing import List
+
+from pydantic import BaseModel
+
+
+class ImportKind(str, Enum):
+    STATIC_DOG = "static_dog"
+    ADOPTION_DOG = "adoption_dog"
+    ADOPTED_DOG = "adopted_dog"
+    VISIT = "visit"
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ImportRowError(BaseModel):
+    row: int
+    detail: str
+
+
+class ImportCreatedRow(BaseModel):
+    row: int
+    id: int
+
+
+class ImportReport(BaseModel):
+    kind: ImportKind
+    total: int
+    inserted: int
+    created: List[ImportCreatedRow]
+    errors: List[ImportRowError]
@@ -30,3 +30,18 @@ class CourseResponse(CourseBase):
 
     class Config:
         from_attributes = True
+
+
+class CourseNotificationCreate(BaseModel):
+    subject: str
+    message: str
+
+
+class CourseNotificationJob(BaseModel):
+    job_id: str
+    course_id: int
+    status: str
+    total: int
+    sent: int
+    failed: int
+    errors: List[str]
@@ -1,10 +1,10 @@
 # app/models/schema/dog.py
 from datetime import date
-from typing import Optional
+from typing import Dict, Optional, List
 
 from fastapi import UploadFile, File
-from pydantic import BaseModel, Field
-from app.models.schema.owner import OwnerBase, OwnerResponse
+from pydantic import BaseModel, Field, model_validator
+from app.models.schema.owner import OwnerBase, OwnerResponse, OwnerCreate
 from app.models.domain.dog import Gender
 
 
@@ -73,6 +73,10 @@ class AdoptedDogCreate(AdoptedDogBase):
     owner_id: int
 
 
+class AdoptedDogImport(AdoptedDogBase):
+    owner: OwnerCreate
+
+
 class AdoptedDogUpdate(AdoptionDogBase):
     adopted_date: date
     pass
@@ -96,3 +100,93 @@ class AdoptedDogResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class AdoptedDogNormalizedResponse(BaseModel):
+    """Perro adoptado sin el dueño embebido; el dueño se envía aparte por `owner_id`."""
+    id: int
+    id_chip: Optional[int]
+    name: str
+    about: Optional[str]
+    age: int
+    is_vaccinated: bool
+    image: Optional[str]
+    gender: Gender
+    entry_date: Optional[date]
+    is_sterilized: bool
+    is_dewormed: bool
+    operation: Optional[str]
+    adopted_date: date
+    owner_id: Optional[int]
+
+
+# Schema for adoption catalog filters
+class AdoptionDogFilters(BaseModel):
+    gender: Optional[Gender] = None
+    is_vaccinated: Optional[bool] = None
+    is_sterilized: Optional[bool] = None
+    is_dewormed: Optional[bool] = None
+    min_age: Optional[int] = None
+    max_age: Optional[int] = None
+    entry_date_from: Optional[date] = None
+    entry_date_to: Optional[date] = None
+
+
+class AdoptionDogFacets(BaseModel):
+    """Cantidad de perros por cada valor, como claves de texto (`"male"`, `"true"`)."""
+    gender: Dict[str, int]
+    is_vaccinated: Dict[str, int]
+    is_sterilized: Dict[str, int]
+    is_dewormed: Dict[str, int]
+
+
+class AdoptionDogFacetedResponse(BaseModel):
+    total: int
+    results: List[StaticDogResponse]
+    facets: AdoptionDogFacets
+
+
+# Schema for chip lookup
+class ChipLookupResponse(BaseModel):
+    kind: str
+    id: int
+    id_chip: int
+    name: str
+    image: Optional[str]
+    owner: Optional[OwnerResponse]
+
+
+# Schema for search
+class DogSearchResult(BaseModel):
+    kind: str
+    id: int
+    name: str
+    about: Optional[str]
+    image: Optional[str]
+    score: float
+
+
+# Schema for batch adoptions
+class AdoptionBatchItem(BaseModel):
+    dog_id: int
+    owner_id: Optional[int] = None
+    owner: Optional[OwnerCreate] = None
+    adoption_date: date
+
+    @model_validator(mode="after")
+    def check_owner(self):
+        if (self.owner_id is None) == (self.owner is None):
+            raise ValueError("Se debe enviar owner_id o owner, pero no ambos")
+        return self
+
+
+class AdoptionBatchResult(BaseModel):
+    dog_id: int
+    success: bool
+    detail: str
+    owner_id: Optional[int] = None
+
+
+class AdoptionBatchResponse(BaseModel):
+    adopted: int
+    results: List[AdoptionBatchResult]
@@ -0,0 +1,98 @@
+# app/models/schema/stats.py
+from datetime import date, datetime
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class DogCategoryStats(BaseModel):
+    kind: str
+    total: int
+    vaccinated: int
+    sterilized: int
+    vaccinated_ratio: float
+    sterilized_ratio: float
+
+
+class MonthlyCount(BaseModel):
+    year: int
+    month: int
+    count: int
+
+
+class CourseSeats(BaseModel):
+    course_id: int
+    name: str
+    capacity: int
+    applicants: int
+    open_seats: int
+
+
+class DashboardStats(BaseModel):
+    dogs: List[DogCategoryStats]
+    total_dogs: int
+    vaccinated_ratio: float
+    sterilized_ratio: float
+    adoptions_per_month: List[MonthlyCount]
+    average_days_to_adoption: Optional[float]
+    visits_per_month: List[MonthlyCount]
+    courses: List[CourseSeats]
+    open_seats: int
+    generated_at: datetime
+
+
+class TrendMetric(str, Enum):
+    ADOPTIONS = "adoptions"
+    VISITS = "visits"
+
+
+class TrendPeriod(str, Enum):
+    DAY = "day"
+    MONTH = "month"
+    YEAR = "year"
+
+
+class TrendPoint(BaseModel):
+    period: date
+    total: int
+
+
+class TrendResponse(BaseModel):
+    metric: TrendMetric
+    period: TrendPeriod
+    points: List[TrendPoint]
+
+
+class CohortBy(str, Enum):
+    ENTRY_YEAR = "entry_year"
+    GENDER = "gender"
+    AGE_BAND = "age_band"
+
+
+class DaysSummary(BaseModel):
+    count: int
+    mean_days: Optional[float]
+    p25_days: Optional[float]
+    median_days: Optional[float]
+    p75_days: Optional[float]
+    p90_days: Optional[float]
+
+
+class CohortTimeToAdoption(DaysSummary):
+    cohort: str
+
+
+class VisitCompliance(BaseModel):
+    within_days: int
+    eligible_dogs: int
+    visited_dogs: int
+    share: Optional[float]
+    days_to_first_visit: DaysSummary
+
+
+class CohortAnalyticsResponse(BaseModel):
+    cohort_by: CohortBy
+    time_to_adoption: List[CohortTimeToAdoption]
+    visit_compliance: VisitCompliance
+    visit_intervals: DaysSummary
@@ -1,10 +1,19 @@
 # app/models/schema/visit.py
-from typing import Optional
+from enum import Enum
+from typing import Optional, Dict, List
 
 from pydantic import BaseModel
 from datetime import date
 
-from app.models.schema.dog import AdoptedDogResponse
+from app.models.schema.dog import AdoptedDogResponse, AdoptedDogNormalizedResponse
+from app.models.schema.owner import OwnerResponse
+
+
+class VisitListFormat(str, Enum):
+    # Cada visita con su perro y dueño embebidos
+    EMBEDDED = "embedded"
+    # Visitas con `adopted_dog_id`; perros y dueños una sola vez en mapas aparte
+    NORMALIZED = "normalized"
 
 
 class VisitBase(BaseModel):
@@ -25,6 +34,17 @@ class VisitResponse(VisitBase):
         from_attributes = True
 
 
+class VisitNormalizedResponse(VisitBase):
+    id: int
+    adopted_dog_id: int
+
+
+class VisitListNormalizedResponse(BaseModel):
+    visits: List[VisitNormalizedResponse]
+    dogs: Dict[int, AdoptedDogNormalizedResponse]
+    owners: Dict[int, OwnerResponse]
+
+
 class VisitUpdate(VisitBase):
     adopted_dog_id: int
     id: int
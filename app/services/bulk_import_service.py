@@ -0,0 +1,223 @@
+# app/services/bulk_import_service.py
+import base64
+import binascii
+import csv
+import io
+import json
+from typing import Iterable, Iterator, List, Optional, Tuple, get_args
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import emit, STATIC_DOG_CHANGED, ADOPTION_DOG_CHANGED, ADOPTED_DOG_CHANGED
+from app.crud.bulk_import import insert_rows_without_commit, insert_adopted_dogs_with_owners_without_commit, \
+    read_existing_adopted_dog_ids
+from app.crud.rollup import add_daily_counts, count_days
+from app.models.domain.dog import StaticDog, AdoptionDog
+from app.models.domain.owner import Owner
+from app.models.domain.rollup import DailyAdoptionStats, DailyVisitStats
+from app.models.domain.visit import Visit
+from app.models.schema.bulk_import import ImportKind, ImportFormat, ImportReport, ImportRowError, ImportCreatedRow
+from app.models.schema.dog import StaticDogCreate, AdoptionDogCreate, AdoptedDogImport
+from app.models.schema.visit import VisitCreate
+from app.services.images_control_service import verify_image_size
+
+# Número de filas que se insertan por transacción
+IMPORT_CHUNK_SIZE = settings.IMPORT_CHUNK_SIZE
+
+# Columnas planas que se usan en CSV para los datos del dueño
+OWNER_CSV_PREFIX = "owner_"
+
+# Evento que se emite después de confirmar cada lote
+IMPORT_EVENTS = {
+    ImportKind.STATIC_DOG: STATIC_DOG_CHANGED,
+    ImportKind.ADOPTION_DOG: ADOPTION_DOG_CHANGED,
+    ImportKind.ADOPTED_DOG: ADOPTED_DOG_CHANGED,
+}
+
+IMPORT_SCHEMAS = {
+    ImportKind.STATIC_DOG: StaticDogCreate,
+    ImportKind.ADOPTION_DOG: AdoptionDogCreate,
+    ImportKind.ADOPTED_DOG: AdoptedDogImport,
+    ImportKind.VISIT: VisitCreate,
+}
+
+DOG_COLUMNS = ["id_chip", "name", "about", "age", "is_vaccinated", "gender", "entry_date", "is_sterilized",
+               "is_dewormed", "operation"]
+
+
+def detect_format(filename: Optional[str]) -> Optional[ImportFormat]:
+    """Deduce el formato del archivo a partir de su extensión."""
+    if not filename:
+        return None
+    extension = filename.rsplit(".", 1)[-1].lower()
+    if extension == "csv":
+        return ImportFormat.CSV
+    if extension in ("ndjson", "jsonl"):
+        return ImportFormat.NDJSON
+    return None
+
+
+def parse_rows(content: str, file_format: ImportFormat) -> Iterator[Tuple[int, object]]:
+    """
+    Devuelve las filas del archivo como tuplas `(número de fila, datos)`.
+
+    En CSV las celdas vacías se interpretan como `None` y las columnas
+    `owner_name`, `owner_direction` y `owner_cellphone` se agrupan en `owner`.
+    Si una línea NDJSON no es JSON válido se devuelve el error como datos para
+    reportarlo en esa fila.
+    """
+    if file_format == ImportFormat.CSV:
+        reader = csv.DictReader(io.StringIO(content))
+        for row_number, row in enumerate(reader, start=2):
+            data = {}
+            owner = {}
+            for key, value in row.items():
+                if key is None:
+                    continue
+                value = value if value != "" else None
+                if key.startswith(OWNER_CSV_PREFIX) and key != "owner_id":
+                    owner[key[len(OWNER_CSV_PREFIX):]] = value
+                else:
+                    data[key] = value
+            if owner:
+                data["owner"] = owner
+            yield row_number, data
+    else:
+        for row_number, line in enumerate(content.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                yield row_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_number, e
+
+
+def _fill_optional_fields(schema: type, data: dict) -> dict:
+    # Los esquemas declaran los campos opcionales sin valor por defecto
+    for name, field in schema.model_fields.items():
+        if name not in data and type(None) in get_args(field.annotation):
+            data[name] = None
+    return data
+
+
+def _decode_image(value: Optional[str]) -> Optional[bytes]:
+    if not value:
+        return None
+    try:
+        image_data = base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Invalid image encoding")
+    try:
+        return verify_image_size(image_data)
+    except ValueError:
+        raise ValueError("Invalid image size")
+
+
+def validate_rows(kind: ImportKind, rows: Iterable[Tuple[int, object]]) \
+        -> Tuple[List[Tuple[int, BaseModel, Optional[bytes]]], List[ImportRowError], int]:
+    """
+    Valida cada fila con el esquema Pydantic del tipo de importación.
+
+    Devuelve las filas válidas junto con su imagen decodificada, los errores por
+    fila y el total de filas leídas.
+    """
+    schema = IMPORT_SCHEMAS[kind]
+    valid_rows = []
+    errors = []
+    total = 0
+    for row_number, data in rows:
+        total += 1
+        if not isinstance(data, dict):
+            errors.append(ImportRowError(row=row_number, detail=f"Fila inválida: {data}"))
+            continue
+        try:
+            item = schema.model_validate(_fill_optional_fields(schema, data))
+            image = _decode_image(item.evidence if kind == ImportKind.VISIT else item.image)
+        except ValidationError as e:
+            detail = "; ".join(f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors())
+            errors.append(ImportRowError(row=row_number, detail=detail))
+            continue
+        except ValueError as e:
+            errors.append(ImportRowError(row=row_number, detail=str(e)))
+            continue
+        valid_rows.append((row_number, item, image))
+    return valid_rows, errors, total
+
+
+def _dog_values(item: BaseModel, image: Optional[bytes]) -> dict:
+    values = {column: getattr(item, column) for column in DOG_COLUMNS}
+    values["image"] = image
+    return values
+
+
+def _insert_chunk(db: Session, kind: ImportKind, chunk: List[Tuple[int, BaseModel, Optional[bytes]]],
+                  errors: List[ImportRowError]) -> List[Tuple[int, int]]:
+    if kind == ImportKind.STATIC_DOG:
+        ids = insert_rows_without_commit(db, StaticDog, [_dog_values(item, image) for _, item, image in chunk])
+        return [(row_number, dog_id) for (row_number, _, _), dog_id in zip(chunk, ids)]
+    if kind == ImportKind.ADOPTION_DOG:
+        ids = insert_rows_without_commit(db, AdoptionDog, [_dog_values(item, image) for _, item, image in chunk])
+        return [(row_number, dog_id) for (row_number, _, _), dog_id in zip(chunk, ids)]
+    if kind == ImportKind.ADOPTED_DOG:
+        rows = []
+        owners = []
+        for _, item, image in chunk:
+            values = _dog_values(item, image)
+            values["adopted_date"] = item.adopted_date
+            rows.append(values)
+            owners.append(Owner(name=item.owner.name, direction=item.owner.direction,
+                                cellphone=item.owner.cellphone))
+        ids = insert_adopted_dogs_with_owners_without_commit(db, rows, owners)
+        add_daily_counts(db, DailyAdoptionStats, count_days(row["adopted_date"] for row in rows))
+        return [(row_number, dog_id) for (row_number, _, _), dog_id in zip(chunk, ids)]
+
+    # Visitas: solo se insertan las que apuntan a un perro adoptado existente
+    existing_dogs = read_existing_adopted_dog_ids(db, [item.adopted_dog_id for _, item, _ in chunk])
+    visits = []
+    for row_number, item, image in chunk:
+        if item.adopted_dog_id not in existing_dogs:
+            errors.append(ImportRowError(row=row_number,
+                                         detail=f'No se encontró al perro con id: {item.adopted_dog_id}'))
+            continue
+        visits.append((row_number, {
+            "visit_date": item.visit_date,
+            "evidence": image,
+            "observations": item.observations,
+            "adopted_dog_id": item.adopted_dog_id,
+        }))
+    ids = insert_rows_without_commit(db, Visit, [values for _, values in visits])
+    add_daily_counts(db, DailyVisitStats, count_days(values["visit_date"] for _, values in visits))
+    return [(row_number, visit_id) for (row_number, _), visit_id in zip(visits, ids)]
+
+
+def import_records(db: Session, kind: ImportKind, content: str, file_format: ImportFormat,
+                   chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportReport:
+    """
+    Importa perros o visitas desde un archivo CSV o NDJSON.
+
+    Las filas se validan con los esquemas existentes y las válidas se insertan
+    en lotes de `chunk_size`, cada lote dentro de su propia transacción. Si un
+    lote falla se revierte completo y se reporta el error en cada una de sus filas.
+    """
+    valid_rows, errors, total = validate_rows(kind, parse_rows(content, file_format))
+    created = []
+    for start in range(0, len(valid_rows), chunk_size):
+        chunk = valid_rows[start:start + chunk_size]
+        chunk_errors = []
+        try:
+            chunk_created = _insert_chunk(db, kind, chunk, chunk_errors)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            detail = str(getattr(e, "orig", None) or e)
+            errors.extend(ImportRowError(row=row_number, detail=detail) for row_number, _, _ in chunk)
+            continue
+        if kind in IMPORT_EVENTS:
+            emit(IMPORT_EVENTS[kind], ids=[record_id for _, record_id in chunk_created])
+        errors.extend(chunk_errors)
+        created.extend(ImportCreatedRow(row=row_number, id=record_id) for row_number, record_id in chunk_created)
+    errors.sort(key=lambda error: error.row)
+    return ImportReport(kind=kind, total=total, inserted=len(created), created=created, errors=errors)
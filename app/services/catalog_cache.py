@@ -0,0 +1,82 @@
+# app/services/catalog_cache.py
+"""
+Caché de las respuestas públicas del catálogo (perros en adopción y cursos).
+
+Las respuestas se guardan ya serializadas a JSON y se invalidan con los
+eventos que emiten las funciones CRUD al confirmar un cambio. Los listados
+además llevan un ETag calculado con la versión de la colección, de modo que
+navegadores y proxies pueden revalidar con `If-None-Match` y recibir un 304.
+"""
+import hashlib
+from datetime import datetime
+from typing import Callable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.core.compression import negotiate_encoding, should_compress, compress, encoded_response
+from app.core.http_cache import make_etag, etag_matches, cache_headers
+from app.core.events import subscribe, ADOPTION_DOG_CHANGED, COURSE_CHANGED
+from app.core.response_cache import response_cache, cache_key
+from app.core.single_flight import single_flight
+
+ADOPTION_DOGS = "adoption_dogs"
+COURSES = "courses"
+
+
+@subscribe(ADOPTION_DOG_CHANGED)
+def invalidate_adoption_dogs(ids=None):
+    response_cache.invalidate(ADOPTION_DOGS)
+
+
+@subscribe(COURSE_CHANGED)
+def invalidate_courses(ids=None):
+    response_cache.invalidate(COURSES)
+
+
+def cached_json_response(namespace: str, request: Request, producer: Callable[[], bytes],
+                         version: Tuple = ()) -> Response:
+    """
+    Devuelve la respuesta guardada para la ruta y sus parámetros o la genera con `producer`.
+
+    Si `producer` lanza una `HTTPException` (por ejemplo un 404) no se guarda nada.
+    Cuando la respuesta no está guardada, las peticiones simultáneas a la misma
+    ruta esperan a una sola consulta en lugar de repetirla cada una. Si se pasa
+    la versión de la colección forma parte de la clave, así otro worker nunca
+    sirve una respuesta anterior a esa versión.
+
+    La forma comprimida (gzip o brotli) también se guarda, así la compresión se
+    hace una vez por cada llenado del caché y no en cada petición. Su clave lleva
+    un hash del contenido sin comprimir: si una invalidación llega después de leer
+    `content`, la versión comprimida de ese contenido viejo nunca la encuentra una
+    petición que ya tiene el contenido nuevo.
+    """
+    key = cache_key(request) + "".join(f"|{part}" for part in version)
+    content = response_cache.get(namespace, key)
+    if content is None:
+        content = single_flight.do((namespace, key), lambda: response_cache.get_or_set(namespace, key, producer))
+    encoding = negotiate_encoding(request.headers.get("accept-encoding")) if should_compress(content) else None
+    if encoding is None:
+        return encoded_response(content, None)
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    compressed = response_cache.get_or_set(namespace, f"{key}|{encoding}|{digest}",
+                                           lambda: compress(content, encoding))
+    return encoded_response(compressed, encoding)
+
+
+def versioned_json_response(request: Request, version: Tuple[Optional[datetime], int],
+                            producer: Callable[[], bytes], namespace: Optional[str] = None) -> Response:
+    """
+    Responde un listado público con `ETag` y `Cache-Control`.
+
+    Si el cliente envía un `If-None-Match` que coincide se responde 304 sin
+    llamar a `producer`, es decir, sin cargar las filas.
+    """
+    etag = make_etag(cache_key(request), *version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={**cache_headers(etag), "Vary": "Accept-Encoding"})
+    if namespace is None:
+        response = Response(content=producer(), media_type="application/json")
+    else:
+        response = cached_json_response(namespace, request, producer, version)
+    response.headers.update(cache_headers(etag))
+    return response
@@ -0,0 +1,140 @@
+# app/services/cohort_analytics.py
+"""
+Análisis por cohortes del tiempo hasta la adopción y del seguimiento con visitas.
+
+Las columnas se leen con una consulta por tabla y se convierten a arreglos de
+NumPy; todos los cálculos son operaciones sobre arreglos completos, sin recorrer
+las filas en Python. Solo se itera sobre las cohortes, que son pocas.
+
+NumPy es opcional: si no está instalado el resto de la API funciona igual y
+solo este análisis responde que no está disponible.
+"""
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.crud.stats import read_adopted_dog_columns, read_visit_columns
+
+PERCENTILES = (25, 50, 75, 90)
+# Límites (en años) de los grupos de edad: <1, 1-3, 4-7 y 8 o más
+AGE_BAND_LIMITS = (1, 4, 8)
+AGE_BAND_NAMES = ("cachorro", "joven", "adulto", "mayor")
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def numpy_available() -> bool:
+    return _numpy() is not None
+
+
+def _dates(np, values):
+    # None se convierte en NaT
+    return np.array(values, dtype="datetime64[D]")
+
+
+def summarize_days(np, days) -> dict:
+    """Cantidad, promedio y percentiles de un arreglo de días."""
+    if not days.size:
+        return {"count": 0, "mean_days": None, "p25_days": None, "median_days": None, "p75_days": None,
+                "p90_days": None}
+    p25, p50, p75, p90 = np.percentile(days, PERCENTILES)
+    return {"count": int(days.size), "mean_days": round(float(days.mean()), 1), "p25_days": float(p25),
+            "median_days": float(p50), "p75_days": float(p75), "p90_days": float(p90)}
+
+
+def cohort_labels(np, dogs: Dict[str, tuple], cohort_by: str):
+    """Etiqueta de cohorte de cada perro: año de ingreso, sexo o grupo de edad."""
+    if cohort_by == "entry_year":
+        entry = _dates(np, dogs["entry_date"])
+        years = entry.astype("datetime64[Y]").astype("int64") + 1970
+        return np.where(np.isnat(entry), "sin fecha", years.astype(str))
+    if cohort_by == "gender":
+        # El sexo llega como Enum: se traduce cada valor distinto una sola vez
+        values, inverse = np.unique(np.array(dogs["gender"], dtype=object), return_inverse=True)
+        names = np.array([getattr(value, "value", value) for value in values], dtype=object)
+        return names[inverse].astype(str) if values.size else np.array([], dtype=str)
+    ages = np.array(dogs["age"], dtype="int64")
+    return np.array(AGE_BAND_NAMES)[np.digitize(ages, AGE_BAND_LIMITS)]
+
+
+def time_to_adoption_by_cohort(np, dogs: Dict[str, tuple], cohort_by: str) -> List[dict]:
+    """Distribución de los días entre el ingreso y la adopción para cada cohorte."""
+    entry = _dates(np, dogs["entry_date"])
+    adopted = _dates(np, dogs["adopted_date"])
+    valid = ~np.isnat(entry) & ~np.isnat(adopted)
+    waited = (adopted - entry).astype("int64")
+    valid &= waited >= 0
+    labels = cohort_labels(np, dogs, cohort_by)[valid]
+    waited = waited[valid]
+    if not waited.size:
+        return []
+    order = np.argsort(labels, kind="stable")
+    labels, waited = labels[order], waited[order]
+    cohorts, starts = np.unique(labels, return_index=True)
+    return [{"cohort": str(cohort), **summarize_days(np, group)}
+            for cohort, group in zip(cohorts, np.split(waited, starts[1:]))]
+
+
+def visit_compliance(np, dogs: Dict[str, tuple], visits: Dict[str, tuple], within_days: int,
+                     today: Optional[date] = None) -> dict:
+    """
+    Proporción de perros adoptados que recibieron una visita dentro de `within_days` días.
+
+    Solo se cuentan los perros adoptados hace al menos `within_days` días, los más
+    recientes todavía están a tiempo. También resume los días hasta la primera visita.
+    """
+    today = np.datetime64(today or date.today(), "D")
+    dog_ids = np.array(dogs["id"], dtype="int64")
+    adopted = _dates(np, dogs["adopted_date"])
+    visit_dogs = np.array(visits["adopted_dog_id"], dtype="int64")
+    visit_dates = _dates(np, visits["visit_date"])
+
+    # Visitas hechas desde la adopción; los ids de los perros vienen ordenados
+    if dog_ids.size:
+        position = np.minimum(np.searchsorted(dog_ids, visit_dogs), dog_ids.size - 1)
+        after = (dog_ids[position] == visit_dogs) & (visit_dates >= adopted[position])
+    else:
+        after = np.zeros(visit_dogs.size, dtype=bool)
+
+    # Las visitas vienen ordenadas por perro y fecha: la primera de cada perro es su primera aparición
+    visited_dogs, first = np.unique(visit_dogs[after], return_index=True)
+    days_to_first = (visit_dates[after][first] - adopted[np.searchsorted(dog_ids, visited_dogs)]).astype("int64")
+
+    eligible = ~np.isnat(adopted) & (adopted <= today - np.timedelta64(within_days, "D"))
+    on_time = np.isin(dog_ids[eligible], visited_dogs[days_to_first <= within_days])
+    eligible_dogs = int(eligible.sum())
+    visited = int(on_time.sum())
+    return {
+        "within_days": within_days,
+        "eligible_dogs": eligible_dogs,
+        "visited_dogs": visited,
+        "share": round(visited / eligible_dogs, 4) if eligible_dogs else None,
+        "days_to_first_visit": summarize_days(np, days_to_first),
+    }
+
+
+def visit_intervals(np, visits: Dict[str, tuple]) -> dict:
+    """Días entre visitas consecutivas al mismo perro."""
+    visit_dogs = np.array(visits["adopted_dog_id"], dtype="int64")
+    visit_dates = _dates(np, visits["visit_date"])
+    same_dog = visit_dogs[1:] == visit_dogs[:-1]
+    return summarize_days(np, np.diff(visit_dates).astype("int64")[same_dog])
+
+
+def cohort_analytics(db: Session, cohort_by: str, within_days: int, today: Optional[date] = None) -> dict:
+    np = _numpy()
+    dogs = read_adopted_dog_columns(db)
+    visits = read_visit_columns(db)
+    return {
+        "cohort_by": cohort_by,
+        "time_to_adoption": time_to_adoption_by_cohort(np, dogs, cohort_by),
+        "visit_compliance": visit_compliance(np, dogs, visits, within_days, today),
+        "visit_intervals": visit_intervals(np, visits),
+    }
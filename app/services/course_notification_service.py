@@ -0,0 +1,77 @@
+# app/services/course_notification_service.py
+"""
+Notificaciones por correo a los solicitantes de un curso.
+
+Los correos se encolan en la bandeja de salida junto con el registro de la
+notificación, en una sola transacción; el worker de la bandeja los envía con
+sus conexiones SMTP y sus reintentos. El avance se calcula con el estado de
+esos correos, por lo que cualquier worker puede consultarlo y no se pierde si
+el proceso se reinicia.
+"""
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.applicant import read_applicant_contacts_by_course
+from app.crud.course import read_course_by_id, create_course_notification_without_commit, read_course_notification
+from app.crud.outbox import enqueue_emails_without_commit, count_emails_by_status, read_failed_email_errors
+from app.models.domain.course import CourseNotification
+from app.models.domain.email_outbox import EmailStatus
+from app.models.schema.course import CourseNotificationCreate, CourseNotificationJob
+from app.services.mailer import notify_outbox
+
+NOTIFICATION_BATCH_SIZE = settings.NOTIFICATION_BATCH_SIZE
+NOTIFICATION_TEMPLATE = "course_notification.html"
+
+
+def queue_course_notification(db: Session, course_id: int, notification: CourseNotificationCreate) \
+        -> CourseNotificationJob:
+    """
+    Encola un correo para cada solicitante del curso y registra la notificación.
+
+    Los contactos se leen y descifran por lotes; todo se confirma al final, así
+    nunca queda una notificación con solo una parte de sus correos.
+    """
+    course = read_course_by_id(db, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="No se encontraron cursos")
+    # El mensaje es el mismo para todos los solicitantes
+    context = {"body": {"title": "Poliperros App", "course": course.name, "message": notification.message}}
+    job_id = str(uuid.uuid4())
+    total = 0
+    try:
+        for batch in read_applicant_contacts_by_course(db, course_id, NOTIFICATION_BATCH_SIZE):
+            enqueue_emails_without_commit(db, [email for _, email in batch], notification.subject, context,
+                                          NOTIFICATION_TEMPLATE, notification_id=job_id)
+            total += len(batch)
+        if not total:
+            raise HTTPException(status_code=404, detail="El curso no tiene solicitantes")
+        create_course_notification_without_commit(
+            db, CourseNotification(id=job_id, course_id=course_id, subject=notification.subject, total=total))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    notify_outbox()
+    return get_notification_job(db, job_id)
+
+
+def get_notification_job(db: Session, job_id: str) -> CourseNotificationJob:
+    """Avance de una notificación según el estado de sus correos en la bandeja de salida."""
+    notification = read_course_notification(db, job_id)
+    if notification is None:
+        raise HTTPException(status_code=404, detail="No se encontró la notificación")
+    counts = count_emails_by_status(db, job_id)
+    sent = counts.get(EmailStatus.SENT, 0)
+    failed = counts.get(EmailStatus.FAILED, 0)
+    if sent + failed >= notification.total:
+        status = "finished"
+    elif sent or failed or counts.get(EmailStatus.SENDING, 0):
+        status = "running"
+    else:
+        status = "pending"
+    return CourseNotificationJob(job_id=job_id, course_id=notification.course_id, status=status,
+                                 total=notification.total, sent=sent, failed=failed,
+                                 errors=read_failed_email_errors(db, job_id) if failed else [])
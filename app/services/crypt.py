@@ -1,26 +1,140 @@
+import asyncio
+import binascii
 import os
+import threading
+import time
 from base64 import b64encode, b64decode
+from concurrent.futures import ThreadPoolExecutor, Future
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import padding
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from dotenv import load_dotenv
 from passlib.context import CryptContext
 
-load_dotenv()
+from app.core.config import settings
 
 # Configuración de bcrypt para hashear contraseñas
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # Obtención de la clave de cifrado
-AES_KEY = os.getenv("AES_KEY").encode()
+AES_KEY = settings.AES_KEY.encode()
+
+# Costo de bcrypt: fijo si se define BCRYPT_ROUNDS, si no se calibra al iniciar contra la latencia objetivo
+BCRYPT_ROUNDS = settings.BCRYPT_ROUNDS
+BCRYPT_MIN_ROUNDS = settings.BCRYPT_MIN_ROUNDS
+BCRYPT_MAX_ROUNDS = settings.BCRYPT_MAX_ROUNDS
+BCRYPT_TARGET_MS = settings.BCRYPT_TARGET_MS
+# Hilos dedicados a bcrypt y número máximo de operaciones en espera
+PASSWORD_HASH_WORKERS = settings.PASSWORD_HASH_WORKERS
+PASSWORD_HASH_MAX_QUEUE = settings.PASSWORD_HASH_MAX_QUEUE
+
+
+class PasswordHashingBusy(Exception):
+    """Se lanza cuando la cola de hasheo de contraseñas está llena."""
+
+
+# bcrypt se ejecuta en su propio pool para no ocupar los hilos que atienden las peticiones
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_metrics_lock = threading.Lock()
+_metrics = {"queued": 0, "running": 0, "completed": 0, "rejected": 0, "max_queue_depth": 0}
+
+
+def _submit_password_task(fn, *args) -> Future:
+    with _metrics_lock:
+        if _metrics["queued"] >= PASSWORD_HASH_MAX_QUEUE:
+            _metrics["rejected"] += 1
+            raise PasswordHashingBusy("Demasiadas operaciones de contraseña en espera")
+        _metrics["queued"] += 1
+        _metrics["max_queue_depth"] = max(_metrics["max_queue_depth"], _metrics["queued"])
+
+    def run():
+        with _metrics_lock:
+            _metrics["queued"] -= 1
+            _metrics["running"] += 1
+        try:
+            return fn(*args)
+        finally:
+            with _metrics_lock:
+                _metrics["running"] -= 1
+                _metrics["completed"] += 1
+
+    return _password_executor.submit(run)
+
+
+def password_hashing_metrics() -> dict:
+    """Devuelve el estado del pool de bcrypt: operaciones en cola, en curso, completadas y rechazadas."""
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    metrics["workers"] = PASSWORD_HASH_WORKERS
+    metrics["max_queue"] = PASSWORD_HASH_MAX_QUEUE
+    metrics["rounds"] = pwd_context.to_dict().get("bcrypt__default_rounds")
+    return metrics
+
+
+def calibrate_bcrypt_rounds(target_ms: float = BCRYPT_TARGET_MS, min_rounds: int = BCRYPT_MIN_ROUNDS,
+                            max_rounds: int = BCRYPT_MAX_ROUNDS) -> int:
+    """
+    Elige el costo de bcrypt más alto cuyo hash tarde como máximo `target_ms` en este equipo.
+
+    Cada ronda adicional duplica el tiempo, así que basta con medir el costo mínimo.
+    El costo elegido se usa para los hashes nuevos, pero se aceptan sin volver a
+    generarlos los hashes con cualquier costo entre `min_rounds` y `max_rounds`:
+    las réplicas en equipos de distinta velocidad calibran costos distintos y, si
+    se fijara uno solo, cada inicio de sesión rehashearía la contraseña de un lado
+    a otro. Con `BCRYPT_ROUNDS` se fija el costo y se acepta el mismo rango.
+    """
+    if BCRYPT_ROUNDS:
+        rounds = int(BCRYPT_ROUNDS)
+    else:
+        probe = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=min_rounds)
+        elapsed = []
+        for _ in range(3):
+            started = time.perf_counter()
+            probe.hash("calibration")
+            elapsed.append((time.perf_counter() - started) * 1000)
+        rounds = min_rounds
+        base_ms = min(elapsed)
+        while rounds < max_rounds and base_ms * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+            rounds += 1
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=min(min_rounds, rounds),
+                       bcrypt__max_rounds=max(max_rounds, rounds))
+    return rounds
 
 
 def verify_password(original_password, hashed_password):
-    return pwd_context.verify(original_password, hashed_password)
+    return _submit_password_task(pwd_context.verify, original_password, hashed_password).result()
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return _submit_password_task(pwd_context.hash, password).result()
+
+
+async def verify_and_update_password_async(original_password, hashed_password) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica la contraseña sin bloquear el event loop ni ocupar un hilo mientras espera en la cola.
+
+    Devuelve si es válida y, cuando el costo del hash guardado está fuera del
+    rango aceptado, el nuevo hash que se debe guardar.
+    """
+    future = _submit_password_task(pwd_context.verify_and_update, original_password, hashed_password)
+    return await asyncio.wrap_future(future)
+
+
+async def get_password_hash_async(password) -> str:
+    return await asyncio.wrap_future(_submit_password_task(pwd_context.hash, password))
+
+
+@lru_cache(maxsize=None)
+def _aes_primitives():
+    """
+    Importa las primitivas de AES la primera vez que se cifra o descifra algo.
+
+    Los modelos importan este módulo, así que cargar `cryptography` aquí haría
+    más lento el arranque de procesos que no cifran nada (CLI, migraciones).
+    """
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import padding
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+    return Cipher, algorithms, modes, padding, default_backend()
 
 
 def generate_iv():
@@ -28,8 +142,9 @@ def generate_iv():
 
 
 def encrypt_str_data(data: str):
+    Cipher, algorithms, modes, padding, backend = _aes_primitives()
     iv = generate_iv()
-    cipher = Cipher(algorithms.AES(AES_KEY), modes.CBC(iv), backend=default_backend())
+    cipher = Cipher(algorithms.AES(AES_KEY), modes.CBC(iv), backend=backend)
     encryptor = cipher.encryptor()
 
     # padder
@@ -42,11 +157,12 @@ def encrypt_str_data(data: str):
 
 
 def decrypt_str_data(encrypted_data: str):
+    Cipher, algorithms, modes, padding, backend = _aes_primitives()
     raw_data = b64decode(encrypted_data)
     iv = raw_data[:16]  # Extraer IV
     encrypted_data = raw_data[16:]  # Extraer datos cifrados
 
-    cipher = Cipher(algorithms.AES(AES_KEY), modes.CBC(iv), backend=default_backend())
+    cipher = Cipher(algorithms.AES(AES_KEY), modes.CBC(iv), backend=backend)
     decryptor = cipher.decryptor()
 
     # Descifrar y eliminar padding
@@ -56,9 +172,72 @@ def decrypt_str_data(encrypted_data: str):
     return data.decode()
 
 
+def encrypt_str_data_batch(data: List[str]) -> List[str]:
+    """
+    Cifra varios textos en una sola pasada.
+
+    Reutiliza el algoritmo AES y obtiene todos los IV con una única llamada a
+    `os.urandom`, lo que evita repetir la preparación de la clave por cada valor
+    en importaciones o adopciones masivas. El formato de salida es el mismo que
+    el de `encrypt_str_data`.
+    """
+    if not data:
+        return []
+    Cipher, algorithms, modes, padding, backend = _aes_primitives()
+    algorithm = algorithms.AES(AES_KEY)
+    pkcs7 = padding.PKCS7(128)
+    ivs = os.urandom(16 * len(data))
+    encrypted_values = []
+    for index, value in enumerate(data):
+        iv = ivs[index * 16:(index + 1) * 16]
+        encryptor = Cipher(algorithm, modes.CBC(iv), backend=backend).encryptor()
+        padder = pkcs7.padder()
+        padded_data = padder.update(value.encode()) + padder.finalize()
+        encrypted_data = encryptor.update(padded_data) + encryptor.finalize()
+        encrypted_values.append(b64encode(iv + encrypted_data).decode())
+    return encrypted_values
+
+
+def decrypt_str_data_batch(encrypted_data: List[str]) -> List[str]:
+    """
+    Descifra varios textos cifrados con `encrypt_str_data` en una sola pasada.
+    """
+    if not encrypted_data:
+        return []
+    Cipher, algorithms, modes, padding, backend = _aes_primitives()
+    algorithm = algorithms.AES(AES_KEY)
+    pkcs7 = padding.PKCS7(128)
+    values = []
+    for value in encrypted_data:
+        raw_data = b64decode(value)
+        decryptor = Cipher(algorithm, modes.CBC(raw_data[:16]), backend=backend).decryptor()
+        padded_data = decryptor.update(raw_data[16:]) + decryptor.finalize()
+        unpadder = pkcs7.unpadder()
+        values.append((unpadder.update(padded_data) + unpadder.finalize()).decode())
+    return values
+
+
+def decrypt_str_data_batch_lenient(encrypted_data: List[str]) -> List[str]:
+    """
+    Igual que `decrypt_str_data_batch`, pero los valores antiguos guardados sin
+    cifrar se devuelven tal cual en lugar de fallar.
+    """
+    try:
+        return decrypt_str_data_batch(encrypted_data)
+    except (binascii.Error, ValueError):
+        decrypted = []
+        for value in encrypted_data:
+            try:
+                decrypted.append(decrypt_str_data(value))
+            except (binascii.Error, ValueError):
+                decrypted.append(value)
+        return decrypted
+
+
 def encrypt_image(image_data: bytes) -> bytes:
+    Cipher, algorithms, modes, padding, backend = _aes_primitives()
     iv = generate_iv()
-    cipher = Cipher(algorithms.AES(AES_KEY), modes.CBC(iv), backend=default_backend())
+    cipher = Cipher(algorithms.AES(AES_KEY), modes.CBC(iv), backend=backend)
     encryptor = cipher.encryptor()
 
     # Aplicar padding
@@ -73,12 +252,13 @@ def encrypt_image(image_data: bytes) -> bytes:
 
 
 def decrypt_image(encrypted_image_data: bytes) -> bytes:
+    Cipher, algorithms, modes, padding, backend = _aes_primitives()
     # Decodificar desde Base64
     raw_data = b64decode(encrypted_image_data)
     iv = raw_data[:16]  # Extraer IV
     encrypted_data = raw_data[16:]  # Extraer datos cifrados
 
-    cipher = Cipher(algorithms.AES(AES_KEY), modes.CBC(iv), backend=default_backend())
+    cipher = Cipher(algorithms.AES(AES_KEY), modes.CBC(iv), backend=backend)
     decryptor = cipher.decryptor()
 
     # Descifrar y eliminar padding
@@ -0,0 +1,330 @@
+# app/services/dog_search.py
+"""
+Búsqueda de perros por nombre y descripción (`GET /dog/search`).
+
+Por defecto usa un índice invertido en memoria: cada palabra del nombre y de
+la descripción apunta a los perros que la contienen. Las palabras se guardan
+sin tildes y en minúsculas, así "nino" encuentra "Niño", y cada palabra de la
+búsqueda se compara como prefijo ("fir" encuentra "Firulais").
+
+El índice se arma al iniciar y se mantiene con los eventos de las funciones
+CRUD: solo se vuelven a leer los perros que cambiaron. Como otro worker puede
+haber cambiado la base, antes de buscar se compara la versión de cada tabla
+(última modificación y número de filas); si cambió se vuelven a leer los perros
+modificados desde la última versión vista y, si el número de filas no coincide
+(un perro eliminado en otro worker), se vuelve a leer la tabla completa.
+
+Con `DOG_SEARCH_BACKEND=database` la búsqueda se hace con `LIKE` en la base de
+datos, sin índice en memoria; que ignore las tildes depende de la intercalación
+(collation) de las columnas.
+"""
+import bisect
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import and_, case, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import subscribe, STATIC_DOG_CHANGED, ADOPTION_DOG_CHANGED, ADOPTED_DOG_CHANGED
+from app.crud.collection_version import read_collection_versions
+from app.crud.dog import DOG_TABLES
+
+# "memory": índice invertido por proceso; "database": LIKE en la base de datos
+DOG_SEARCH_BACKEND = settings.DOG_SEARCH_BACKEND
+
+# Tipo de perro (igual que en las rutas) y su tabla
+DOG_KINDS = DOG_TABLES
+KIND_ORDER = {kind: position for position, kind in enumerate(DOG_KINDS)}
+
+# Peso de una palabra según el campo y según si coincide completa o solo como prefijo
+NAME_WEIGHT = 3.0
+ABOUT_WEIGHT = 1.0
+PREFIX_FACTOR = 0.5
+
+_WORD = re.compile(r"\w+")
+
+
+def fold(text: Optional[str]) -> str:
+    """Quita tildes y diéresis y pasa a minúsculas: "Ñandú" -> "nandu"."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _WORD.findall(fold(text))
+
+
+class SearchHit(NamedTuple):
+    kind: str
+    id: int
+    name: str
+    about: Optional[str]
+    has_image: bool
+    score: float
+
+
+class _Document(NamedTuple):
+    name: str
+    about: Optional[str]
+    has_image: bool
+    weights: Dict[str, float]
+
+
+def _weights(name: Optional[str], about: Optional[str]) -> Dict[str, float]:
+    weights = defaultdict(float)
+    for token in tokenize(name):
+        weights[token] += NAME_WEIGHT
+    for token in tokenize(about):
+        weights[token] += ABOUT_WEIGHT
+    return dict(weights)
+
+
+def score_document(weights: Dict[str, float], terms: List[str]) -> float:
+    """
+    Puntaje de un perro para las palabras buscadas, o 0 si falta alguna.
+
+    Cada palabra buscada suma el peso de la mejor palabra del perro que la
+    contiene como prefijo; una coincidencia completa vale el doble.
+    """
+    total = 0.0
+    for term in terms:
+        best = 0.0
+        for token, weight in weights.items():
+            if token == term:
+                best = max(best, weight)
+            elif token.startswith(term):
+                best = max(best, weight * PREFIX_FACTOR)
+        if not best:
+            return 0.0
+        total += best
+    return total
+
+
+def _rank(hits: Iterable[SearchHit], limit: int) -> List[SearchHit]:
+    return sorted(hits, key=lambda hit: (-hit.score, KIND_ORDER[hit.kind], hit.id))[:limit]
+
+
+def _has_image(model):
+    # SQL Server no admite un predicado como columna del SELECT, por eso CASE
+    return case((model.image.is_not(None), 1), else_=0).label("has_image")
+
+
+def _read_documents(db: Session, kind: str, dog_ids: Optional[Iterable[int]] = None,
+                    changed_since: Optional[datetime] = None):
+    model = DOG_KINDS[kind]
+    query = db.query(model.id, model.name, model.about, _has_image(model))
+    if dog_ids is not None:
+        query = query.filter(model.id.in_(list(dog_ids)))
+    if changed_since is not None:
+        # Con `>=` se incluyen los cambios que comparten la misma marca de tiempo que la última vista
+        query = query.filter(model.updated_at >= changed_since)
+    return query.all()
+
+
+class DogSearchIndex:
+    """
+    Índice invertido en memoria sobre el nombre y la descripción de los perros.
+
+    `_postings` relaciona cada palabra con los perros que la contienen y
+    `_vocabulary` guarda las palabras ordenadas para encontrar las que empiezan
+    con un prefijo con búsqueda binaria.
+    """
+
+    def __init__(self):
+        self._documents: Dict[Tuple[str, int], _Document] = {}
+        self._postings: Dict[str, Set[Tuple[str, int]]] = defaultdict(set)
+        self._vocabulary: List[str] = []
+        self._counts: Counter = Counter()
+        self._stale: Dict[str, Optional[Set[int]]] = {}
+        self._versions: Dict[str, Tuple[Optional[datetime], int]] = {}
+        self._built = False
+        self._lock = threading.RLock()
+
+    def _add(self, kind: str, dog_id: int, name: str, about: Optional[str], has_image: bool):
+        self._remove(kind, dog_id)
+        document = _Document(name, about, bool(has_image), _weights(name, about))
+        self._documents[(kind, dog_id)] = document
+        self._counts[kind] += 1
+        for token in document.weights:
+            if not self._postings[token]:
+                bisect.insort(self._vocabulary, token)
+            self._postings[token].add((kind, dog_id))
+
+    def _remove(self, kind: str, dog_id: int):
+        document = self._documents.pop((kind, dog_id), None)
+        if document is None:
+            return
+        self._counts[kind] -= 1
+        for token in document.weights:
+            self._postings[token].discard((kind, dog_id))
+            if not self._postings[token]:
+                del self._postings[token]
+                self._vocabulary.pop(bisect.bisect_left(self._vocabulary, token))
+
+    def _reload(self, db: Session, kind: str, dog_ids: Optional[Iterable[int]] = None,
+                changed_since: Optional[datetime] = None):
+        """Vuelve a leer los perros indicados de un tipo, o todos si no se indica ninguno."""
+        if dog_ids is None and changed_since is None:
+            dog_ids = [dog_id for known_kind, dog_id in self._documents if known_kind == kind]
+            rows = _read_documents(db, kind)
+        elif dog_ids is not None:
+            dog_ids = list(dog_ids)
+            rows = _read_documents(db, kind, dog_ids)
+        else:
+            dog_ids = []
+            rows = _read_documents(db, kind, changed_since=changed_since)
+        # Los que ya no aparecen se eliminaron
+        for dog_id in dog_ids:
+            self._remove(kind, dog_id)
+        for dog_id, name, about, has_image in rows:
+            self._add(kind, dog_id, name, about, has_image)
+
+    def rebuild(self, db: Session):
+        """Arma el índice completo con los perros de las tres tablas."""
+        with self._lock:
+            versions = read_collection_versions(db, *DOG_KINDS.values())
+            self._documents.clear()
+            self._postings.clear()
+            self._vocabulary = []
+            self._counts.clear()
+            for kind in DOG_KINDS:
+                for dog_id, name, about, has_image in _read_documents(db, kind):
+                    self._add(kind, dog_id, name, about, has_image)
+            self._stale.clear()
+            self._versions = dict(zip(DOG_KINDS, versions))
+            self._built = True
+
+    def mark_stale(self, kind: str, dog_ids: Optional[Iterable[int]] = None):
+        """Marca perros que cambiaron; se vuelven a leer antes de la siguiente búsqueda."""
+        with self._lock:
+            if dog_ids is None or self._stale.get(kind, set()) is None:
+                self._stale[kind] = None
+            else:
+                self._stale.setdefault(kind, set()).update(dog_ids)
+
+    def refresh(self, db: Session):
+        """
+        Aplica los cambios de este proceso y los que otros workers hicieron en la base.
+
+        La versión se lee antes que los perros: un cambio que se confirme mientras
+        tanto queda después de la versión guardada y se lee en la siguiente búsqueda.
+        """
+        with self._lock:
+            if not self._built:
+                self.rebuild(db)
+                return
+            versions = dict(zip(DOG_KINDS, read_collection_versions(db, *DOG_KINDS.values())))
+            for kind, (updated_at, count) in versions.items():
+                stale = self._stale.pop(kind, set())
+                seen_at, seen_count = self._versions[kind]
+                if stale is None:
+                    self._reload(db, kind)
+                else:
+                    if stale:
+                        self._reload(db, kind, dog_ids=stale)
+                    # Cambios de otros workers; sin una versión vista se lee toda la tabla
+                    if (updated_at, count) != (seen_at, seen_count):
+                        self._reload(db, kind, changed_since=seen_at)
+                    if self._counts[kind] != count:
+                        self._reload(db, kind)
+                self._versions[kind] = (updated_at, count)
+            self._stale.clear()
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+            self._postings.clear()
+            self._vocabulary = []
+            self._counts.clear()
+            self._stale.clear()
+            self._versions = {}
+            self._built = False
+
+    def _candidates(self, term: str) -> Set[Tuple[str, int]]:
+        candidates = set()
+        position = bisect.bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+            candidates |= self._postings[self._vocabulary[position]]
+            position += 1
+        return candidates
+
+    def search(self, text: str, limit: int = 20) -> List[SearchHit]:
+        terms = tokenize(text)
+        if not terms:
+            return []
+        with self._lock:
+            candidates = None
+            # Se empieza por la palabra más larga, que suele tener menos perros
+            for term in sorted(set(terms), key=len, reverse=True):
+                matches = self._candidates(term)
+                candidates = matches if candidates is None else candidates & matches
+                if not candidates:
+                    return []
+            hits = []
+            for kind, dog_id in candidates:
+                document = self._documents[(kind, dog_id)]
+                hits.append(SearchHit(kind, dog_id, document.name, document.about, document.has_image,
+                                      score_document(document.weights, terms)))
+        return _rank(hits, limit)
+
+
+dog_search_index = DogSearchIndex()
+
+
+@subscribe(STATIC_DOG_CHANGED)
+def reindex_static_dogs(ids=None):
+    dog_search_index.mark_stale("static_dog", ids)
+
+
+@subscribe(ADOPTION_DOG_CHANGED)
+def reindex_adoption_dogs(ids=None):
+    dog_search_index.mark_stale("adoption_dog", ids)
+
+
+@subscribe(ADOPTED_DOG_CHANGED)
+def reindex_adopted_dogs(ids=None):
+    dog_search_index.mark_stale("adopted_dog", ids)
+
+
+def _like_pattern(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def search_dogs_in_database(db: Session, text: str, limit: int = 20) -> List[SearchHit]:
+    """
+    Busca con `LIKE` en la base de datos y ordena con el mismo puntaje del índice.
+
+    La base filtra los candidatos (cada palabra en el nombre o la descripción);
+    el puntaje se calcula solo sobre esos perros.
+    """
+    terms = tokenize(text)
+    if not terms:
+        return []
+    hits = []
+    for kind, model in DOG_KINDS.items():
+        conditions = [or_(model.name.ilike(_like_pattern(term), escape="\\"),
+                          model.about.ilike(_like_pattern(term), escape="\\")) for term in terms]
+        query = db.query(model.id, model.name, model.about, _has_image(model)).filter(and_(*conditions))
+        for dog_id, name, about, has_image in query.all():
+            score = score_document(_weights(name, about), terms)
+            if score:
+                hits.append(SearchHit(kind, dog_id, name, about, bool(has_image), score))
+    return _rank(hits, limit)
+
+
+def search_dogs(db: Session, text: str, limit: int = 20) -> List[SearchHit]:
+    if DOG_SEARCH_BACKEND == "database":
+        return search_dogs_in_database(db, text, limit)
+    dog_search_index.refresh(db)
+    return dog_search_index.search(text, limit)
+
+
+def build_dog_search_index(db: Session):
+    """Arma el índice al iniciar, así la primera búsqueda no espera a leer los perros."""
+    if DOG_SEARCH_BACKEND == "memory":
+        dog_search_index.rebuild(db)
@@ -1,46 +1,17 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from pathlib import Path
-from dotenv import load_dotenv
-import os
-from jinja2 import Template
+from sqlalchemy.orm import Session
 
-# Cargar variables de entorno
-load_dotenv()
+from app.crud.outbox import enqueue_email
+from app.services.mailer import notify_outbox
 
-EMAIL_USER = os.getenv("MAIL_USERNAME")
-EMAIL_PASS = os.getenv("MAIL_PASSWORD")
 
-
-def render_template(template_name: str, context: dict) -> str:
-    """
-    Renderiza una plantilla HTML con Jinja2.
+def queue_email(db: Session, recipient: str, subject: str, context: dict, template: str):
     """
-    template_path = Path(__file__).parent.parent / "resources" / "templates" / template_name
-    template_content = template_path.read_text(encoding="utf-8")
-    template = Template(template_content)
-    return template.render(context)
+    Encola un correo con una plantilla HTML en la bandeja de salida.
 
-
-def send_email(recipient: str, subject: str, context: dict, template: str):
-    """
-    Envía un correo electrónico con una plantilla HTML.
+    El correo queda guardado en la base de datos antes de responder, por lo que
+    no se pierde si el proceso se reinicia; el worker de la bandeja de salida lo
+    envía con las conexiones SMTP del pool.
     """
-    # Renderizar la plantilla
-    html_content = render_template(template, context)
-
-    # Configurar el mensaje
-    message = MIMEMultipart("alternative")
-    message["From"] = EMAIL_USER
-    message["To"] = recipient
-    message["Subject"] = subject
-
-    # Agregar el contenido HTML
-    html_part = MIMEText(html_content, "html")
-    message.attach(html_part)
-
-    # Conectar al servidor de Gmail
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-        server.login(EMAIL_USER, EMAIL_PASS)
-        server.sendmail(EMAIL_USER, recipient, message.as_string())
+    email = enqueue_email(db, recipient, subject, context, template)
+    notify_outbox()
+    return email
@@ -0,0 +1,63 @@
+# app/services/field_selection.py
+"""
+Campos parciales (`?fields=`) y relaciones opcionales (`?include=`) en las lecturas.
+
+Sin ninguno de los dos parámetros los endpoints responden como siempre; con
+alguno de ellos la consulta carga solo las columnas pedidas y la relación con
+el dueño solo se consulta y descifra si se pide.
+"""
+from typing import FrozenSet, Iterable, List, NamedTuple, Optional, Sequence
+
+import orjson
+from fastapi import HTTPException
+
+DOG_FIELDS = ("id", "id_chip", "name", "about", "age", "is_vaccinated", "image", "gender", "entry_date",
+              "is_sterilized", "is_dewormed", "operation")
+ADOPTED_DOG_FIELDS = DOG_FIELDS + ("adopted_date", "owner_id")
+VISIT_FIELDS = ("id", "visit_date", "evidence", "observations", "adopted_dog_id")
+
+# Relaciones que se pueden pedir con `include`
+ADOPTED_DOG_INCLUDES = ("owner",)
+# En las visitas `owner` implica `adopted_dog`
+VISIT_INCLUDES = ("adopted_dog", "owner")
+
+
+class FieldSelection(NamedTuple):
+    fields: List[str]
+    include: FrozenSet[str]
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def parse_field_selection(fields: Optional[str], include: Optional[str], allowed_fields: Sequence[str],
+                          allowed_includes: Sequence[str] = ()) -> Optional[FieldSelection]:
+    """
+    Valida `fields` e `include`. Devuelve None si no se pidió ninguno.
+
+    `id` siempre se incluye, porque con él se arman las URLs y se relacionan las entidades.
+    """
+    if fields is None and include is None:
+        return None
+    requested = _split(fields) or list(allowed_fields)
+    unknown = [field for field in requested if field not in allowed_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Campos desconocidos: {', '.join(unknown)}")
+    included = _split(include)
+    unknown = [relation for relation in included if relation not in allowed_includes]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Relaciones desconocidas: {', '.join(unknown)}")
+    selected = ["id"] + [field for field in dict.fromkeys(requested) if field != "id"]
+    return FieldSelection(fields=selected, include=frozenset(included))
+
+
+def replace_flag_with_url(rows: Iterable[dict], field: str, url) -> None:
+    """Reemplaza la marca de existencia de un archivo (`image`, `evidence`) por su URL."""
+    for row in rows:
+        if field in row:
+            row[field] = url(row["id"]) if row[field] else None
+
+
+def dump_rows_json(rows) -> bytes:
+    return orjson.dumps(rows)
@@ -3,17 +3,18 @@ import random
 import string
 import hashlib
 
-from app.services.crypt import get_password_hash
+from app.services.crypt import get_password_hash_async
 
 
-def user_generator(email: str, role: Role) -> tuple[User, dict]:
+async def user_generator(email: str, role: Role) -> tuple[User, dict]:
+    # El hash se calcula en el pool de bcrypt sin ocupar un hilo mientras espera en la cola
     email_hash = hashlib.md5(email.encode()).hexdigest()[:6]  # Tomar 6 caracteres del hash
     username = f"{role.value}{email_hash}"
     characters = string.ascii_letters + string.digits
     password = ''.join(random.choices(characters, k=12))
     new_user = User(
         username=username,
-        hashed_password=get_password_hash(password),
+        hashed_password=await get_password_hash_async(password),
         email=email,
         role=role,
         is_active=False
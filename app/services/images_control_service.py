@@ -1,4 +1,9 @@
-def verify_image_size(image_bytes, max_size=5 * 1024 * 1024):
+from app.core.config import settings
+
+MAX_IMAGE_SIZE = settings.MAX_IMAGE_SIZE
+
+
+def verify_image_size(image_bytes, max_size=MAX_IMAGE_SIZE):
     if image_bytes and len(image_bytes) > max_size:
         raise ValueError("La imagen excede el tamaño máximo permitido.")
     return image_bytes
@@ -0,0 +1,220 @@
+# app/services/mailer.py
+import asyncio
+from contextlib import asynccontextmanager
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Callable, List, Optional
+
+import aiosmtplib
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.crud.outbox import claim_due_emails, mark_emails_sent, mark_email_failed
+from app.db.database import SessionLocal
+from app.services.template_service import render_template
+
+EMAIL_USER = settings.MAIL_USERNAME
+EMAIL_PASS = settings.MAIL_PASSWORD
+SMTP_HOST = settings.SMTP_HOST
+SMTP_PORT = settings.SMTP_PORT
+SMTP_USE_TLS = settings.SMTP_USE_TLS
+# Conexiones SMTP abiertas que se reutilizan entre envíos
+SMTP_POOL_SIZE = settings.SMTP_POOL_SIZE
+SMTP_TIMEOUT = settings.SMTP_TIMEOUT
+# Bandeja de salida: correos por lote, espera entre revisiones y reintentos
+OUTBOX_BATCH_SIZE = settings.OUTBOX_BATCH_SIZE
+OUTBOX_POLL_SECONDS = settings.OUTBOX_POLL_SECONDS
+OUTBOX_MAX_ATTEMPTS = settings.OUTBOX_MAX_ATTEMPTS
+OUTBOX_BASE_BACKOFF = settings.OUTBOX_BASE_BACKOFF
+OUTBOX_MAX_BACKOFF = settings.OUTBOX_MAX_BACKOFF
+# Tiempo que un correo queda reservado por un worker antes de poder reintentarse
+OUTBOX_LEASE_SECONDS = settings.OUTBOX_LEASE_SECONDS
+
+# HTML de las notificaciones de curso: es igual para todos sus destinatarios y se renderiza una vez por notificación
+notification_html_cache = TTLCache(maxsize=32, ttl=OUTBOX_MAX_BACKOFF)
+
+
+class SMTPConnectionPool:
+    """
+    Pool de conexiones SMTP persistentes.
+
+    Las conexiones se abren bajo demanda hasta `size` y se devuelven al pool
+    después de cada envío, de modo que el handshake TLS y el login se hacen una
+    sola vez por conexión y no por correo.
+    """
+
+    def __init__(self, hostname: str = SMTP_HOST, port: int = SMTP_PORT, username: Optional[str] = EMAIL_USER,
+                 password: Optional[str] = EMAIL_PASS, use_tls: bool = SMTP_USE_TLS, size: int = SMTP_POOL_SIZE,
+                 timeout: float = SMTP_TIMEOUT, sender: Optional[str] = None):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.timeout = timeout
+        self.sender = sender or username
+        self._idle = None
+        self._created = 0
+        self._lock = None
+
+    def _new_client(self) -> aiosmtplib.SMTP:
+        # Con TLS implícito (puerto 465) no se negocia STARTTLS; sin él se usa si el servidor lo ofrece
+        return aiosmtplib.SMTP(hostname=self.hostname, port=self.port, username=self.username,
+                               password=self.password, use_tls=self.use_tls,
+                               start_tls=False if self.use_tls else None, timeout=self.timeout)
+
+    @asynccontextmanager
+    async def connection(self):
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._idle.empty() and self._created < self.size:
+                self._created += 1
+                self._idle.put_nowait(self._new_client())
+        client = await self._idle.get()
+        try:
+            if not client.is_connected:
+                await client.connect()
+            yield client
+        except Exception:
+            # Una conexión que falló no se reutiliza en el estado en que quedó
+            client.close()
+            raise
+        finally:
+            self._idle.put_nowait(client)
+
+    async def send(self, message: MIMEMultipart):
+        async with self.connection() as client:
+            try:
+                await client.send_message(message)
+            except aiosmtplib.SMTPServerDisconnected:
+                # El servidor cerró la conexión inactiva, se reconecta una vez
+                await client.connect()
+                await client.send_message(message)
+
+    async def close(self):
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            client = self._idle.get_nowait()
+            if client.is_connected:
+                try:
+                    await client.quit()
+                except aiosmtplib.SMTPException:
+                    client.close()
+        self._idle = None
+        self._created = 0
+
+
+def build_message(recipient: str, subject: str, html_content: str, sender: Optional[str]) -> MIMEMultipart:
+    message = MIMEMultipart("alternative")
+    message["From"] = sender
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.attach(MIMEText(html_content, "html"))
+    return message
+
+
+def retry_delay(attempts: int) -> float:
+    """Espera exponencial antes del siguiente intento: 30 s, 60 s, 120 s... hasta `OUTBOX_MAX_BACKOFF`."""
+    return min(OUTBOX_BASE_BACKOFF * 2 ** max(attempts - 1, 0), OUTBOX_MAX_BACKOFF)
+
+
+def _claim(session_factory: Callable[[], Session], batch_size: int) -> List[tuple]:
+    with session_factory() as db:
+        emails = claim_due_emails(db, batch_size, OUTBOX_LEASE_SECONDS)
+        return [(email.id, email.recipient, email.subject, email.template, email.get_context(), email.attempts,
+                 email.notification_id)
+                for email in emails]
+
+
+def _render(template: str, context: dict, notification_id: Optional[str]) -> str:
+    if notification_id is None:
+        return render_template(template, context)
+    html_content = notification_html_cache.get(notification_id)
+    if html_content is None:
+        html_content = render_template(template, context)
+        notification_html_cache.set(notification_id, html_content)
+    return html_content
+
+
+def _record_results(session_factory: Callable[[], Session], sent_ids: List[int], failures: List[tuple]):
+    with session_factory() as db:
+        mark_emails_sent(db, sent_ids)
+        for email_id, error, attempts in failures:
+            mark_email_failed(db, email_id, error, retry_delay(attempts), give_up=attempts >= OUTBOX_MAX_ATTEMPTS)
+
+
+async def deliver_outbox_batch(pool: SMTPConnectionPool, session_factory: Callable[[], Session] = SessionLocal,
+                               batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    Envía un lote de correos pendientes y devuelve cuántos se reservaron.
+
+    Los envíos del lote se hacen en paralelo sobre las conexiones del pool.
+    Las consultas a la base de datos son síncronas y se ejecutan en un hilo para
+    no bloquear el event loop.
+    """
+    emails = await asyncio.to_thread(_claim, session_factory, batch_size)
+    if not emails:
+        return 0
+
+    async def deliver(email):
+        email_id, recipient, subject, template, context, _, notification_id = email
+        html_content = _render(template, context, notification_id)
+        await pool.send(build_message(recipient, subject, html_content, pool.sender))
+
+    results = await asyncio.gather(*(deliver(email) for email in emails), return_exceptions=True)
+    sent_ids = []
+    failures = []
+    for email, result in zip(emails, results):
+        if isinstance(result, Exception):
+            failures.append((email[0], f"{type(result).__name__}: {result}", email[5] + 1))
+        else:
+            sent_ids.append(email[0])
+    await asyncio.to_thread(_record_results, session_factory, sent_ids, failures)
+    return len(emails)
+
+
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_wake_event: Optional[asyncio.Event] = None
+
+
+def notify_outbox():
+    """Despierta al worker para que envíe sin esperar a la siguiente revisión. Se puede llamar desde cualquier hilo."""
+    if _worker_loop is not None and _wake_event is not None and not _worker_loop.is_closed():
+        _worker_loop.call_soon_threadsafe(_wake_event.set)
+
+
+async def run_outbox_worker(pool: SMTPConnectionPool, session_factory: Callable[[], Session] = SessionLocal,
+                            stop_event: Optional[asyncio.Event] = None):
+    """
+    Vacía la bandeja de salida en segundo plano hasta que se active `stop_event`.
+
+    Mientras haya lotes completos sigue enviando; cuando la bandeja queda vacía
+    espera `OUTBOX_POLL_SECONDS` o hasta que `notify_outbox` lo despierte.
+    """
+    global _worker_loop, _wake_event
+    _worker_loop = asyncio.get_running_loop()
+    _wake_event = asyncio.Event()
+    stop_event = stop_event or asyncio.Event()
+    try:
+        while not stop_event.is_set():
+            _wake_event.clear()
+            try:
+                claimed = await deliver_outbox_batch(pool, session_factory)
+            except Exception as e:
+                print(f"Error al procesar la bandeja de salida: {e}")
+                claimed = 0
+            if claimed >= OUTBOX_BATCH_SIZE:
+                continue
+            try:
+                await asyncio.wait_for(_wake_event.wait(), timeout=OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _worker_loop = None
+        _wake_event = None
+        await pool.close()
@@ -1,12 +1,26 @@
+from datetime import date
+from typing import List
+
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from app.crud.dog import create_adopted_dog_without_commit, is_the_owner_whit_more_than_a_dog
-from app.crud.owner import create_owner_without_commit
+from app.core.events import emit, ADOPTION_DOG_CHANGED, ADOPTED_DOG_CHANGED
+from app.crud.dog import transfer_adoption_dog_to_adopted, transfer_adopted_dog_to_adoption, \
+    read_existing_adoption_dog_ids
+from app.crud.owner import create_owner_without_commit, owner_exists, read_existing_owner_ids
 from app.crud.token import verify_token, mark_token_as_used
 from app.crud.user import update_password
-from app.models.domain.dog import AdoptedDog
+from app.models.domain.owner import Owner
+from app.models.schema.dog import AdoptionBatchItem, AdoptionBatchResult, AdoptionBatchResponse
+from app.models.schema.owner import OwnerCreate
+
+
+def _emit_transfer(dog_ids: List[int]):
+    # Una adopción o des adopción cambia las dos tablas de perros
+    if dog_ids:
+        emit(ADOPTION_DOG_CHANGED, ids=dog_ids)
+        emit(ADOPTED_DOG_CHANGED, ids=dog_ids)
 
 
 def reset_password(db: Session, token_value: int, new_password: str):
@@ -25,31 +39,99 @@ def reset_password(db: Session, token_value: int, new_password: str):
     return {"detail": "Contraseña actualizada exitosamente."}
 
 
-def create_owner_and_adopted_dog(db: Session, adopted_dog: AdoptedDog):
-    create_owner_without_commit(db, adopted_dog.owner)
-    dog = create_adopted_dog_without_commit(db, adopted_dog)
-
-    if not dog:
+def create_owner_and_adopted_dog(db: Session, dog_id: int, adoption_date: date, owner_create: OwnerCreate):
+    owner = Owner(
+        name=owner_create.name,
+        direction=owner_create.direction,
+        cellphone=owner_create.cellphone
+    )
+    try:
+        create_owner_without_commit(db, owner)
+        db.flush()
+        if not transfer_adoption_dog_to_adopted(db, dog_id, owner.id, adoption_date):
+            db.rollback()
+            raise HTTPException(status_code=404, detail="No existe")
+        db.commit()
+        _emit_transfer([dog_id])
+        return {"detail": "Perro Adoptado."}
+    except IntegrityError as ie:
         db.rollback()
-        raise HTTPException(status_code=404, detail="Usuario no encontrado.")
-    db.commit()
-    return {"detail": "Perro Adoptado."}
+        raise HTTPException(status_code=409, detail=str(ie.orig))
 
 
-def un_adopt_dog_service(db: Session, adopted_dog: AdoptedDog):
-    if adopted_dog is None:
-        raise HTTPException(status_code=404, detail="No existe")
-    adoption_dog = adopted_dog.unadopt()
+def adopt_dog_with_existing_owner(db: Session, dog_id: int, adoption_date: date, owner_id: int):
+    if not owner_exists(db, owner_id):
+        raise HTTPException(status_code=404, detail="Dueño no existe")
     try:
-        db.add(adoption_dog)
-        db.delete(adopted_dog)
-        if not is_the_owner_whit_more_than_a_dog(db, adopted_dog.owner.id):
-            # en caso de tener más de un perro, no eliminaremos al dueño
-            db.delete(adopted_dog.owner)
+        if not transfer_adoption_dog_to_adopted(db, dog_id, owner_id, adoption_date):
+            db.rollback()
+            raise HTTPException(status_code=404, detail="Perro de adopción no existe")
+        db.commit()
+        _emit_transfer([dog_id])
+        return {"detail": "Perro Adoptado creado"}
+    except IntegrityError as ie:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(ie.orig))
+
+
+def adopt_dogs_batch(db: Session, items: List[AdoptionBatchItem]) -> AdoptionBatchResponse:
+    """
+    Registra varias adopciones en una sola transacción.
+
+    Los perros y dueños existentes se validan con una consulta por tabla, los
+    dueños nuevos se cifran por lotes y se insertan en un solo flush. Las
+    entradas inválidas se reportan sin afectar al resto; si la base de datos
+    rechaza el lote, se revierte completo y todas las entradas se reportan como fallidas.
+    """
+    results = [None] * len(items)
+    adoption_dog_ids = read_existing_adoption_dog_ids(db, [item.dog_id for item in items])
+    owner_ids = read_existing_owner_ids(db, [item.owner_id for item in items if item.owner_id is not None])
+
+    pending = []
+    seen_dogs = set()
+    for index, item in enumerate(items):
+        if item.dog_id in seen_dogs:
+            results[index] = AdoptionBatchResult(dog_id=item.dog_id, success=False, detail="Perro repetido en el lote")
+        elif item.dog_id not in adoption_dog_ids:
+            results[index] = AdoptionBatchResult(dog_id=item.dog_id, success=False,
+                                                 detail="Perro de adopción no existe")
+        elif item.owner_id is not None and item.owner_id not in owner_ids:
+            results[index] = AdoptionBatchResult(dog_id=item.dog_id, success=False, detail="Dueño no existe")
         else:
-            adopted_dog.owner.crypt_owner_data()
+            pending.append((index, item))
+        seen_dogs.add(item.dog_id)
+
+    new_owners = {
+        index: Owner(name=item.owner.name, direction=item.owner.direction, cellphone=item.owner.cellphone)
+        for index, item in pending if item.owner is not None
+    }
+    try:
+        if new_owners:
+            Owner.crypt_owners_data(new_owners.values())
+            db.add_all(new_owners.values())
+            db.flush()
+        for index, item in pending:
+            owner_id = new_owners[index].id if index in new_owners else item.owner_id
+            transfer_adoption_dog_to_adopted(db, item.dog_id, owner_id, item.adoption_date)
+            results[index] = AdoptionBatchResult(dog_id=item.dog_id, success=True, detail="Perro Adoptado.",
+                                                 owner_id=owner_id)
+        db.commit()
+        _emit_transfer([item.dog_id for _, item in pending])
+    except IntegrityError as ie:
+        db.rollback()
+        for index, item in pending:
+            results[index] = AdoptionBatchResult(dog_id=item.dog_id, success=False, detail=str(ie.orig))
+    return AdoptionBatchResponse(adopted=sum(result.success for result in results), results=results)
+
+
+def un_adopt_dog_service(db: Session, dog_id: int):
+    try:
+        if not transfer_adopted_dog_to_adoption(db, dog_id):
+            db.rollback()
+            raise HTTPException(status_code=404, detail="No existe")
         db.commit()
+        _emit_transfer([dog_id])
         return {"detail": "Perro des adoptado."}
     except IntegrityError as ie:
         db.rollback()
-        raise HTTPException(status_code=404, detail=ie)
+        raise HTTPException(status_code=404, detail=str(ie.orig))
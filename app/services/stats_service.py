@@ -0,0 +1,71 @@
+# app/services/stats_service.py
+"""
+Estadísticas del panel de administración.
+
+Se calculan con consultas de agregados y el JSON resultante se guarda durante
+`STATS_CACHE_TTL` segundos, así abrir el panel varias veces no repite las
+consultas. Las peticiones que llegan mientras se calculan esperan al mismo
+resultado.
+"""
+from datetime import datetime
+from typing import Callable, Hashable
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.single_flight import single_flight
+from app.crud.stats import read_dog_category_stats, read_adoptions_per_month, read_average_days_to_adoption, \
+    read_visits_per_month, read_course_seats
+from app.models.schema.stats import DashboardStats, CohortAnalyticsResponse
+from app.services.cohort_analytics import cohort_analytics
+
+STATS_CACHE_TTL = settings.STATS_CACHE_TTL
+
+DASHBOARD_STATS_ADAPTER = TypeAdapter(DashboardStats)
+COHORT_ANALYTICS_ADAPTER = TypeAdapter(CohortAnalyticsResponse)
+
+# Una entrada para el panel y una por cada combinación de parámetros de las cohortes
+stats_cache = TTLCache(maxsize=64, ttl=STATS_CACHE_TTL)
+
+
+def compute_dashboard_stats(db: Session) -> dict:
+    dogs = read_dog_category_stats(db)
+    courses = read_course_seats(db)
+    total = sum(category["total"] for category in dogs)
+    return {
+        "dogs": dogs,
+        "total_dogs": total,
+        "vaccinated_ratio": round(sum(category["vaccinated"] for category in dogs) / total, 4) if total else 0.0,
+        "sterilized_ratio": round(sum(category["sterilized"] for category in dogs) / total, 4) if total else 0.0,
+        "adoptions_per_month": read_adoptions_per_month(db),
+        "average_days_to_adoption": read_average_days_to_adoption(db),
+        "visits_per_month": read_visits_per_month(db),
+        "courses": courses,
+        "open_seats": sum(course["open_seats"] for course in courses),
+        "generated_at": datetime.utcnow(),
+    }
+
+
+def _cached_json(key: Hashable, adapter: TypeAdapter, compute: Callable[[], dict]) -> bytes:
+    content = stats_cache.get(key)
+    if content is None:
+        def produce() -> bytes:
+            value = adapter.dump_json(adapter.validate_python(compute()))
+            stats_cache.set(key, value)
+            return value
+
+        content = single_flight.do(("stats", key), produce)
+    return content
+
+
+def dashboard_stats_json(db: Session) -> bytes:
+    """Devuelve las estadísticas serializadas, desde el caché si no han vencido."""
+    return _cached_json("dashboard", DASHBOARD_STATS_ADAPTER, lambda: compute_dashboard_stats(db))
+
+
+def cohort_analytics_json(db: Session, cohort_by: str, within_days: int) -> bytes:
+    """Análisis por cohortes serializado, guardado igual que el panel."""
+    return _cached_json(("cohorts", cohort_by, within_days), COHORT_ANALYTICS_ADAPTER,
+                        lambda: cohort_analytics(db, cohort_by, within_days))
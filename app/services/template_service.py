@@ -0,0 +1,52 @@
+# app/services/template_service.py
+from functools import lru_cache
+from pathlib import Path
+from typing import List
+
+from app.core.config import settings
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "resources" / "templates"
+# En desarrollo las plantillas se recargan al modificarse; en producción se compilan una sola vez
+APP_ENV = settings.APP_ENV
+# Carpeta del caché de bytecode; si no se define se usa una carpeta temporal del sistema
+TEMPLATE_CACHE_DIR = settings.TEMPLATE_CACHE_DIR
+
+
+@lru_cache(maxsize=None)
+def get_template_env():
+    """
+    Devuelve el `Environment` de Jinja2 compartido.
+
+    Jinja2 se importa la primera vez que se renderiza o precompila una plantilla
+    y no al importar el módulo.
+    """
+    from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, select_autoescape
+
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_DIR) if TEMPLATE_CACHE_DIR
+        else FileSystemBytecodeCache(),
+        auto_reload=APP_ENV == "development",
+        autoescape=select_autoescape(["html"]),
+    )
+
+
+def get_template(template_name: str):
+    """Devuelve la plantilla compilada; Jinja2 la guarda en memoria después de la primera carga."""
+    return get_template_env().get_template(template_name)
+
+
+def render_template(template_name: str, context: dict) -> str:
+    """
+    Renderiza una plantilla HTML con Jinja2.
+    """
+    return get_template(template_name).render(context)
+
+
+def precompile_templates() -> List[str]:
+    """Compila todas las plantillas HTML para que el primer correo no pague la compilación."""
+    template_env = get_template_env()
+    names = template_env.list_templates(extensions=["html"])
+    for name in names:
+        template_env.get_template(name)
+    return names
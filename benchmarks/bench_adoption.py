@@ -0,0 +1,111 @@
+# benchmarks/bench_adoption.py
+"""
+Compara las transiciones de adopción y des adopción.
+
+- orm_copy: el camino anterior, que carga el perro con su imagen, copia cada columna
+  en un objeto nuevo, lo inserta y borra el original.
+- set_based: `INSERT ... SELECT` + `DELETE`, la imagen no sale de la base de datos.
+
+Uso:
+    python -m benchmarks.bench_adoption [--dogs 50] [--image-mb 2] [--database-url sqlite:///bench.db]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.dog import adopt_dog, read_adopted_dogs_by_id, read_adoption_dog_by_id
+from app.crud.owner import read_owner_by_id
+from app.db.database import Base
+from app.models.domain.dog import AdoptionDog, Gender
+from app.models.domain.owner import Owner
+from app.services.multi_crud_service import adopt_dog_with_existing_owner, un_adopt_dog_service
+
+
+def seed(session_factory, dogs: int, image_size: int) -> int:
+    db = session_factory()
+    image = os.urandom(image_size)
+    owner = Owner(name="Benchmark", direction="Calle", cellphone="0999999999")
+    owner.crypt_owner_data()
+    db.add(owner)
+    for dog_id in range(1, dogs + 1):
+        db.add(AdoptionDog(id=dog_id, name=f"Perro {dog_id}", age=3, is_vaccinated=True, image=image,
+                           gender=Gender.MALE, is_sterilized=True, is_dewormed=True))
+    db.commit()
+    owner_id = owner.id
+    db.close()
+    return owner_id
+
+
+def orm_copy_adopt(db, dog_id: int, owner_id: int):
+    adoption_dog = read_adoption_dog_by_id(db, dog_id)
+    owner = read_owner_by_id(db, owner_id)
+    adopt_dog(db, adoption_dog.adopt_existing_owner(date.today(), owner))
+
+
+def orm_copy_unadopt(db, dog_id: int):
+    adopted_dog = read_adopted_dogs_by_id(db, dog_id)
+    db.add(adopted_dog.unadopt())
+    db.delete(adopted_dog)
+    adopted_dog.owner.crypt_owner_data()
+    db.commit()
+
+
+def set_based_adopt(db, dog_id: int, owner_id: int):
+    adopt_dog_with_existing_owner(db, dog_id, date.today(), owner_id)
+
+
+def set_based_unadopt(db, dog_id: int):
+    un_adopt_dog_service(db, dog_id)
+
+
+def measure(session_factory, dogs: int, owner_id: int, adopt, unadopt):
+    tracemalloc.start()
+    started = time.perf_counter()
+    for dog_id in range(1, dogs + 1):
+        db = session_factory()
+        adopt(db, dog_id, owner_id)
+        db.close()
+    adopted = time.perf_counter()
+    for dog_id in range(1, dogs + 1):
+        db = session_factory()
+        unadopt(db, dog_id)
+        db.close()
+    finished = time.perf_counter()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (adopted - started) / dogs, (finished - adopted) / dogs, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dogs", type=int, default=50)
+    parser.add_argument("--image-mb", type=float, default=2)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    image_size = int(args.image_mb * 1024 * 1024)
+    approaches = [("orm_copy", orm_copy_adopt, orm_copy_unadopt), ("set_based", set_based_adopt, set_based_unadopt)]
+    print(f"{args.dogs} perros, imagen de {args.image_mb} MB")
+    print(f"{'approach':<12}{'adopt ms':>12}{'unadopt ms':>12}{'peak MB':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, adopt, unadopt in approaches:
+            url = args.database_url or f"sqlite:///{os.path.join(directory, name + '.db')}"
+            engine = create_engine(url)
+            Base.metadata.drop_all(bind=engine)
+            Base.metadata.create_all(bind=engine)
+            session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            owner_id = seed(session_factory, args.dogs, image_size)
+            adopt_time, unadopt_time, peak = measure(session_factory, args.dogs, owner_id, adopt, unadopt)
+            print(f"{name:<12}{adopt_time * 1000:>12.2f}{unadopt_time * 1000:>12.2f}{peak / 1024 / 1024:>12.2f}")
+            Base.metadata.drop_all(bind=engine)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
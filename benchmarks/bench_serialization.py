@@ -0,0 +1,109 @@
+# benchmarks/bench_serialization.py
+"""
+Comparación de la serialización de listados grandes.
+
+Arma `--rows` perros adoptados y visitas como objetos del ORM (sin base de
+datos) y mide, para cada listado:
+
+- fastapi+json:     el camino anterior, `response_model` + `JSONResponse`
+- fastapi+orjson:   `response_model` + `ORJSONResponse` (clase por defecto de la app)
+- adapter+orjson:   `TypeAdapter` precompilado, `dump_python` y `orjson.dumps`
+- adapter.dump_json: `TypeAdapter` precompilado y JSON directo de pydantic-core (`dump_json`)
+
+Uso:
+    python -m benchmarks.bench_serialization [--rows 10000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import date
+from typing import Callable, List
+
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+# Registra todos los modelos para que SQLAlchemy resuelva las relaciones
+import app.db.init_db  # noqa: F401
+import app.models.domain.applicant  # noqa: F401
+from app.models.domain.dog import AdoptedDog, Gender
+from app.models.domain.owner import Owner
+from app.models.domain.visit import Visit
+from app.models.schema.adapters import ADOPTED_DOG_LIST_ADAPTER, VISIT_LIST_ADAPTER, dump_json
+from app.models.schema.dog import AdoptedDogResponse
+from app.models.schema.visit import VisitResponse
+
+
+def build_rows(count: int):
+    dogs, visits = [], []
+    for index in range(1, count + 1):
+        owner = Owner(id=index, name=f"Dueño {index}", direction="Av. Ladrón de Guevara E11-253",
+                      cellphone="0999999999")
+        dog = AdoptedDog(id=index, id_chip=100000 + index, name=f"Perro {index}", about="Juguetón y tranquilo",
+                         age=index % 15, is_vaccinated=True, image=f"https://api/dog/adopted_dog/{index}/image",
+                         gender=Gender.MALE if index % 2 else Gender.FEMALE, entry_date=date(2024, 1, 1),
+                         is_sterilized=True, is_dewormed=True, operation=None, adopted_date=date(2025, 1, 1),
+                         owner=owner)
+        dogs.append(dog)
+        visits.append(Visit(id=index, visit_date=date(2025, 2, 1), evidence=None, observations="Sin novedades",
+                            adopted_dog=dog))
+    return dogs, visits
+
+
+def fastapi_path(response_type, response_class) -> Callable[[list], bytes]:
+    field = create_model_field(name="Response", type_=response_type, mode="serialization")
+
+    def run(rows: list) -> bytes:
+        content = asyncio.run(serialize_response(field=field, response_content=rows))
+        return response_class(content).body
+    return run
+
+
+def adapter_orjson_path(adapter) -> Callable[[list], bytes]:
+    return lambda rows: orjson.dumps(adapter.dump_python(adapter.validate_python(rows, from_attributes=True)))
+
+
+def best_time(function: Callable[[list], bytes], rows: list, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(rows)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Comparación de la serialización de listados")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    dogs, visits = build_rows(args.rows)
+    listings = [
+        ("perros adoptados", dogs, List[AdoptedDogResponse], ADOPTED_DOG_LIST_ADAPTER),
+        ("visitas", visits, List[VisitResponse], VISIT_LIST_ADAPTER),
+    ]
+    for title, rows, response_type, adapter in listings:
+        paths = [
+            ("fastapi+json", fastapi_path(response_type, JSONResponse)),
+            ("fastapi+orjson", fastapi_path(response_type, ORJSONResponse)),
+            ("adapter+orjson", adapter_orjson_path(adapter)),
+            ("adapter.dump_json", lambda items, adapter=adapter: dump_json(adapter, items)),
+        ]
+        expected = json.loads(paths[0][1](rows))
+        print(f"{title} ({len(rows)} filas):")
+        baseline = None
+        for name, function in paths:
+            assert json.loads(function(rows)) == expected, name
+            elapsed = best_time(function, rows, args.repeat)
+            baseline = baseline or elapsed
+            print(f"  {name:<18} {elapsed * 1000:8.1f} ms  x{baseline / elapsed:4.2f}")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# benchmarks/import_time.py
+"""
+Reporte del tiempo de importación de la aplicación.
+
+Ejecuta `python -X importtime -c "import <módulo>"` en un proceso nuevo y
+resume la salida: tiempo total, los módulos con mayor tiempo acumulado y el
+tiempo propio agrupado por paquete de primer nivel.
+
+Uso:
+    python -m benchmarks.import_time [--module main] [--top 25] [--repeat 3]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+LINE_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def run_importtime(module: str) -> List[Tuple[int, int, int, str]]:
+    """Devuelve `(propio_us, acumulado_us, nivel, módulo)` por cada módulo importado."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=dict(os.environ),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "Error al importar")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(self_us), int(cumulative_us), len(indent) // 2, name))
+    return rows
+
+
+def summarize(rows: List[Tuple[int, int, int, str]], module: str, top: int) -> str:
+    total = next((cumulative for _, cumulative, _, name in rows if name == module), sum(r[0] for r in rows))
+    by_package: Dict[str, int] = defaultdict(int)
+    for self_us, _, _, name in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    lines = [f"Importar {module}: {total / 1000:.1f} ms, {len(rows)} módulos", "",
+             f"Módulos con mayor tiempo acumulado (top {top}):"]
+    for self_us, cumulative_us, _, name in sorted(rows, key=lambda row: row[1], reverse=True)[:top]:
+        lines.append(f"  {cumulative_us / 1000:9.1f} ms  (propio {self_us / 1000:7.1f} ms)  {name}")
+    lines += ["", f"Tiempo propio por paquete (top {top}):"]
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+        lines.append(f"  {self_us / 1000:9.1f} ms  {package}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reporte de tiempo de importación")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Se toma la ejecución más rápida para reducir el ruido del disco")
+    args = parser.parse_args(argv)
+
+    runs = [run_importtime(args.module) for _ in range(max(args.repeat, 1))]
+    fastest = min(runs, key=lambda rows: next((c for _, c, _, n in rows if n == args.module), 0))
+    print(summarize(fastest, args.module, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,23 @@
-from fastapi import FastAPI
+import asyncio
+
+from anyio import to_thread
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.endpoints import dog, owner, auth, visit, course, applicant
-from app.core.init_data import create_admin_user
-from app.db.init_db import init_db
+from fastapi.responses import ORJSONResponse
+from app.api.v1.endpoints import dog, owner, auth, visit, course, applicant, bulk_import, stats
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.init_db import startup_db
+from app.services.crypt import PasswordHashingBusy, calibrate_bcrypt_rounds
+from app.services.dog_search import build_dog_search_index
+from app.services.mailer import SMTPConnectionPool, run_outbox_worker
+from app.services.template_service import precompile_templates
+
+# Permite desactivar el worker de la bandeja de salida en réplicas que solo atienden peticiones
+OUTBOX_WORKER_ENABLED = settings.OUTBOX_WORKER_ENABLED
 
-app = FastAPI()
+# orjson serializa las respuestas más rápido que el módulo json de la biblioteca estándar
+app = FastAPI(default_response_class=ORJSONResponse)
 
 origins = ["*"]
 
@@ -22,9 +35,39 @@ app.include_router(visit.router, prefix="/visits", tags=["visits"])
 app.include_router(course.router, prefix="/course", tags=["course"])
 app.include_router(applicant.router, prefix="/applicant", tags=["applicant"])
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
+app.include_router(bulk_import.router, prefix="/import", tags=["import"])
+app.include_router(stats.router, prefix="/stats", tags=["stats"])
+
+
+@app.exception_handler(PasswordHashingBusy)
+def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    return ORJSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
 
 @app.on_event("startup")
 def on_startup():
-    init_db()
-    create_admin_user()
+    # Hilos disponibles para los endpoints síncronos
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    rounds = calibrate_bcrypt_rounds()
+    print(f"Costo de bcrypt: {rounds}")
+    print(f"Plantillas compiladas: {', '.join(precompile_templates())}")
+    startup_db()
+    with SessionLocal() as db:
+        build_dog_search_index(db)
+
+
+@app.on_event("startup")
+async def start_outbox_worker():
+    if OUTBOX_WORKER_ENABLED:
+        app.state.outbox_worker = asyncio.create_task(run_outbox_worker(SMTPConnectionPool()))
+
+
+@app.on_event("shutdown")
+async def stop_outbox_worker():
+    worker = getattr(app.state, "outbox_worker", None)
+    if worker is not None:
+        worker.cancel()
+        try:
+            await worker
+        except asyncio.CancelledError:
+            pass
@@ -1,10 +1,22 @@
+import re
+import socket
+from contextlib import contextmanager
+
 import pytest
-from sqlalchemy import create_engine, StaticPool
+from sqlalchemy import create_engine, event, StaticPool
+from sqlalchemy.dialects import mssql
 from sqlalchemy.orm import sessionmaker, Session
 from app.crud.dog import create_adoption_dog
+from app.core.rate_limit import reset_rate_limits
+from app.core.response_cache import response_cache
+from app.core.security import current_user_cache
 from app.crud.user import create_auth_user
+from app.services.dog_search import dog_search_index
+from app.services.stats_service import stats_cache
 from app.db.database import Base
 from app.db.session import get_db
+from app.models.domain.applicant import Applicant
+from app.models.domain.course import Course
 from app.models.domain.dog import AdoptionDog, Gender
 from app.models.domain.user import Role
 from app.models.domain.visit import Visit
@@ -31,6 +43,11 @@ def setup_db() -> None:
 # Función para eliminar las tablas
 def teardown_db() -> None:
     Base.metadata.drop_all(bind=engine)
+    current_user_cache.clear()
+    reset_rate_limits()
+    response_cache.clear()
+    dog_search_index.clear()
+    stats_cache.clear()
 
 
 # Dependency para reemplazar get_db durante las pruebas
@@ -42,6 +59,31 @@ def override_get_db():
         db.close()
 
 
+@contextmanager
+def capture_statements(db: Session):
+    """Guarda las sentencias que ejecuta la sesión para compilarlas con otro dialecto."""
+    statements = []
+
+    def listener(state):
+        statements.append(state.statement)
+
+    event.listen(db, "do_orm_execute", listener)
+    try:
+        yield statements
+    finally:
+        event.remove(db, "do_orm_execute", listener)
+
+
+# SQLite acepta un predicado como columna del SELECT y una columna BIT como condición; SQL Server no
+_INVALID_TSQL = re.compile(r"IS (NOT )?NULL( AS \w+)?\s*(,|FROM\b)|WHEN [\w.\[\]]+ THEN")
+
+
+def assert_valid_tsql(statement):
+    """Compila la sentencia con el dialecto de SQL Server (el de producción) y revisa lo que SQLite no detecta."""
+    sql = str(statement.compile(dialect=mssql.dialect()))
+    assert not _INVALID_TSQL.search(sql), sql
+
+
 def create_adoption_dog_for_tests() -> int:
     db = next(override_get_db())
     db_adoption_dog = AdoptionDog(
@@ -138,3 +180,44 @@ def create_auth_user_for_test():
                            password="SecurePassword123",
                            role=Role.ADMIN)
     create_auth_user(db, auth_user)
+
+
+def create_course_with_applicants_for_test(applicants: int) -> int:
+    db = next(override_get_db())
+    course = Course(name="Adiestramiento básico", description="Curso", start_date=date(2025, 1, 6),
+                    end_date=date(2025, 2, 6), price=20.0, capacity=50)
+    db.add(course)
+    db.commit()
+    for index in range(applicants):
+        applicant = Applicant(first_name=f"Nombre{index}", last_name="Apellido", email=f"applicant{index}@base.com",
+                              cellphone="0999999999", image=b"foto", course_id=course.id)
+        applicant.crypt_data()
+        db.add(applicant)
+    db.commit()
+    return course.id
+
+
+class RecordingSMTPHandler:
+    """Servidor SMTP de prueba que guarda los correos recibidos."""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_server():
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    handler = RecordingSMTPHandler()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
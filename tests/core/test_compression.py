@@ -0,0 +1,26 @@
+import gzip
+
+from app.core import compression
+from app.core.compression import negotiate_encoding, compress
+
+
+def test_negotiate_encoding_respects_quality(monkeypatch):
+    monkeypatch.setattr(compression, "supported_encodings", lambda: ["br", "gzip"])
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert negotiate_encoding("br;q=0.5, gzip;q=0.8") == "gzip"
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding(None) is None
+
+
+def test_negotiate_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "supported_encodings", lambda: ["gzip"])
+    assert negotiate_encoding("br") is None
+    assert negotiate_encoding("br, gzip") == "gzip"
+
+
+def test_gzip_is_deterministic():
+    body = b'[{"name": "Firulais"}]' * 100
+    assert compress(body, "gzip") == compress(body, "gzip")
+    assert gzip.decompress(compress(body, "gzip")) == body
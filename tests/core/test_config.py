@@ -0,0 +1,43 @@
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings, settings
+from app.services.images_control_service import verify_image_size
+
+REQUIRED = {"SECRET_KEY": "x", "ALGORITHM": "HS256", "ACCESS_TOKEN_EXPIRE_MINUTES": 30,
+            "AES_KEY": "0123456789abcdef0123456789abcdef"}
+
+
+def test_settings_defaults():
+    config = Settings(_env_file=None, **REQUIRED)
+    assert config.DB_POOL_SIZE == 5
+    assert config.MAX_IMAGE_SIZE == 5 * 1024 * 1024
+    assert config.STARTUP_MODE == "full"
+
+
+def test_settings_read_environment(monkeypatch):
+    monkeypatch.setenv("SMTP_USE_TLS", "false")
+    monkeypatch.setenv("OUTBOX_BATCH_SIZE", "50")
+    config = Settings(_env_file=None, **REQUIRED)
+    assert config.SMTP_USE_TLS is False
+    assert config.OUTBOX_BATCH_SIZE == 50
+
+
+@pytest.mark.parametrize("overrides", [
+    {"AES_KEY": "corta"},
+    {"ACCESS_TOKEN_EXPIRE_MINUTES": 0},
+    {"DB_POOL_SIZE": 0},
+    {"STARTUP_MODE": "lento"},
+    {"BCRYPT_MIN_ROUNDS": 12, "BCRYPT_MAX_ROUNDS": 10},
+    {"TRUSTED_PROXIES": "10.0.0.0/8, ingress"},
+])
+def test_invalid_settings_fail_fast(overrides):
+    with pytest.raises(ValidationError):
+        Settings(_env_file=None, **{**REQUIRED, **overrides})
+
+
+def test_verify_image_size_uses_configured_limit():
+    image = b"0" * 10
+    assert verify_image_size(image) == image
+    with pytest.raises(ValueError):
+        verify_image_size(b"0" * (settings.MAX_IMAGE_SIZE + 1))
@@ -0,0 +1,15 @@
+from app.core.http_cache import make_etag, etag_matches
+
+
+def test_etag_changes_with_version():
+    assert make_etag("/course/?", "2025-01-01 10:00:00", 3) == make_etag("/course/?", "2025-01-01 10:00:00", 3)
+    assert make_etag("/course/?", "2025-01-01 10:00:00", 3) != make_etag("/course/?", "2025-01-01 10:00:00", 2)
+
+
+def test_etag_matches_uses_weak_comparison():
+    etag = make_etag("/dog/adoption_dog/?", None, 0)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"otro", {etag[2:]}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"otro"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,53 @@
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+
+from app.db import init_db
+
+from tests.conftest import engine
+
+
+def _stamp(revision):
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        if revision:
+            connection.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+            connection.execute(text("INSERT INTO alembic_version (version_num) VALUES (:revision)"),
+                               {"revision": revision})
+
+
+def _patch_startup(monkeypatch):
+    calls = []
+    monkeypatch.setattr(init_db, "engine", engine)
+    monkeypatch.setattr(init_db, "init_db", lambda: calls.append("init_db"))
+    monkeypatch.setattr(init_db, "create_admin_user", lambda: calls.append("create_admin_user"))
+    return calls
+
+
+def test_alembic_head_revision():
+    config = Config(str(init_db.ALEMBIC_INI))
+    config.set_main_option("script_location", str(init_db.ALEMBIC_INI.parent / "alembic"))
+    # Las migraciones forman una sola línea y la cabeza es la última de ellas
+    heads = ScriptDirectory.from_config(config).get_heads()
+    assert len(heads) == 1
+    assert init_db.alembic_head_revision() == heads[0]
+
+
+def test_fast_startup_trusts_alembic_revision(monkeypatch):
+    calls = _patch_startup(monkeypatch)
+    _stamp(init_db.alembic_head_revision())
+    assert init_db.startup_db("fast") is True
+    assert calls == []
+    _stamp(None)
+
+
+def test_fast_startup_falls_back_when_revision_differs(monkeypatch):
+    calls = _patch_startup(monkeypatch)
+    _stamp("90695aaf8b7c")
+    assert init_db.startup_db("fast") is False
+    assert calls == ["init_db", "create_admin_user"]
+    _stamp(None)
+    # Sin tabla alembic_version también se usa el modo completo
+    calls.clear()
+    assert init_db.startup_db("fast") is False
+    assert calls == ["init_db", "create_admin_user"]
@@ -0,0 +1,90 @@
+import ipaddress
+
+import pytest
+from fastapi import HTTPException, Request
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import auth as auth_endpoint
+from app.core.rate_limit import RateLimiter, InMemoryRateLimitStore, SQLiteRateLimitStore, client_ip
+from app.db.session import get_db
+from main import app
+
+from tests.conftest import setup_db, teardown_db, override_get_db, create_auth_user_for_test
+
+app.dependency_overrides[get_db] = override_get_db
+client = TestClient(app)
+
+
+def test_bucket_refills_over_time():
+    store = InMemoryRateLimitStore()
+    assert store.consume("key", 2, 1.0, now=0) == (True, 0.0)
+    assert store.consume("key", 2, 1.0, now=0) == (True, 0.0)
+    allowed, retry_after = store.consume("key", 2, 1.0, now=0)
+    assert not allowed
+    assert retry_after == pytest.approx(1.0)
+    # Tras un segundo se recarga un intento
+    assert store.consume("key", 2, 1.0, now=1)[0]
+    assert not store.consume("key", 2, 1.0, now=1)[0]
+
+
+def test_in_memory_store_prunes_full_buckets():
+    store = InMemoryRateLimitStore(max_keys=2)
+    store.consume("a", 1, 1.0, now=0)
+    store.consume("b", 1, 1.0, now=0)
+    store.consume("c", 1, 1.0, now=5)
+    assert len(store._buckets) == 1
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "rate_limit.sqlite3")
+    first = RateLimiter("login", capacity=2, period=60, store=SQLiteRateLimitStore(path))
+    second = RateLimiter("login", capacity=2, period=60, store=SQLiteRateLimitStore(path))
+    first.hit("user")
+    second.hit("user")
+    with pytest.raises(HTTPException) as exc:
+        first.hit("user")
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) >= 1
+
+
+def _request(host, forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "client": (host, 1234), "headers": headers})
+
+
+def test_client_ip_uses_forwarded_for_only_from_trusted_proxies():
+    proxies = (ipaddress.ip_network("10.0.0.0/8"),)
+    # Detrás del ingress se toma el cliente; las entradas que agrega el cliente se ignoran
+    assert client_ip(_request("10.0.0.5", "1.1.1.1, 2.2.2.2"), proxies) == "2.2.2.2"
+    assert client_ip(_request("10.0.0.5", "2.2.2.2, 10.0.0.7"), proxies) == "2.2.2.2"
+    assert client_ip(_request("10.0.0.5"), proxies) == "10.0.0.5"
+    # Una conexión directa no puede falsificar su IP con la cabecera
+    assert client_ip(_request("3.3.3.3", "2.2.2.2"), proxies) == "3.3.3.3"
+    assert client_ip(_request("10.0.0.5", "2.2.2.2"), ()) == "10.0.0.5"
+
+
+def test_login_is_limited_by_username(monkeypatch):
+    setup_db()
+    create_auth_user_for_test()
+    for _ in range(5):
+        response = client.post("/auth/token", data={"username": "admin", "password": "wrong"})
+        assert response.status_code == 401
+    response = client.post("/auth/token", data={"username": "admin", "password": "wrong"})
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    # Otro usuario desde la misma IP todavía puede intentar
+    response = client.post("/auth/token", data={"username": "other", "password": "wrong"})
+    assert response.status_code == 401
+    # Los intentos desde otra IP no bloquean al usuario legítimo
+    monkeypatch.setattr(auth_endpoint, "client_ip", lambda request: "203.0.113.9")
+    response = client.post("/auth/token", data={"username": "admin", "password": "SecurePassword123"})
+    assert response.status_code == 200
+    teardown_db()
+
+
+def test_reset_code_verification_is_limited():
+    setup_db()
+    for _ in range(10):
+        assert client.post("/auth/reset_password/verify?code=123456").status_code == 400
+    assert client.post("/auth/reset_password/verify?code=123456").status_code == 429
+    teardown_db()
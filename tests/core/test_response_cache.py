@@ -0,0 +1,43 @@
+from app.core.response_cache import InMemoryResponseCache, SQLiteResponseCache
+
+
+def test_in_memory_cache_reuses_response_until_invalidated():
+    cache = InMemoryResponseCache(max_entries=10, ttl=60)
+    calls = []
+
+    def producer() -> bytes:
+        calls.append(1)
+        return b"[]"
+
+    assert cache.get_or_set("dogs", "/dog/adoption_dog/?", producer) == b"[]"
+    assert cache.get_or_set("dogs", "/dog/adoption_dog/?", producer) == b"[]"
+    assert len(calls) == 1
+
+    cache.invalidate("dogs")
+    assert cache.get("dogs", "/dog/adoption_dog/?") is None
+    cache.get_or_set("dogs", "/dog/adoption_dog/?", producer)
+    assert len(calls) == 2
+
+
+def test_response_produced_during_invalidation_is_not_stored():
+    cache = InMemoryResponseCache(max_entries=10, ttl=60)
+
+    def producer() -> bytes:
+        # Un cambio confirmado mientras se arma la respuesta
+        cache.invalidate("courses")
+        return b"viejo"
+
+    assert cache.get_or_set("courses", "/course/?", producer) == b"viejo"
+    assert cache.get("courses", "/course/?") is None
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "response_cache.sqlite3")
+    first = SQLiteResponseCache(path, ttl=60)
+    second = SQLiteResponseCache(path, ttl=60)
+
+    first.get_or_set("courses", "/course/?", lambda: b'[{"id": 1}]')
+    assert second.get("courses", "/course/?") == b'[{"id": 1}]'
+
+    second.invalidate("courses")
+    assert first.get("courses", "/course/?") is None
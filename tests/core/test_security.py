@@ -0,0 +1,48 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.security import create_access_token, get_current_user, require_roles, current_user_cache
+from app.crud.user import update_auth_user_basic_information
+from app.models.domain.user import Role, User
+from app.models.schema.user import UserUpdate
+
+from tests.conftest import setup_db, teardown_db, override_get_db, create_auth_user_for_test
+
+
+def test_get_current_user_is_cached():
+    db = next(override_get_db())
+    setup_db()
+    create_auth_user_for_test()
+    token = create_access_token(data={"sub": "admin"})
+
+    user = get_current_user(token, db)
+    assert user.username == "admin"
+    assert current_user_cache.get("admin") is user
+    # Una segunda resolución no vuelve a consultar la base de datos
+    db.query(User).delete()
+    db.commit()
+    assert get_current_user(token, db) is user
+    teardown_db()
+
+
+def test_cached_user_is_invalidated_on_update():
+    db = next(override_get_db())
+    setup_db()
+    create_auth_user_for_test()
+    token = create_access_token(data={"sub": "admin"})
+    get_current_user(token, db)
+
+    update_auth_user_basic_information(db, UserUpdate(username=None, email="new@base.com"), "admin")
+    assert current_user_cache.get("admin") is None
+    assert get_current_user(token, db).email == "new@base.com"
+    teardown_db()
+
+
+def test_require_roles():
+    admin = User(username="admin", email="admin@base.com", role=Role.ADMIN)
+    auxiliar = User(username="aux", email="aux@base.com", role=Role.AUXILIAR)
+    guard = require_roles(Role.ADMIN)
+    assert guard(admin) is admin
+    with pytest.raises(HTTPException) as exc:
+        guard(auxiliar)
+    assert exc.value.status_code == 403
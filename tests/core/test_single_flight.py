@@ -0,0 +1,47 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch() -> bytes:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return b"imagen"
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        leader = executor.submit(flight.do, "dog:1", fetch)
+        started.wait(5)
+        followers = [executor.submit(flight.do, "dog:1", fetch) for _ in range(4)]
+        # Esperar a que los seguidores estén bloqueados antes de liberar la consulta
+        while not all(future.running() for future in followers):
+            time.sleep(0.01)
+        time.sleep(0.1)
+        release.set()
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert results == [b"imagen"] * 5
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+
+def test_errors_are_shared_and_not_remembered():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("sin conexión")
+
+    with pytest.raises(ValueError):
+        flight.do("courses", fail)
+    # La siguiente llamada vuelve a ejecutar la función
+    assert flight.do("courses", lambda: b"[]") == b"[]"
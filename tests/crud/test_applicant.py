@@ -0,0 +1,12 @@
+from app.crud.applicant import read_applicant_contacts_by_course
+
+from tests.conftest import setup_db, teardown_db, override_get_db, create_course_with_applicants_for_test
+
+
+def test_read_applicant_contacts_in_batches():
+    setup_db()
+    course_id = create_course_with_applicants_for_test(5)
+    batches = list(read_applicant_contacts_by_course(next(override_get_db()), course_id, batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [email for batch in batches for _, email in batch] == [f"applicant{i}@base.com" for i in range(5)]
+    teardown_db()
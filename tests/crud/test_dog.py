@@ -17,16 +17,23 @@ from app.crud.dog import (
     read_adopted_dogs_by_id,
     update_adopted_dog,
     unadopt_dog, adopt_dog,
+    transfer_adoption_dog_to_adopted,
+    transfer_adopted_dog_to_adoption,
+    read_dog_image,
+    read_adoption_dog_facets,
+    read_dogs_by_chip,
+    read_dogs_sparse,
 )
 from app.db.session import get_db
 from app.models.domain.dog import Gender, StaticDog, AdoptionDog, AdoptedDog
 from app.models.domain.owner import Owner
-from app.models.schema.dog import StaticDogCreate, AdoptionDogCreate
+from app.models.domain.visit import Visit
+from app.models.schema.dog import StaticDogCreate, AdoptionDogCreate, AdoptionDogFilters
 from app.models.schema.owner import OwnerCreate
 from main import app
 
 from tests.conftest import setup_db, teardown_db, create_adoption_dog_for_tests, override_get_db, \
-    create_auth_user_for_test
+    create_auth_user_for_test, create_adopted_dog_for_test, capture_statements, assert_valid_tsql
 
 app.dependency_overrides[get_db] = override_get_db
 
@@ -523,3 +530,138 @@ def test_update_adopted_dog():
     result = update_adopted_dog(db, updated_data, adopted_dog.id, image=None)
     assert result == {"detail": "Perro Adoptado Actualizado"}
     teardown_db()
+
+
+def test_transfer_adoption_dog_to_adopted():
+    db = next(override_get_db())
+    setup_db()
+
+    adoption_dog = AdoptionDog(
+        id=5,
+        id_chip=212121,
+        name="Set Based",
+        about="Adopted without copies",
+        age=2,
+        is_vaccinated=True,
+        image=b"image-bytes",
+        gender=Gender.FEMALE,
+        entry_date=date.today(),
+        is_sterilized=True,
+        is_dewormed=True,
+        operation="None",
+    )
+    owner = Owner(name="Owner", direction="Street", cellphone="0999999999")
+    db.add_all([adoption_dog, owner])
+    db.commit()
+
+    assert transfer_adoption_dog_to_adopted(db, 5, owner.id, date.today()) is True
+    db.commit()
+    db.expire_all()
+    assert db.query(AdoptionDog).filter(AdoptionDog.id == 5).first() is None
+    adopted = db.query(AdoptedDog).filter(AdoptedDog.id == 5).first()
+    assert adopted.image == b"image-bytes"
+    assert adopted.owner_id == owner.id
+    assert transfer_adoption_dog_to_adopted(db, 999, owner.id, date.today()) is False
+    teardown_db()
+
+
+def test_transfer_adopted_dog_to_adoption():
+    db = next(override_get_db())
+    setup_db()
+
+    owner = Owner(name="Owner", direction="Street", cellphone="0999999999")
+    adopted_dog = AdoptedDog(
+        id=6,
+        id_chip=222222,
+        name="Back to adoption",
+        about="Unadopted",
+        age=4,
+        is_vaccinated=True,
+        image=b"image-bytes",
+        gender=Gender.MALE,
+        entry_date=date.today(),
+        is_sterilized=True,
+        is_dewormed=True,
+        operation="None",
+        adopted_date=date.today(),
+        owner=owner,
+    )
+    db.add(adopted_dog)
+    db.add(Visit(visit_date=date.today(), observations="None", adopted_dog=adopted_dog))
+    db.commit()
+    owner_id = owner.id
+
+    assert transfer_adopted_dog_to_adoption(db, 6) is True
+    db.commit()
+    db.expire_all()
+    assert db.query(AdoptedDog).filter(AdoptedDog.id == 6).first() is None
+    assert db.query(AdoptionDog).filter(AdoptionDog.id == 6).first().image == b"image-bytes"
+    assert db.query(Visit).count() == 0
+    assert db.query(Owner).filter(Owner.id == owner_id).first() is None
+    assert transfer_adopted_dog_to_adoption(db, 6) is False
+    teardown_db()
+
+
+def test_read_dog_image():
+    setup_db()
+    db = next(override_get_db())
+    db.add(AdoptionDog(id=30, id_chip=3030, name="Manchas", about=None, age=2, is_vaccinated=True,
+                       gender=Gender.FEMALE, image=b"jpeg", entry_date=None, is_sterilized=False,
+                       is_dewormed=True, operation=None))
+    db.commit()
+    assert read_dog_image(db, AdoptionDog, 30) == b"jpeg"
+    assert read_dog_image(db, AdoptionDog, 31) is None
+    teardown_db()
+
+
+def test_filter_adoption_dogs_with_facets():
+    setup_db()
+    db = next(override_get_db())
+    for dog_id, gender, vaccinated, age in [(1, Gender.MALE, True, 1), (2, Gender.FEMALE, True, 4),
+                                            (3, Gender.FEMALE, False, 6), (4, Gender.MALE, False, 10)]:
+        db.add(AdoptionDog(id=dog_id, name=f"Perro {dog_id}", age=age, is_vaccinated=vaccinated, gender=gender,
+                           is_sterilized=True, is_dewormed=dog_id % 2 == 0))
+    db.commit()
+
+    filters = AdoptionDogFilters(gender=Gender.FEMALE, max_age=8)
+    assert [dog.id for dog in read_all_adoption_dogs(db, filters)] == [2, 3]
+
+    total, facets = read_adoption_dog_facets(db, filters)
+    assert total == 2
+    # La faceta del filtro activo cuenta sin ese filtro, pero con los demás (edad <= 8)
+    assert facets["gender"] == {"male": 1, "female": 2}
+    assert facets["is_vaccinated"] == {"true": 1, "false": 1}
+    assert facets["is_dewormed"] == {"true": 1, "false": 1}
+    assert facets["is_sterilized"] == {"true": 2, "false": 0}
+    teardown_db()
+
+
+def test_read_dogs_by_chip():
+    setup_db()
+    db = next(override_get_db())
+    create_adoption_dog_for_tests()
+    db.add(StaticDog(id=5, id_chip=555, name="Roco", age=4, is_vaccinated=True, gender=Gender.MALE,
+                     is_sterilized=True, is_dewormed=True, image=b"foto"))
+    db.commit()
+
+    with capture_statements(db) as statements:
+        assert read_dogs_by_chip(db, 555) == [{"kind": "static_dog", "id": 5, "id_chip": 555, "name": "Roco",
+                                               "has_image": True, "owner": None}]
+    assert_valid_tsql(statements[0])
+    assert [dog["kind"] for dog in read_dogs_by_chip(db, 2020)] == ["adoption_dog"]
+    assert read_dogs_by_chip(db, 1) == []
+    teardown_db()
+
+
+def test_read_dogs_sparse_compiles_for_sql_server():
+    setup_db()
+    db = next(override_get_db())
+    dog_id = create_adopted_dog_for_test()
+    with capture_statements(db) as statements:
+        rows = read_dogs_sparse(db, AdoptedDog, ["id", "name", "image"], include_owner=True)
+    assert [row["id"] for row in rows] == [dog_id]
+    assert rows[0]["owner"] is not None
+    assert statements
+    for statement in statements:
+        assert_valid_tsql(statement)
+    teardown_db()
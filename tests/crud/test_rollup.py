@@ -0,0 +1,69 @@
+from datetime import date
+
+from app.crud.dog import read_adopted_dogs_by_id
+from app.crud.rollup import reconcile_rollups, read_daily_trend
+from app.crud.visit import create_a_visit, update_visit, delete_visit_by_id
+from app.models.domain.rollup import DailyAdoptionStats, DailyVisitStats
+from app.models.domain.visit import Visit
+from app.models.schema.owner import OwnerCreate
+from app.models.schema.visit import VisitCreate, VisitUpdate
+from app.services.multi_crud_service import create_owner_and_adopted_dog, un_adopt_dog_service
+
+from tests.conftest import setup_db, teardown_db, override_get_db, create_adoption_dog_for_tests
+
+
+def rollup(db, model) -> dict:
+    db.expire_all()
+    return {row.day: row.total for row in db.query(model).all() if row.total}
+
+
+def test_rollups_follow_adoptions_and_visits():
+    setup_db()
+    db = next(override_get_db())
+    create_adoption_dog_for_tests()
+    adopted_on = date(2025, 3, 10)
+    create_owner_and_adopted_dog(db, 20, adopted_on, OwnerCreate(name="Ana", direction="calle", cellphone="0999"))
+    assert rollup(db, DailyAdoptionStats) == {adopted_on: 1}
+
+    dog = read_adopted_dogs_by_id(db, 20)
+    dog.owner.crypt_owner_data()
+    create_a_visit(db, VisitCreate(visit_date=date(2025, 4, 1), evidence=None, observations=None,
+                                   adopted_dog_id=20), dog)
+    create_a_visit(db, VisitCreate(visit_date=date(2025, 4, 1), evidence=None, observations=None,
+                                   adopted_dog_id=20), dog)
+    assert rollup(db, DailyVisitStats) == {date(2025, 4, 1): 2}
+
+    first, second = [visit_id for (visit_id,) in db.query(Visit.id).order_by(Visit.id)]
+    update_visit(db, VisitUpdate(id=first, visit_date=date(2025, 5, 2), evidence=None, observations=None,
+                                 adopted_dog_id=20), dog)
+    delete_visit_by_id(db, second)
+    assert rollup(db, DailyVisitStats) == {date(2025, 5, 2): 1}
+
+    # Al des adoptar se descuentan la adopción y las visitas que se borran con el perro
+    un_adopt_dog_service(db, 20)
+    assert rollup(db, DailyAdoptionStats) == {}
+    assert rollup(db, DailyVisitStats) == {}
+    assert reconcile_rollups(db) == {"daily_adoption_stats": 0, "daily_visit_stats": 0}
+    teardown_db()
+
+
+def test_reconcile_and_trend():
+    setup_db()
+    db = next(override_get_db())
+    create_adoption_dog_for_tests()
+    create_owner_and_adopted_dog(db, 20, date(2025, 3, 10), OwnerCreate(name="Ana", direction="c", cellphone="09"))
+    # Visitas insertadas sin pasar por el CRUD, como en una carga manual
+    db.add_all([Visit(visit_date=date(2025, 3, 15), adopted_dog_id=20),
+                Visit(visit_date=date(2025, 3, 28), adopted_dog_id=20),
+                Visit(visit_date=date(2026, 1, 5), adopted_dog_id=20)])
+    db.add(DailyAdoptionStats(day=date(2024, 1, 1), total=4))
+    db.commit()
+
+    assert reconcile_rollups(db) == {"daily_adoption_stats": 1, "daily_visit_stats": 3}
+    assert rollup(db, DailyAdoptionStats) == {date(2025, 3, 10): 1}
+    assert read_daily_trend(db, DailyVisitStats, "month") == [{"period": date(2025, 3, 1), "total": 2},
+                                                              {"period": date(2026, 1, 1), "total": 1}]
+    assert read_daily_trend(db, DailyVisitStats, "year", start=date(2026, 1, 1)) == \
+        [{"period": date(2026, 1, 1), "total": 1}]
+    assert len(read_daily_trend(db, DailyVisitStats, "day")) == 3
+    teardown_db()
@@ -0,0 +1,56 @@
+from datetime import date
+
+from app.crud.stats import read_dog_category_stats, read_adoptions_per_month, read_average_days_to_adoption, \
+    read_visits_per_month, read_course_seats
+from app.models.domain.dog import AdoptedDog, Gender, StaticDog
+from app.models.domain.owner import Owner
+from app.models.domain.visit import Visit
+
+from tests.conftest import setup_db, teardown_db, override_get_db, create_adoption_dog_for_tests, \
+    create_course_with_applicants_for_test, capture_statements, assert_valid_tsql
+
+
+def add_adopted_dog(db, dog_id: int, entry_date, adopted_date):
+    owner = Owner(name="Dueño", direction="calle", cellphone="0999999999")
+    db.add(AdoptedDog(id=dog_id, name=f"Perro {dog_id}", age=2, is_vaccinated=dog_id % 2 == 0, gender=Gender.MALE,
+                      is_sterilized=False, is_dewormed=True, entry_date=entry_date, adopted_date=adopted_date,
+                      owner=owner))
+
+
+def test_dashboard_aggregates():
+    setup_db()
+    db = next(override_get_db())
+    create_adoption_dog_for_tests()
+    db.add(StaticDog(id=1, name="Roco", age=4, is_vaccinated=False, gender=Gender.MALE, is_sterilized=True,
+                     is_dewormed=True))
+    add_adopted_dog(db, 30, date(2025, 1, 1), date(2025, 1, 11))
+    add_adopted_dog(db, 31, date(2025, 1, 1), date(2025, 3, 2))
+    add_adopted_dog(db, 32, None, date(2025, 3, 20))
+    db.add(Visit(visit_date=date(2025, 3, 25), adopted_dog_id=30))
+    db.commit()
+
+    with capture_statements(db) as statements:
+        categories = {category["kind"]: category for category in read_dog_category_stats(db)}
+    assert_valid_tsql(statements[0])
+    assert {kind: category["total"] for kind, category in categories.items()} == \
+        {"static_dog": 1, "adoption_dog": 1, "adopted_dog": 3}
+    assert categories["adopted_dog"]["vaccinated_ratio"] == round(2 / 3, 4)
+    assert categories["static_dog"]["sterilized_ratio"] == 1.0
+
+    assert read_adoptions_per_month(db) == [{"year": 2025, "month": 1, "count": 1},
+                                            {"year": 2025, "month": 3, "count": 2}]
+    # (10 + 60) / 2; el perro sin fecha de ingreso no cuenta
+    assert read_average_days_to_adoption(db) == 35.0
+    assert read_visits_per_month(db) == [{"year": 2025, "month": 3, "count": 1}]
+    teardown_db()
+
+
+def test_course_seats_only_for_current_courses():
+    setup_db()
+    db = next(override_get_db())
+    course_id = create_course_with_applicants_for_test(3)
+    assert read_course_seats(db, today=date(2025, 1, 10)) == [
+        {"course_id": course_id, "name": "Adiestramiento básico", "capacity": 50, "applicants": 3, "open_seats": 47}
+    ]
+    assert read_course_seats(db, today=date(2025, 3, 1)) == []
+    teardown_db()
@@ -1,7 +1,9 @@
 from datetime import date
 
+from sqlalchemy.dialects import mssql
+
 from app.crud.visit import create_a_visit, get_all_visits, get_all_visits_by_dog, read_visit_by_id, update_visit, \
-    delete_visit_by_id
+    delete_visit_by_id, read_visits_normalized, read_visits_sparse
 from app.db.session import get_db
 from app.models.domain.dog import Gender, StaticDog, AdoptionDog, AdoptedDog
 from app.models.domain.owner import Owner
@@ -12,7 +14,8 @@ from app.models.schema.visit import VisitCreate, VisitUpdate
 from main import app
 
 from tests.conftest import setup_db, teardown_db, create_adoption_dog_for_tests, override_get_db, \
-    create_auth_user_for_test, create_adopted_dog_for_test, create_visit_for_test
+    create_auth_user_for_test, create_adopted_dog_for_test, create_visit_for_test, capture_statements, \
+    assert_valid_tsql
 
 app.dependency_overrides[get_db] = override_get_db
 
@@ -91,3 +94,32 @@ def test_delete_visit_by_id():
     result = delete_visit_by_id(db, visit_id)
     assert result == dict(success=True, message="Visita eliminada")
     teardown_db()
+
+
+def test_read_visits_normalized_compiles_for_sql_server():
+    """Las consultas del listado normalizado deben ser válidas también en SQL Server."""
+    db = next(override_get_db())
+    setup_db()
+    create_visit_for_test()
+    with capture_statements(db) as statements:
+        result = read_visits_normalized(db)
+    assert len(result["visits"]) == 1 and len(result["dogs"]) == 1
+    assert len(statements) == 3
+    for statement in statements:
+        assert_valid_tsql(statement)
+    # Perros y dueños se filtran con subconsultas: SQL Server rechaza más de 2100 parámetros
+    for statement in statements[1:]:
+        assert "IN (SELECT" in str(statement.compile(dialect=mssql.dialect()))
+    teardown_db()
+
+
+def test_read_visits_sparse_compiles_for_sql_server():
+    db = next(override_get_db())
+    setup_db()
+    create_visit_for_test()
+    with capture_statements(db) as statements:
+        rows = read_visits_sparse(db, ["id", "evidence"])
+    assert len(rows) == 1
+    for statement in statements:
+        assert_valid_tsql(statement)
+    teardown_db()
@@ -0,0 +1,113 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.db.session import get_db
+from app.services.mailer import SMTPConnectionPool, deliver_outbox_batch
+from main import app
+
+from tests.conftest import setup_db, teardown_db, override_get_db, create_auth_user_for_test, \
+    create_course_with_applicants_for_test, TestingSessionLocal
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+
+def get_admin_token() -> str:
+    create_auth_user_for_test()
+    response = client.post("/auth/token", data={"username": "admin", "password": "SecurePassword123"})
+    return response.json()["access_token"]
+
+
+def test_notify_course_applicants(smtp_server):
+    handler, port = smtp_server
+    setup_db()
+    course_id = create_course_with_applicants_for_test(5)
+    token = get_admin_token()
+
+    response = client.post(f"/course/{course_id}/notify",
+                           headers={"Authorization": f"Bearer {token}"},
+                           json={"subject": "Cambio de horario", "message": "El curso inicia a las 10:00"})
+    assert response.status_code == 200
+    job = response.json()
+    assert job["total"] == 5
+    assert job["status"] == "pending"
+
+    # Los correos quedan en la bandeja de salida y los envía su worker
+    pool = SMTPConnectionPool(hostname="127.0.0.1", port=port, username=None, password=None, use_tls=False,
+                              size=2, sender="poliperros@base.com")
+
+    async def deliver():
+        claimed = await deliver_outbox_batch(pool, TestingSessionLocal, batch_size=10)
+        await pool.close()
+        return claimed
+
+    assert asyncio.run(deliver()) == 5
+
+    # El avance se lee de la base de datos, así lo puede responder cualquier worker
+    response = client.get(f"/course/notify/{job['job_id']}", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "finished"
+    assert response.json()["sent"] == 5
+    assert sorted(message.rcpt_tos[0] for message in handler.messages) == \
+           [f"applicant{i}@base.com" for i in range(5)]
+    # Dos conexiones del pool atienden los cinco correos
+    assert len(handler.sessions) <= 2
+    assert client.get("/course/notify/otro", headers={"Authorization": f"Bearer {token}"}).status_code == 404
+    teardown_db()
+
+
+def test_notify_course_without_applicants():
+    setup_db()
+    course_id = create_course_with_applicants_for_test(0)
+    token = get_admin_token()
+    response = client.post(f"/course/{course_id}/notify",
+                           headers={"Authorization": f"Bearer {token}"},
+                           json={"subject": "Cambio de horario", "message": "El curso inicia a las 10:00"})
+    assert response.status_code == 404
+    teardown_db()
+
+
+def test_course_list_cache_is_invalidated_on_update():
+    setup_db()
+    course_id = create_course_with_applicants_for_test(0)
+    token = get_admin_token()
+
+    response = client.get("/course/")
+    assert response.status_code == 200
+    course = response.json()[0]
+
+    course["name"] = "Curso actualizado"
+    response = client.put(f"/course/update/{course_id}", headers={"Authorization": f"Bearer {token}"},
+                          json={key: value for key, value in course.items() if key != "id"})
+    assert response.status_code == 200
+
+    assert client.get("/course/").json()[0]["name"] == "Curso actualizado"
+    assert client.get(f"/course/{course_id}").json()["name"] == "Curso actualizado"
+    teardown_db()
+
+
+def test_course_list_answers_not_modified():
+    setup_db()
+    course_id = create_course_with_applicants_for_test(0)
+    token = get_admin_token()
+
+    response = client.get("/course/")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"].startswith("public, max-age=")
+
+    response = client.get("/course/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    course = client.get("/course/").json()[0]
+    course["capacity"] = 10
+    client.put(f"/course/update/{course_id}", headers={"Authorization": f"Bearer {token}"},
+               json={key: value for key, value in course.items() if key != "id"})
+    # La actualización cambia la versión de la colección
+    response = client.get("/course/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    teardown_db()
@@ -4,6 +4,7 @@ from unittest import mock
 from fastapi.testclient import TestClient
 import pytest
 
+from app.core import compression
 from app.crud.user import create_auth_user
 from app.db.session import get_db
 from app.models.domain.dog import AdoptionDog, AdoptedDog
@@ -13,7 +14,7 @@ from app.models.schema.user import UserCreate
 from main import app
 
 from tests.conftest import setup_db, teardown_db, create_adoption_dog_for_tests, override_get_db, \
-    create_auth_user_for_test
+    create_auth_user_for_test, create_adopted_dog_for_test
 
 app.dependency_overrides[get_db] = override_get_db
 
@@ -80,6 +81,60 @@ def test_adopt_dog_by_id():
     teardown_db()
 
 
+def test_adoption_dog_cache_is_invalidated_on_adopt():
+    setup_db()
+    create_auth_user_for_test()
+    adoption_dog = create_adoption_dog_for_tests()
+    response = client.get("/dog/adoption_dog/")
+    assert response.status_code == 200
+    assert [dog["id"] for dog in response.json()] == [adoption_dog]
+    assert client.get(f"/dog/adoption_dog/{adoption_dog}").json()["name"] == "Firulais"
+
+    token = client.post("/auth/token", data={"username": "admin", "password": "SecurePassword123"}) \
+        .json()["access_token"]
+    response = client.post(f"/dog/adoption_dog/adopt/{adoption_dog}/2025-01-01",
+                           headers={"Authorization": f"Bearer {token}"},
+                           json={"name": "Luis", "direction": "Quitumbe", "cellphone": "0979040404"})
+    assert response.status_code == 200
+
+    # La adopción invalida las respuestas guardadas
+    assert client.get("/dog/adoption_dog/").status_code == 404
+    assert client.get(f"/dog/adoption_dog/{adoption_dog}").status_code == 404
+    teardown_db()
+
+
+def test_adoption_dog_list_stores_compressed_response(monkeypatch):
+    monkeypatch.setattr(compression, "COMPRESSION_MIN_SIZE", 0)
+    setup_db()
+    create_adoption_dog_for_tests()
+    plain = client.get("/dog/adoption_dog/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    calls = []
+    original_compress = compression.compress
+    monkeypatch.setattr("app.services.catalog_cache.compress",
+                        lambda body, encoding: calls.append(encoding) or original_compress(body, encoding))
+    for _ in range(3):
+        response = client.get("/dog/adoption_dog/", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.json() == plain.json()
+    # Se comprime una sola vez por llenado del caché
+    assert calls == ["gzip"]
+    teardown_db()
+
+
+def test_adopted_dog_list_is_compressed(monkeypatch):
+    monkeypatch.setattr(compression, "COMPRESSION_MIN_SIZE", 0)
+    setup_db()
+    create_adopted_dog_for_test()
+    response = client.get("/dog/adopted_dog/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()[0]["owner"]["name"]
+    teardown_db()
+
+
 def test_adopt_dog_by_id_and_existing_owner():
     setup_db()
     create_auth_user_for_test()
@@ -107,3 +162,105 @@ def test_adopt_dog_by_id_and_existing_owner():
     assert adopted_dog_db is not None
     assert adopted_dog_db.owner.id == existing_owner.id
     teardown_db()
+
+
+def test_adopt_dogs_in_batch():
+    setup_db()
+    create_auth_user_for_test()
+    adoption_dog = create_adoption_dog_for_tests()
+    token_response = client.post(
+        "/auth/token",
+        data={"username": "admin", "password": "SecurePassword123"}
+    )
+    assert token_response.status_code == 200
+    token = token_response.json()["access_token"]
+    response = client.post("/dog/adoption_dog/adopt/batch",
+                           headers={"Authorization": f"Bearer {token}"},
+                           json=[
+                               {"dog_id": adoption_dog, "adoption_date": "2025-01-01",
+                                "owner": {"name": "Luis", "direction": "Quitumbe", "cellphone": "0979040404"}},
+                               {"dog_id": 999, "adoption_date": "2025-01-01", "owner_id": 1},
+                           ])
+    assert response.status_code == 200
+    body = response.json()
+    assert body["adopted"] == 1
+    assert [result["success"] for result in body["results"]] == [True, False]
+    adopted_dog_db = next(override_get_db()).query(AdoptedDog).filter(AdoptedDog.id == adoption_dog).first()
+    assert adopted_dog_db is not None
+    adopted_dog_db.owner.decrypt_owner_data()
+    assert adopted_dog_db.owner.cellphone == "0979040404"
+    teardown_db()
+
+
+def test_get_adopted_dogs_with_sparse_fields():
+    setup_db()
+    create_adopted_dog_for_test()
+
+    response = client.get("/dog/adopted_dog/?fields=name,age")
+    assert response.status_code == 200
+    assert response.json() == [{"id": 20, "name": "Firulais", "age": 3}]
+
+    # El dueño solo se agrega si se pide y llega descifrado
+    response = client.get("/dog/adopted_dog/20?fields=name&include=owner")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["name"] == "Firulais"
+    assert body["owner"]["name"] == "Jhon Doe"
+    assert body["owner"]["cellphone"] == "0999877765"
+
+    response = client.get("/dog/adopted_dog/?fields=name,peso")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Campos desconocidos: peso"
+    assert client.get("/dog/adopted_dog/?include=visits").status_code == 400
+    teardown_db()
+
+
+def test_search_dogs():
+    setup_db()
+    create_adopted_dog_for_test()
+    response = client.get("/dog/search?q=alegre")
+    assert response.status_code == 200
+    assert response.json() == [{"kind": "adopted_dog", "id": 20, "name": "Firulais", "about": "Perro alegre",
+                                "image": None, "score": 1.0}]
+    assert client.get("/dog/search?q=").status_code == 422
+    teardown_db()
+
+
+def test_get_adoption_dogs_with_filters_and_facets():
+    setup_db()
+    create_adoption_dog_for_tests()
+
+    response = client.get("/dog/adoption_dog/?gender=male&min_age=2&with_facets=true")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 1
+    assert [dog["name"] for dog in body["results"]] == ["Firulais"]
+    assert body["facets"]["gender"] == {"male": 1, "female": 0}
+
+    response = client.get("/dog/adoption_dog/?gender=female&with_facets=true&fields=name")
+    assert response.json() == {"total": 0, "results": [],
+                               "facets": {"gender": {"male": 1, "female": 0}, "is_vaccinated": {"true": 0, "false": 0},
+                                          "is_sterilized": {"true": 0, "false": 0},
+                                          "is_dewormed": {"true": 0, "false": 0}}}
+    assert client.get("/dog/adoption_dog/?gender=female").status_code == 404
+    assert client.get("/dog/adoption_dog/?min_age=5&max_age=2").status_code == 400
+    teardown_db()
+
+
+def test_get_dog_by_chip():
+    setup_db()
+    create_auth_user_for_test()
+    create_adopted_dog_for_test()
+    token = client.post("/auth/token", data={"username": "admin", "password": "SecurePassword123"}) \
+        .json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/dog/chip/2020", headers=headers)
+    assert response.status_code == 200
+    [dog] = response.json()
+    assert (dog["kind"], dog["id"], dog["name"]) == ("adopted_dog", 20, "Firulais")
+    assert dog["owner"]["cellphone"] == "0999877765"
+
+    assert client.get("/dog/chip/9999", headers=headers).status_code == 404
+    assert client.get("/dog/chip/2020").status_code == 401
+    teardown_db()
@@ -0,0 +1,73 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.crud.rollup import reconcile_rollups
+from app.db.session import get_db
+from main import app
+
+from tests.conftest import setup_db, teardown_db, override_get_db, create_auth_user_for_test, \
+    create_adopted_dog_for_test
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+
+def test_get_dashboard_stats_is_cached():
+    setup_db()
+    create_auth_user_for_test()
+    token = client.post("/auth/token", data={"username": "admin", "password": "SecurePassword123"}) \
+        .json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/stats/", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_dogs"] == 0
+    assert body["average_days_to_adoption"] is None
+
+    # Dentro del TTL se responde lo mismo aunque cambien los datos
+    create_adopted_dog_for_test()
+    assert client.get("/stats/", headers=headers).json() == body
+    assert client.get("/stats/").status_code == 401
+    teardown_db()
+
+
+def test_get_trends():
+    setup_db()
+    create_auth_user_for_test()
+    create_adopted_dog_for_test()
+    db = next(override_get_db())
+    reconcile_rollups(db)
+    token = client.post("/auth/token", data={"username": "admin", "password": "SecurePassword123"}) \
+        .json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/stats/trends?metric=adoptions&period=year", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["points"] == [{"period": f"{date.today().year}-01-01", "total": 1}]
+    assert client.get("/stats/trends?metric=visits&start=2025-02-01&end=2025-01-01",
+                      headers=headers).status_code == 400
+    teardown_db()
+
+
+def test_get_cohort_analytics():
+    pytest.importorskip("numpy")
+    setup_db()
+    create_auth_user_for_test()
+    create_adopted_dog_for_test()
+    token = client.post("/auth/token", data={"username": "admin", "password": "SecurePassword123"}) \
+        .json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/stats/cohorts?cohort_by=age_band&within_days=15", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["cohort_by"] == "age_band"
+    # El perro de prueba no tiene fecha de ingreso y fue adoptado hoy
+    assert body["time_to_adoption"] == []
+    assert body["visit_compliance"]["eligible_dogs"] == 0
+    assert client.get("/stats/cohorts?cohort_by=color", headers=headers).status_code == 422
+    teardown_db()
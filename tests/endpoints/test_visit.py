@@ -1,19 +1,25 @@
 from tkinter.font import names
 from unittest import mock
 
+from datetime import date
+
 from fastapi.testclient import TestClient
 import pytest
+from sqlalchemy.dialects import mssql
+
+from app.api.v1.endpoints.visit import sparse_visit_list, parse_visit_selection
 
 from app.crud.user import create_auth_user
 from app.db.session import get_db
 from app.models.domain.dog import AdoptionDog, AdoptedDog
 from app.models.domain.owner import Owner
 from app.models.domain.user import Role
+from app.models.domain.visit import Visit
 from app.models.schema.user import UserCreate
 from main import app
 
 from tests.conftest import setup_db, teardown_db, create_adopted_dog_for_test, override_get_db, \
-    create_auth_user_for_test, create_visit_for_test
+    create_auth_user_for_test, create_visit_for_test, capture_statements
 
 app.dependency_overrides[get_db] = override_get_db
 
@@ -154,4 +160,67 @@ def test_delete_visit_by_id():
                           )
     assert response.status_code == 200
     assert "Visita eliminada" == response.json().get("message")
-    teardown_db()
\ No newline at end of file
+    teardown_db()
+
+def test_get_visits_normalized():
+    setup_db()
+    create_auth_user_for_test()
+    visit = create_visit_for_test()
+    db = next(override_get_db())
+    for _ in range(2):
+        db.add(Visit(visit_date=date.today(), evidence=b"foto", observations="Otra", adopted_dog_id=20))
+    db.commit()
+
+    token = client.post("/auth/token", data={"username": "admin", "password": "SecurePassword123"}) \
+        .json()["access_token"]
+    response = client.get("/visits/all/?format=normalized", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["visits"]][0] == visit
+    assert len(body["visits"]) == 3
+    assert {item["adopted_dog_id"] for item in body["visits"]} == {20}
+    assert body["visits"][0]["evidence"] is None
+    assert body["visits"][1]["evidence"].endswith(f"/visits/{body['visits'][1]['id']}/evidence")
+    # El perro y su dueño aparecen una sola vez y el dueño llega descifrado
+    assert list(body["dogs"]) == ["20"]
+    owner_id = body["dogs"]["20"]["owner_id"]
+    assert body["owners"][str(owner_id)]["cellphone"] == "0999877765"
+
+    response = client.get("/visits/all/20?format=normalized", headers={"Authorization": f"Bearer {token}"})
+    assert len(response.json()["visits"]) == 3
+    teardown_db()
+
+
+def test_get_visits_with_sparse_fields():
+    setup_db()
+    create_auth_user_for_test()
+    visit = create_visit_for_test()
+    token = client.post("/auth/token", data={"username": "admin", "password": "SecurePassword123"}) \
+        .json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/visits/all/?fields=visit_date,evidence", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == [{"id": visit, "visit_date": date.today().isoformat(), "evidence": None}]
+
+    response = client.get(f"/visits/{visit}?fields=observations&include=owner", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["adopted_dog"]["id"] == 20
+    assert body["adopted_dog"]["owner"]["cellphone"] == "0999877765"
+
+    response = client.get("/visits/all/?fields=id&format=normalized", headers=headers)
+    assert response.status_code == 400
+    teardown_db()
+
+
+def test_sparse_visits_include_dogs_through_a_subquery():
+    db = next(override_get_db())
+    setup_db()
+    create_visit_for_test()
+    with capture_statements(db) as statements:
+        visits = sparse_visit_list(db, parse_visit_selection("id", "adopted_dog"))
+    assert visits[0]["adopted_dog"]["id"] == 20
+    # Sin una lista de ids como parámetros: SQL Server rechaza más de 2100
+    assert "IN (SELECT" in str(statements[1].compile(dialect=mssql.dialect()))
+    teardown_db()
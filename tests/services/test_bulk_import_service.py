@@ -0,0 +1,91 @@
+from datetime import date
+
+from app.crud.dog import transfer_adoption_dog_to_adopted, transfer_adopted_dog_to_adoption
+from app.models.domain.dog import StaticDog, AdoptedDog, AdoptionDog, Gender
+from app.models.domain.owner import Owner
+from app.models.domain.visit import Visit
+from app.models.schema.bulk_import import ImportKind, ImportFormat
+from app.services.bulk_import_service import import_records
+from app.services.crypt import decrypt_str_data
+
+from tests.conftest import setup_db, teardown_db, override_get_db, create_adopted_dog_for_test
+
+STATIC_DOGS_CSV = (
+    "id_chip,name,about,age,is_vaccinated,image,gender,entry_date,is_sterilized,is_dewormed,operation\n"
+    "1,Firulais,Perro alegre,3,true,,male,2024-01-10,true,false,\n"
+    "2,Luna,,2,false,,female,,false,true,Ninguna\n"
+    "3,Sin edad,,,true,,male,,true,true,\n"
+)
+
+
+def test_import_static_dogs_from_csv():
+    db = next(override_get_db())
+    setup_db()
+    report = import_records(db, ImportKind.STATIC_DOG, STATIC_DOGS_CSV, ImportFormat.CSV, chunk_size=1)
+    assert report.total == 3
+    assert report.inserted == 2
+    assert [error.row for error in report.errors] == [4]
+    assert db.query(StaticDog).count() == 2
+    teardown_db()
+
+
+def test_import_adopted_dogs_with_owners_from_ndjson():
+    db = next(override_get_db())
+    setup_db()
+    content = (
+        '{"name": "Toby", "age": 4, "is_vaccinated": true, "gender": "male", "is_sterilized": true, '
+        '"is_dewormed": true, "adopted_date": "2023-05-01", '
+        '"owner": {"name": "Ana", "direction": "Quito", "cellphone": "0999999999"}}\n'
+        '{"name": "Sin dueño", "age": 4, "is_vaccinated": true, "gender": "male", "is_sterilized": true, '
+        '"is_dewormed": true, "adopted_date": "2023-05-01"}\n'
+        'no es json\n'
+    )
+    report = import_records(db, ImportKind.ADOPTED_DOG, content, ImportFormat.NDJSON)
+    assert report.inserted == 1
+    assert [error.row for error in report.errors] == [2, 3]
+    dog = db.query(AdoptedDog).filter(AdoptedDog.id == report.created[0].id).first()
+    assert dog.owner.name == "Ana"
+    assert decrypt_str_data(dog.owner.cellphone) == "0999999999"
+    assert db.query(Owner).count() == 1
+    teardown_db()
+
+
+def test_imported_adopted_dogs_do_not_reuse_adoption_dog_ids():
+    db = next(override_get_db())
+    setup_db()
+    db.add(AdoptionDog(id=1, name="Luna", age=2, is_vaccinated=True, gender=Gender.FEMALE, is_sterilized=True,
+                       is_dewormed=True))
+    db.commit()
+    content = ('{"name": "Toby", "age": 4, "is_vaccinated": true, "gender": "male", "is_sterilized": true, '
+               '"is_dewormed": true, "adopted_date": "2023-05-01", '
+               '"owner": {"name": "Ana", "direction": "Quito", "cellphone": "0999999999"}}\n')
+    report = import_records(db, ImportKind.ADOPTED_DOG, content, ImportFormat.NDJSON)
+    imported_id = report.created[0].id
+    assert imported_id != 1
+    assert db.query(AdoptionDog).count() == 1
+
+    # Los perros conservan su id al cambiar de tabla: adoptar a Luna y devolver a Toby no choca
+    owner_id = db.query(AdoptedDog.owner_id).filter(AdoptedDog.id == imported_id).scalar()
+    assert transfer_adoption_dog_to_adopted(db, 1, owner_id, date(2024, 1, 1))
+    db.commit()
+    assert transfer_adopted_dog_to_adoption(db, imported_id)
+    db.commit()
+    assert sorted(dog_id for dog_id, in db.query(AdoptedDog.id)) == [1]
+    assert sorted(dog_id for dog_id, in db.query(AdoptionDog.id)) == [imported_id]
+    teardown_db()
+
+
+def test_import_visits_reports_missing_dogs():
+    db = next(override_get_db())
+    setup_db()
+    dog_id = create_adopted_dog_for_test()
+    content = (
+        "visit_date,evidence,observations,adopted_dog_id\n"
+        f"2024-02-01,,Todo bien,{dog_id}\n"
+        "2024-02-02,,Perro inexistente,999\n"
+    )
+    report = import_records(db, ImportKind.VISIT, content, ImportFormat.CSV)
+    assert report.inserted == 1
+    assert report.errors[0].row == 3
+    assert db.query(Visit).count() == 1
+    teardown_db()
@@ -0,0 +1,32 @@
+import gzip
+
+from starlette.requests import Request
+
+from app.core.response_cache import response_cache
+from app.services import catalog_cache
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/course/1", "query_string": b"",
+                    "headers": [(b"accept-encoding", b"gzip")]})
+
+
+def test_compressed_response_is_not_stale_after_invalidation(monkeypatch):
+    response_cache.clear()
+    bodies = iter([b"[" + b"1," * 1000 + b"1]", b"[" + b"2," * 1000 + b"2]"])
+    negotiate_encoding = catalog_cache.negotiate_encoding
+    invalidated = []
+
+    def negotiate_and_invalidate(accept_encoding):
+        # Un cambio confirmado entre la lectura del contenido y la compresión
+        if not invalidated:
+            invalidated.append(1)
+            catalog_cache.invalidate_courses()
+        return negotiate_encoding(accept_encoding)
+
+    monkeypatch.setattr(catalog_cache, "negotiate_encoding", negotiate_and_invalidate)
+    first = catalog_cache.cached_json_response(catalog_cache.COURSES, _request(), lambda: next(bodies))
+    second = catalog_cache.cached_json_response(catalog_cache.COURSES, _request(), lambda: next(bodies))
+    assert gzip.decompress(first.body).startswith(b"[1,")
+    assert gzip.decompress(second.body).startswith(b"[2,")
+    response_cache.clear()
@@ -0,0 +1,64 @@
+from datetime import date
+
+import pytest
+
+from app.models.domain.dog import AdoptedDog, Gender
+from app.models.domain.owner import Owner
+from app.models.domain.visit import Visit
+from app.services.cohort_analytics import cohort_analytics
+
+from tests.conftest import setup_db, teardown_db, override_get_db
+
+np = pytest.importorskip("numpy")
+
+
+def add_adopted_dog(db, dog_id: int, gender: Gender, age: int, entry_date, adopted_date):
+    db.add(AdoptedDog(id=dog_id, name=f"Perro {dog_id}", age=age, is_vaccinated=True, gender=gender,
+                      is_sterilized=True, is_dewormed=True, entry_date=entry_date, adopted_date=adopted_date,
+                      owner=Owner(name="Dueño", direction="calle", cellphone="0999999999")))
+
+
+def test_cohort_analytics():
+    setup_db()
+    db = next(override_get_db())
+    add_adopted_dog(db, 1, Gender.MALE, 0, date(2024, 1, 1), date(2024, 1, 11))
+    add_adopted_dog(db, 2, Gender.FEMALE, 5, date(2024, 6, 1), date(2024, 7, 1))
+    add_adopted_dog(db, 3, Gender.FEMALE, 9, date(2025, 1, 1), date(2025, 1, 21))
+    add_adopted_dog(db, 4, Gender.MALE, 2, None, date(2025, 3, 1))
+    db.add_all([
+        Visit(visit_date=date(2024, 1, 5), adopted_dog_id=1),  # antes de la adopción, no cuenta
+        Visit(visit_date=date(2024, 1, 31), adopted_dog_id=1),
+        Visit(visit_date=date(2024, 3, 1), adopted_dog_id=1),
+        Visit(visit_date=date(2024, 9, 1), adopted_dog_id=2),
+        Visit(visit_date=date(2025, 3, 10), adopted_dog_id=4),
+    ])
+    db.commit()
+
+    result = cohort_analytics(db, "entry_year", 30, today=date(2025, 3, 20))
+    assert [(cohort["cohort"], cohort["count"], cohort["median_days"]) for cohort in result["time_to_adoption"]] \
+        == [("2024", 2, 20.0), ("2025", 1, 20.0)]
+
+    # Perros adoptados hace 30 días o más: 1, 2 y 3; solo el 1 tuvo visita a tiempo (20 días)
+    compliance = result["visit_compliance"]
+    assert (compliance["eligible_dogs"], compliance["visited_dogs"], compliance["share"]) == (3, 1, 0.3333)
+    assert compliance["days_to_first_visit"]["count"] == 3
+
+    # Intervalos: 26 y 30 días (perro 1)
+    assert result["visit_intervals"]["count"] == 2
+    assert result["visit_intervals"]["median_days"] == 28.0
+
+    by_gender = cohort_analytics(db, "gender", 30, today=date(2025, 3, 20))["time_to_adoption"]
+    assert [(cohort["cohort"], cohort["count"]) for cohort in by_gender] == [("female", 2), ("male", 1)]
+    by_age = cohort_analytics(db, "age_band", 30, today=date(2025, 3, 20))["time_to_adoption"]
+    assert [cohort["cohort"] for cohort in by_age] == ["adulto", "cachorro", "mayor"]
+    teardown_db()
+
+
+def test_cohort_analytics_without_data():
+    setup_db()
+    db = next(override_get_db())
+    result = cohort_analytics(db, "gender", 30)
+    assert result["time_to_adoption"] == []
+    assert result["visit_compliance"]["share"] is None
+    assert result["visit_intervals"]["count"] == 0
+    teardown_db()
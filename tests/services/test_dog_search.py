@@ -0,0 +1,94 @@
+from app.crud.dog import create_static_dog, update_static_dog, delete_an_static_dog_by_id
+from app.models.domain.dog import Gender, StaticDog
+from app.models.schema.dog import StaticDogCreate
+from app.services.dog_search import DogSearchIndex, dog_search_index, fold, search_dogs, search_dogs_in_database
+
+from tests.conftest import setup_db, teardown_db, override_get_db, create_adopted_dog_for_test, capture_statements, \
+    assert_valid_tsql
+
+
+def static_dog(name: str, about: str = None) -> StaticDogCreate:
+    return StaticDogCreate(id_chip=None, name=name, about=about, age=2, is_vaccinated=True, image=None,
+                           gender=Gender.FEMALE, entry_date=None, is_sterilized=True, is_dewormed=True,
+                           operation=None)
+
+
+def test_fold_removes_accents():
+    assert fold("Ñandú Pequeño") == "nandu pequeno"
+
+
+def test_search_prefix_accents_and_ranking():
+    setup_db()
+    db = next(override_get_db())
+    create_static_dog(db, static_dog("Canela", "Muy juguetona"))
+    create_static_dog(db, static_dog("Toby", "Le gusta la canela y jugar con niños"))
+    create_adopted_dog_for_test()
+
+    index = DogSearchIndex()
+    with capture_statements(db) as statements:
+        index.rebuild(db)
+        search_dogs_in_database(db, "can")
+    # Las mismas consultas se ejecutan al iniciar en SQL Server
+    for statement in statements:
+        assert_valid_tsql(statement)
+    hits = index.search("CAN")
+    # Coincidir en el nombre pesa más que en la descripción
+    assert [hit.name for hit in hits] == ["Canela", "Toby"]
+    assert [hit.name for hit in index.search("ninos jug")] == ["Toby"]
+    assert [(hit.kind, hit.id) for hit in index.search("firu")] == [("adopted_dog", 20)]
+    assert index.search("canela gato") == []
+    assert index.search("¿?") == []
+    # El respaldo en la base de datos ordena igual
+    assert [hit.name for hit in search_dogs_in_database(db, "can")] == ["Canela", "Toby"]
+    teardown_db()
+
+
+def test_search_index_follows_crud_events():
+    setup_db()
+    db = next(override_get_db())
+    create_static_dog(db, static_dog("Canela"))
+    dog_id = db.query(StaticDog.id).scalar()
+    assert [hit.id for hit in search_dogs(db, "canela")] == [dog_id]
+
+    update_static_dog(db, static_dog("Manchas"), dog_id)
+    assert search_dogs(db, "canela") == []
+    assert [hit.name for hit in search_dogs(db, "manch")] == ["Manchas"]
+
+    delete_an_static_dog_by_id(db, dog_id)
+    assert search_dogs(db, "manchas") == []
+    teardown_db()
+
+
+def test_search_index_rebuilds_after_external_change():
+    setup_db()
+    db = next(override_get_db())
+    assert search_dogs(db, "firulais") == []
+    # Un perro creado sin emitir eventos, como lo haría otro worker
+    create_adopted_dog_for_test()
+    assert [hit.id for hit in search_dogs(db, "firulais")] == [20]
+    dog_search_index.clear()
+    teardown_db()
+
+
+def test_search_index_applies_external_changes_with_local_ones():
+    setup_db()
+    db = next(override_get_db())
+    create_static_dog(db, static_dog("Canela"))
+    create_static_dog(db, static_dog("Toby"))
+    canela, toby = [dog_id for dog_id, in db.query(StaticDog.id).order_by(StaticDog.id)]
+    assert [hit.id for hit in search_dogs(db, "canela")] == [canela]
+
+    # Otro worker cambia un nombre (sin eventos en este proceso) y aquí se cambia otro perro
+    db.query(StaticDog).filter(StaticDog.id == canela).update({StaticDog.name: "Manchas"})
+    db.commit()
+    update_static_dog(db, static_dog("Rocky"), toby)
+    assert search_dogs(db, "canela") == []
+    assert [hit.id for hit in search_dogs(db, "manchas")] == [canela]
+    assert [hit.id for hit in search_dogs(db, "rocky")] == [toby]
+
+    # Un perro eliminado en otro worker cambia el número de filas
+    db.query(StaticDog).filter(StaticDog.id == canela).delete()
+    db.commit()
+    assert search_dogs(db, "manchas") == []
+    dog_search_index.clear()
+    teardown_db()
@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import app.models.domain.token  # noqa: F401  (registra AuthToken para la relación de User)
+from app.crud.outbox import enqueue_email, enqueue_emails_without_commit
+from app.models.domain.email_outbox import EmailOutbox, EmailStatus
+from app.services import mailer
+from app.services.mailer import SMTPConnectionPool, deliver_outbox_batch, retry_delay
+
+from tests.conftest import setup_db, teardown_db, override_get_db, TestingSessionLocal
+
+
+def _context(code: int) -> dict:
+    return {"body": {"title": "Poliperros App", "code": code, "date": "2026-01-01 00:00:00"}}
+
+
+def test_outbox_is_delivered_over_pooled_connections(smtp_server):
+    handler, port = smtp_server
+    setup_db()
+    db = next(override_get_db())
+    for code in range(3):
+        enqueue_email(db, f"user{code}@base.com", "Recuperación de contraseña", _context(code), "email.html")
+    pool = SMTPConnectionPool(hostname="127.0.0.1", port=port, username=None, password=None, use_tls=False,
+                              size=1, sender="poliperros@base.com")
+
+    async def run():
+        claimed = await deliver_outbox_batch(pool, TestingSessionLocal, batch_size=10)
+        await pool.close()
+        return claimed
+
+    assert asyncio.run(run()) == 3
+    assert len(handler.messages) == 3
+    # Con una sola conexión en el pool los tres correos salen por la misma sesión SMTP
+    assert len(handler.sessions) == 1
+    assert sorted(message.rcpt_tos[0] for message in handler.messages) == \
+           ["user0@base.com", "user1@base.com", "user2@base.com"]
+    db.expire_all()
+    emails = db.query(EmailOutbox).all()
+    assert all(email.status == EmailStatus.SENT for email in emails)
+    # El contexto cifrado se borra después del envío
+    assert all(email.context is None for email in emails)
+    teardown_db()
+
+
+def test_notification_html_is_rendered_once(smtp_server, monkeypatch):
+    handler, port = smtp_server
+    setup_db()
+    db = next(override_get_db())
+    context = {"body": {"title": "Poliperros App", "course": "Obediencia", "message": "Mañana no hay clase"}}
+    enqueue_emails_without_commit(db, [f"user{i}@base.com" for i in range(3)], "Novedades", context,
+                                  "course_notification.html", notification_id="job-1")
+    db.commit()
+    rendered = []
+    render_template = mailer.render_template
+    monkeypatch.setattr(mailer, "render_template",
+                        lambda template, context: rendered.append(template) or render_template(template, context))
+    pool = SMTPConnectionPool(hostname="127.0.0.1", port=port, username=None, password=None, use_tls=False,
+                              sender="poliperros@base.com")
+
+    async def run():
+        claimed = await deliver_outbox_batch(pool, TestingSessionLocal, batch_size=10)
+        await pool.close()
+        return claimed
+
+    assert asyncio.run(run()) == 3
+    assert len(handler.messages) == 3
+    assert rendered == ["course_notification.html"]
+    mailer.notification_html_cache.clear()
+    teardown_db()
+
+
+def test_failed_delivery_is_retried_with_backoff():
+    setup_db()
+    db = next(override_get_db())
+    email = enqueue_email(db, "user@base.com", "Recuperación de contraseña", _context(123456), "email.html")
+    # Puerto cerrado: la conexión falla
+    pool = SMTPConnectionPool(hostname="127.0.0.1", port=1, username=None, password=None, use_tls=False,
+                              timeout=2)
+
+    assert asyncio.run(deliver_outbox_batch(pool, TestingSessionLocal)) == 1
+    db.expire_all()
+    email = db.query(EmailOutbox).filter(EmailOutbox.id == email.id).first()
+    assert email.status == EmailStatus.PENDING
+    assert email.attempts == 1
+    assert email.next_attempt_at > datetime.utcnow()
+    assert email.get_context() == _context(123456)
+    # No se vuelve a intentar antes de que venza la espera
+    assert asyncio.run(deliver_outbox_batch(pool, TestingSessionLocal)) == 0
+    teardown_db()
+
+
+def test_retry_delay_grows_exponentially():
+    assert retry_delay(1) == 30
+    assert retry_delay(2) == 60
+    assert retry_delay(3) == 120
+    assert retry_delay(20) == 3600
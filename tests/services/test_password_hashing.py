@@ -0,0 +1,47 @@
+import asyncio
+
+from passlib.context import CryptContext
+
+from app.services.crypt import calibrate_bcrypt_rounds, verify_and_update_password_async, get_password_hash, \
+    verify_password, password_hashing_metrics, pwd_context
+
+
+def test_calibrate_bcrypt_rounds_stays_in_bounds():
+    original = pwd_context.to_dict()
+    rounds = calibrate_bcrypt_rounds(target_ms=0, min_rounds=4, max_rounds=6)
+    assert rounds == 4
+    assert password_hashing_metrics()["rounds"] == 4
+    pwd_context.load(original)
+
+
+def test_password_is_rehashed_when_cost_differs():
+    original = pwd_context.to_dict()
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=5).hash("SecurePassword123")
+    calibrate_bcrypt_rounds(target_ms=0, min_rounds=4, max_rounds=4)
+
+    is_valid, new_hash = asyncio.run(verify_and_update_password_async("SecurePassword123", old_hash))
+    assert is_valid
+    assert new_hash.startswith("$2b$04$")
+    assert verify_password("SecurePassword123", new_hash)
+    is_valid, new_hash = asyncio.run(verify_and_update_password_async("wrong", old_hash))
+    assert not is_valid and new_hash is None
+    pwd_context.load(original)
+
+
+def test_password_in_accepted_range_is_not_rehashed():
+    original = pwd_context.to_dict()
+    # Otra réplica calibró 5 rondas; esta calibra 4, pero ambas aceptan de 4 a 6
+    other_hash = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=5).hash("SecurePassword123")
+    calibrate_bcrypt_rounds(target_ms=0, min_rounds=4, max_rounds=6)
+
+    assert asyncio.run(verify_and_update_password_async("SecurePassword123", other_hash)) == (True, None)
+    assert get_password_hash("SecurePassword123").startswith("$2b$04$")
+    pwd_context.load(original)
+
+
+def test_password_hashing_metrics_count_operations():
+    completed = password_hashing_metrics()["completed"]
+    get_password_hash("SecurePassword123")
+    metrics = password_hashing_metrics()
+    assert metrics["completed"] == completed + 1
+    assert metrics["queued"] == 0 and metrics["running"] == 0
@@ -0,0 +1,19 @@
+from app.services.template_service import get_template_env, get_template, render_template, precompile_templates
+
+
+def test_precompile_templates_loads_all_html_templates():
+    names = precompile_templates()
+    assert "email.html" in names
+    assert "user.html" in names
+
+
+def test_template_is_compiled_once():
+    assert get_template("email.html") is get_template("email.html")
+    assert get_template_env().auto_reload is False
+
+
+def test_render_template():
+    html = render_template("user.html", {"body": {"username": "admin1a2b3c", "password": "<secreto>"}})
+    assert "admin1a2b3c" in html
+    # Los valores se escapan en las plantillas HTML
+    assert "&lt;secreto&gt;" in html